@@ -6,25 +6,48 @@ Publishes images to akaSwap on Tezos blockchain
 
 import argparse
 import base64
+import io
 import json
 import os
 import sys
 from pathlib import Path
 from typing import Dict, Optional, Tuple, Any
+sys.path.append(str(Path(__file__).parent.parent))
+
 import requests
 from PIL import Image
-import io
+from apps.token_ids import TokenIdAllocator
 
 # API Configuration
 API_BASE_URL = "https://testnets.akaswap.com/api/v2"
 DEFAULT_CONTRACT = "KT1DeWkBGLKiXoYqxnMT4w3c8chApAqkFhqJ"  # Ghostnet FA2 Token contract
+# Allocated IDs the contract rejects as already minted are skipped this many times
+MAX_TOKEN_ID_SKIPS = 5
+
+
+def is_duplicate_token_response(response) -> bool:
+    """Whether a failed mint was rejected because its token ID already exists"""
+    if response.status_code not in (400, 409):
+        return False
+    text = response.text.lower()
+    return "token" in text and any(word in text for word in ("exist", "duplicate", "already"))
+
 
 class AkaSwapPublisher:
-    def __init__(self, partner_id: str, partner_secret: str):
+    def __init__(self, partner_id: str, partner_secret: str,
+                 token_allocator: Optional[TokenIdAllocator] = None):
         self.partner_id = partner_id
         self.partner_secret = partner_secret
         self.auth_header = self._create_auth_header()
+        self._token_allocator = token_allocator
         
+    @property
+    def token_allocator(self) -> TokenIdAllocator:
+        """The token ID counter, only opened once a mint or reservation needs it"""
+        if self._token_allocator is None:
+            self._token_allocator = TokenIdAllocator()
+        return self._token_allocator
+
     def _create_auth_header(self) -> str:
         """Create Basic Auth header from partner credentials"""
         credentials = f"{self.partner_id}:{self.partner_secret}"
@@ -97,11 +120,10 @@ class AkaSwapPublisher:
         
         # Extract token ID from response
         token_id = ipfs_data.get('tokenId')
-        if not token_id:
-            # Generate token ID - must fit in Int32 range
-            import time
-            # Use modulo to keep it within Int32 range (max 2147483647)
-            token_id = str(int(time.time() * 1000) % 2147483647)
+        allocated = not token_id
+        if allocated:
+            # Allocate from the persistent counter - unique across threads and processes
+            token_id = self.token_allocator.allocate()
         
         # Extract URIs from the actual response structure
         artifact_uri = ipfs_data.get('artifact', {}).get('uri')
@@ -175,6 +197,18 @@ class AkaSwapPublisher:
             headers=headers,
             json=mint_data
         )
+        # The old time-based IDs are scattered over the whole range, skip ahead past any we run into
+        skips = 0
+        while allocated and skips < MAX_TOKEN_ID_SKIPS and is_duplicate_token_response(response):
+            print(f"Token ID {token_id} already exists, skipping ahead")
+            token_id = self.token_allocator.allocate()
+            mint_data["tokenId"] = token_id
+            skips += 1
+            response = requests.post(
+                f"{API_BASE_URL}/fa2tokens/{contract}",
+                headers=headers,
+                json=mint_data
+            )
         
         if response.status_code not in (200, 201):
             raise Exception(f"Minting failed: {response.status_code} - {response.text}")
@@ -194,6 +228,10 @@ class AkaSwapPublisher:
         
         return result
     
+    def reserve_token_ids(self, count: int) -> Tuple[int, int]:
+        """Pre-reserve a range of token IDs for a batch of mints"""
+        return self.token_allocator.reserve_batch(count)
+    
     def publish_image(self, 
                      image_path: str,
                      name: str,
@@ -225,6 +263,7 @@ def main():
     parser.add_argument('--receiver', required=True, help='Tezos wallet address to receive NFT')
     parser.add_argument('--partner-id', help='Partner ID (or set AKASWAP_PARTNER_ID env var)')
     parser.add_argument('--partner-secret', help='Partner secret (or set AKASWAP_PARTNER_SECRET env var)')
+    parser.add_argument('--token-db', help='Path to the token ID counter database (default: veist_py/token_ids.sqlite)')
     
     args = parser.parse_args()
     
@@ -242,7 +281,7 @@ def main():
         sys.exit(1)
     
     try:
-        publisher = AkaSwapPublisher(partner_id, partner_secret)
+        publisher = AkaSwapPublisher(partner_id, partner_secret, TokenIdAllocator(args.token_db))
         result = publisher.publish_image(
             image_path=args.image,
             name=args.name,
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Token ID allocation for akaSwap minting
+Hands out collision-free, monotonic FA2 token IDs backed by a local SQLite counter
+"""
+
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Optional, Tuple
+
+# FA2 token IDs on akaSwap must fit in the Int32 range
+MAX_TOKEN_ID = 2147483647
+DEFAULT_DB_PATH = Path(__file__).parent.parent / "token_ids.sqlite"
+
+
+class TokenIdExhausted(Exception):
+    """Raised when the allocator would run past MAX_TOKEN_ID"""
+
+
+class TokenIdAllocator:
+    """Persistent token ID counter shared by every publisher using the same database.
+
+    Each allocation runs in an IMMEDIATE transaction, so threads and separate
+    processes pointing at the same file never receive the same ID. Batches can
+    pre-reserve a contiguous range with reserve() and then draw from it without
+    touching the database again.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, start: Optional[int] = None):
+        self.db_path = str(db_path or DEFAULT_DB_PATH)
+        self._lock = threading.Lock()
+        # Reserved ranges held by this allocator, oldest first: [next, end)
+        self._reserved = deque()
+
+        # The old time-based fallback minted IDs anywhere in the Int32 range, so no
+        # start is guaranteed clear of them; mint_nft skips ahead past any ID the
+        # contract reports as already taken
+        if start is None:
+            start = int(time.time()) % (MAX_TOKEN_ID // 2)
+        self._init_db(max(1, start))
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_db(self, start: int):
+        conn = self._connect()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS token_counter (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    next_id INTEGER NOT NULL
+                )
+            """)
+            conn.execute(
+                "INSERT OR IGNORE INTO token_counter (id, next_id) VALUES (0, ?)",
+                (start,)
+            )
+        finally:
+            conn.close()
+
+    def reserve(self, count: int) -> Tuple[int, int]:
+        """Atomically reserve `count` consecutive IDs, returns (first_id, last_id)"""
+        if count < 1:
+            raise ValueError(f"Reservation count must be positive, got {count}")
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                (first_id,) = conn.execute(
+                    "SELECT next_id FROM token_counter WHERE id = 0"
+                ).fetchone()
+                last_id = first_id + count - 1
+                if last_id > MAX_TOKEN_ID:
+                    raise TokenIdExhausted(
+                        f"Cannot reserve {count} IDs from {first_id}: exceeds {MAX_TOKEN_ID}"
+                    )
+                conn.execute(
+                    "UPDATE token_counter SET next_id = ? WHERE id = 0",
+                    (last_id + 1,)
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+        return first_id, last_id
+
+    def reserve_batch(self, count: int):
+        """Reserve a range for this allocator; allocate() draws from it after any earlier reserved ranges"""
+        first_id, last_id = self.reserve(count)
+        with self._lock:
+            self._reserved.append([first_id, last_id + 1])
+        return first_id, last_id
+
+    def allocate(self) -> str:
+        """Return the next unused token ID as a string, as the mint API expects"""
+        with self._lock:
+            while self._reserved:
+                reserved = self._reserved[0]
+                if reserved[0] < reserved[1]:
+                    token_id = reserved[0]
+                    reserved[0] += 1
+                    return str(token_id)
+                self._reserved.popleft()
+
+        first_id, _ = self.reserve(1)
+        return str(first_id)
+
+    def peek(self) -> int:
+        """Next ID the shared counter will hand out (for diagnostics)"""
+        conn = self._connect()
+        try:
+            (next_id,) = conn.execute(
+                "SELECT next_id FROM token_counter WHERE id = 0"
+            ).fetchone()
+            return next_id
+        finally:
+            conn.close()
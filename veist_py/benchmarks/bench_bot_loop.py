@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Offline throughput benchmark for the bot loops
+Drives bot.py's VeistBot and veist_bot.py's modules against an in-process
+fake Discord, the procedural image backend, a fake merger and the
+OpenAI Responses stub and reports cycles/sec,
+event-loop lag and memory for a range of simultaneous sessions
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from fakes import FakeDiscord, FakeMerger
+from generator import VeistGenerator
+from loop_watchdog import LoopWatchdog
+from merging.deadline_merger import DeadlineMerger
+from openai_stub import ResponseStore, StubOpenAI, StubServer
+from tracing import percentile
+
+REACTIONS = ["🔥", "🌊", "🌈", "🤖", "⭐", "🎨", "🌙", "🍄"]
+
+
+class LoopLagMonitor:
+    """Samples how late the event loop wakes a short sleep"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples = []
+        self.task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(time.perf_counter() - start - self.interval)
+
+    def start(self):
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        return sorted(self.samples)
+
+
+def rss_mib() -> float:
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)"""
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == 'darwin' else maxrss / 1024
+
+
+def user_reactions(message, rng):
+    """A few simulated users react to the latest variation"""
+    for emoji in rng.sample(REACTIONS, rng.randint(1, 3)):
+        message.react(emoji, rng.randint(1, 4))
+
+
+def make_bot_py_session(bot_module, discord, args, workdir, index):
+    bot = bot_module.VeistBot()
+    bot.loop = asyncio.get_running_loop()
+    # Same generator, but writing to the scratch directory instead of outputs/
+    bot.generator = VeistGenerator(
+        backend='procedural',
+        dedup_distance=bot_module.CONFIG['dedup']['max_distance'],
+        output_dir=Path(workdir) / f"bot_{index}",
+        procedural_config={**bot_module.CONFIG['procedural'], 'seed': args.seed + index},
+        draft_config=bot_module.CONFIG['quality_ladder']['drafts'].get('procedural'),
+    )
+    bot.generator.start_prompter()
+    bot.reaction_merger = DeadlineMerger(FakeMerger(args.merge_latency), 'fake', deadline=args.merge_deadline)
+    bot.generation_channel = discord.channel("ai-art")
+    return bot
+
+
+async def drive_bot_py_session(bot, cycles, rng):
+    await bot.generate_and_send(is_initial=True)
+    for _ in range(cycles - 1):
+        if bot.last_thread_message:
+            user_reactions(bot.last_thread_message, rng)
+        await bot.generate_and_send()
+    return bot.variation_count
+
+
+def make_veist_bot_session(veist_bot_module, discord, args, index):
+    module_names = {'text': 'text_evolution', 'testbed': 'reaction_testbed'}
+    bot = veist_bot_module.VeistBot(enabled_modules=[module_names[args.module]])
+    bot.loop = asyncio.get_running_loop()
+    if not args.openai_server:
+        bot.openai_client = StubOpenAI(args.openai_latency)
+    module = bot.modules[0]
+    module.channel = discord.channel(module.channel_name)
+    return module
+
+
+async def drive_veist_bot_session(module, cycles, rng):
+    await module.generate_initial_robot()
+    for _ in range(cycles - 1):
+        if hasattr(module, 'process_feedback'):
+            module.feedback_reactions = {emoji: rng.randint(1, 4) for emoji in rng.sample(REACTIONS, 2)}
+            await module.process_feedback()
+        else:
+            await module.evolve_robot(f"add a {rng.choice(['hat', 'cape', 'antenna', 'jetpack'])}")
+    return module.evolution_count + 1
+
+
+async def run_sessions(args, sessions, workdir, modules):
+    discord = FakeDiscord(latency=args.discord_latency, rate_limits=not args.no_rate_limits)
+    if args.bot == 'bot':
+        bots = [make_bot_py_session(modules['bot'], discord, args, workdir, i) for i in range(sessions)]
+        drive = drive_bot_py_session
+    else:
+        bots = [make_veist_bot_session(modules['veist_bot'], discord, args, i) for i in range(sessions)]
+        drive = drive_veist_bot_session
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+    watchdog = None
+    if args.watchdog:
+        watchdog = LoopWatchdog(name="bench", threshold=args.watchdog)
+        watchdog.start()
+    start = time.perf_counter()
+    cycles = await asyncio.gather(*(
+        drive(bot, args.cycles, random.Random(args.seed + i)) for i, bot in enumerate(bots)
+    ))
+    elapsed = time.perf_counter() - start
+    lag = await monitor.stop()
+    blocking_sites = Counter()
+    if watchdog:
+        watchdog.stop()
+        blocking_sites.update(site for site, _ in watchdog.reports)
+
+    for bot in bots:
+        if hasattr(bot, 'tracer'):
+            bot.tracer.close()
+    return {
+        'sessions': sessions,
+        'cycles': sum(cycles),
+        'elapsed': elapsed,
+        'lag_p50': percentile(lag, 50),
+        'lag_p99': percentile(lag, 99),
+        'lag_max': lag[-1] if lag else 0.0,
+        'api_calls': sum(discord.calls.values()),
+        'rate_limited': discord.rate_limited,
+        'rss': rss_mib(),
+        'blocking_sites': blocking_sites,
+    }
+
+
+def print_row(row):
+    print(f"{row['sessions']:>8} {row['cycles']:>7} {row['elapsed']:>8.2f}s {row['cycles'] / row['elapsed']:>9.2f} "
+          f"{row['lag_p50'] * 1000:>8.1f} {row['lag_p99'] * 1000:>8.1f} {row['lag_max'] * 1000:>8.1f} "
+          f"{row['api_calls']:>7} {row['rate_limited']:>7} {row['rss']:>8.0f}")
+    for site, count in row['blocking_sites'].most_common(5):
+        print(f"{'':>8} blocked loop {count}x in {site}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark bot loop throughput against fake Discord and backends')
+    parser.add_argument('--bot', choices=['bot', 'veist_bot'], default='bot', help='Which bot to drive')
+    parser.add_argument('--module', choices=['text', 'testbed'], default='text', help='veist_bot.py module to drive')
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 10, 100], help='Simultaneous sessions per run')
+    parser.add_argument('--cycles', type=int, default=5, help='Variation cycles per session')
+    parser.add_argument('--backend-latency', type=float, default=0.2, help='Procedural backend latency (s)')
+    parser.add_argument('--busy-rate', type=float, default=0.0, help='Fraction of "too busy" backend responses')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of backend exceptions')
+    parser.add_argument('--merge-latency', type=float, default=0.0, help='Fake merger latency (s)')
+    parser.add_argument('--merge-deadline', type=float, default=None,
+                        help='Merge deadline (s); without one the merge runs inline and blocks the loop')
+    parser.add_argument('--openai-latency', type=float, default=0.2, help='Responses stub latency (s), scaled by quality')
+    parser.add_argument('--openai-server', action='store_true', help='Use the real OpenAI client against the HTTP stub')
+    parser.add_argument('--discord-latency', type=float, default=0.02, help='Fake Discord API latency (s)')
+    parser.add_argument('--no-rate-limits', action='store_true', help='Disable Discord rate limit emulation')
+    parser.add_argument('--retry-delay', type=float, default=0.1, help='Override bot.py retry delay (s)')
+    parser.add_argument('--watchdog', type=float, default=0.0, metavar='SECONDS',
+                        help='Report code that blocks the loop longer than this')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.getLogger('veist_bot').setLevel(logging.WARNING)
+    workdir = tempfile.mkdtemp(prefix="veist_bench_")
+    modules = {}
+    if args.bot == 'bot':
+        import bot
+        bot.CONFIG['generation']['backend'] = 'procedural'
+        bot.CONFIG['procedural'].update(
+            latency_seconds=args.backend_latency,
+            latency_jitter=args.backend_latency / 2,
+            busy_rate=args.busy_rate,
+            error_rate=args.error_rate,
+        )
+        bot.CONFIG['display']['debug_output'] = False
+        bot.CONFIG['tracing']['exporters'] = []
+        bot.RETRY_DELAY = args.retry_delay
+        modules['bot'] = bot
+    else:
+        # veist_bot.py writes outputs/ relative to the working directory
+        os.chdir(workdir)
+        os.environ.setdefault('OPENAI_API_KEY', 'offline-benchmark')
+        if args.openai_server:
+            # Real client over HTTP to the stub, otherwise StubOpenAI is injected per session
+            server = StubServer(ResponseStore(args.openai_latency), port=0)
+            os.environ['OPENAI_BASE_URL'] = server.start_in_thread()
+        import veist_bot
+        modules['veist_bot'] = veist_bot
+
+    print(f"Driving {args.bot}.py, {args.cycles} cycles/session, outputs in {workdir}\n")
+    print(f"{'sessions':>8} {'cycles':>7} {'elapsed':>9} {'cycles/s':>9} "
+          f"{'lag p50':>8} {'lag p99':>8} {'lag max':>8} {'calls':>7} {'limited':>7} {'rss MiB':>8}")
+    for sessions in args.sessions:
+        print_row(asyncio.run(run_sessions(args, sessions, workdir, modules)))
+
+
+if __name__ == "__main__":
+    main()
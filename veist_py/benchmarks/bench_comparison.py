@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark for comparison image rendering
+Replays test_images/ as an evolution sequence through the original
+per-call combine_images and through ComparisonRenderer
+"""
+
+import argparse
+import asyncio
+import io
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from PIL import Image, ImageDraw, ImageFont
+from comparison import ComparisonRenderer
+
+TEST_IMAGES_DIR = Path(__file__).parent.parent.parent / "test_images"
+
+
+def legacy_combine_images(old_image_bytes, new_image_bytes, feedback_str, interpretation=None):
+    """The original ReactionTestbedModule.combine_images, kept as the baseline"""
+    old_img = Image.open(io.BytesIO(old_image_bytes))
+    new_img = Image.open(io.BytesIO(new_image_bytes))
+
+    height = min(old_img.height, new_img.height)
+    if old_img.height != height:
+        old_img = old_img.resize((int(old_img.width * height / old_img.height), height), Image.Resampling.LANCZOS)
+    if new_img.height != height:
+        new_img = new_img.resize((int(new_img.width * height / new_img.height), height), Image.Resampling.LANCZOS)
+
+    padding = 20
+    text_height = 100
+    combined = Image.new('RGB', (old_img.width + new_img.width + padding * 3, height + text_height + padding * 2), 'white')
+    combined.paste(old_img, (padding, text_height + padding))
+    combined.paste(new_img, (old_img.width + padding * 2, text_height + padding))
+
+    draw = ImageDraw.Draw(combined)
+    try:
+        font = ImageFont.truetype("Arial.ttf", 16)
+        title_font = ImageFont.truetype("Arial.ttf", 20)
+    except:
+        font = ImageFont.load_default()
+        title_font = font
+    draw.text((padding, 10), "Previous Version", fill='black', font=title_font)
+    draw.text((old_img.width + padding * 2, 10), "New Version", fill='black', font=title_font)
+    feedback_text = f"Applied: {feedback_str}"
+    if interpretation:
+        feedback_text += f"\nInterpretation: {interpretation}"
+    draw.text((padding, 40), feedback_text, fill='gray', font=font)
+
+    output = io.BytesIO()
+    combined.save(output, format='PNG')
+    return output.getvalue()
+
+
+def load_sequence(limit):
+    paths = sorted(TEST_IMAGES_DIR.glob("*.png"), key=lambda p: int(p.stem.split('_')[-1]))
+    return [p.read_bytes() for p in paths[:limit]]
+
+
+def run(name, render, images):
+    sizes = []
+    start = time.perf_counter()
+    for old_bytes, new_bytes in zip(images, images[1:]):
+        sizes.append(len(render(old_bytes, new_bytes, "🔥: 3, 🌊: 1", "🔥: fiery")))
+    elapsed = time.perf_counter() - start
+    steps = len(images) - 1
+    print(f"{name:<24} {elapsed / steps * 1000:8.1f} ms/evolution   {sum(sizes) / steps / 1024:8.0f} KiB avg")
+
+
+async def run_async(renderer, images):
+    """Measure how long the event loop stays free while rendering on the worker thread"""
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.001)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    for old_bytes, new_bytes in zip(images, images[1:]):
+        await renderer.render_async(old_bytes, new_bytes, "🔥: 3, 🌊: 1", "🔥: fiery")
+    elapsed = time.perf_counter() - start
+    task.cancel()
+    print(f"{'worker thread (PNG)':<24} {elapsed / (len(images) - 1) * 1000:8.1f} ms/evolution   "
+          f"{ticks} loop ticks while rendering")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark comparison image rendering')
+    parser.add_argument('--limit', type=int, default=12, help='Number of test images to replay')
+    args = parser.parse_args()
+
+    images = load_sequence(args.limit)
+    if len(images) < 2:
+        print(f"Need at least two images in {TEST_IMAGES_DIR}")
+        sys.exit(1)
+    print(f"Replaying {len(images) - 1} evolutions from {TEST_IMAGES_DIR}\n")
+
+    run("legacy combine_images", legacy_combine_images, images)
+    for fmt in ("PNG", "WEBP", "JPEG"):
+        renderer = ComparisonRenderer(format=fmt)
+        run(f"renderer ({fmt})", renderer.render, images)
+    asyncio.run(run_async(ComparisonRenderer(), images))
+
+
+if __name__ == "__main__":
+    main()
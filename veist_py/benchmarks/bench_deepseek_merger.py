@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark for DeepseekMerger precision modes
+Loads the model once per mode in its own process, so peak RSS is per mode,
+and reports load time, merges/min and peak RSS
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+PROMPT = "A friendly robot tending a rooftop garden at dusk"
+REACTIONS = [{"🔥": 3, "🌊": 1}, {"🌈": 2}, {"🤖": 4, "⭐": 2, "🌙": 1}]
+
+
+def worker(args):
+    """Runs in the child process: load one mode, merge, print a JSON result line"""
+    from merging.deepseek_merger import DeepseekMerger
+
+    start = time.perf_counter()
+    merger = DeepseekMerger(args.model, args.mode, threads=args.threads, max_new_tokens=args.max_new_tokens)
+    load_seconds = time.perf_counter() - start
+
+    prompt = PROMPT
+    start = time.perf_counter()
+    for i in range(args.merges):
+        prompt = merger.merge(prompt, REACTIONS[i % len(REACTIONS)]) or PROMPT
+    merge_seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        "load_seconds": load_seconds,
+        "merges_per_min": args.merges / merge_seconds * 60,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def run_mode(args, mode):
+    command = [
+        sys.executable, __file__, "--worker",
+        "--model", args.model, "--modes", mode,
+        "--merges", str(args.merges), "--max-new-tokens", str(args.max_new_tokens),
+    ]
+    if args.threads:
+        command += ["--threads", str(args.threads)]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        error = (completed.stderr.strip().splitlines() or ["no output"])[-1]
+        print(f"{mode:<6} failed: {error}")
+        return
+    result = json.loads(lines[-1])
+    print(f"{mode:<6} {result['load_seconds']:8.1f}s {result['merges_per_min']:12.2f} {result['peak_rss_mib']:10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark DeepseekMerger precision modes')
+    parser.add_argument('--model', default="deepseek-ai/DeepSeek-R1-Distill-Qwen-1.5B", help='Model to load')
+    parser.add_argument('--modes', nargs='+', default=["full", "bf16", "int8", "int4"], help='Modes to compare')
+    parser.add_argument('--merges', type=int, default=3, help='Merges per mode')
+    parser.add_argument('--threads', type=int, help='torch CPU threads')
+    parser.add_argument('--max-new-tokens', type=int, default=256, help='Generation length per merge')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        args.mode = args.modes[0]
+        worker(args)
+        return
+
+    print(f"{args.model}, {args.merges} merges per mode, max_new_tokens={args.max_new_tokens}\n")
+    print(f"{'mode':<6} {'load':>9} {'merges/min':>12} {'peak MiB':>10}")
+    for mode in args.modes:
+        run_mode(args, mode)
+
+
+if __name__ == "__main__":
+    main()
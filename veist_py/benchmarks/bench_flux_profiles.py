@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the local FLUX profiles
+Loads the pipeline once per profile in its own process, so peak memory is per profile,
+and reports load time, seconds/image and peak RSS (plus peak CUDA memory on GPU hosts)
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import yaml
+
+PROMPTS = [
+    "A friendly robot tending a rooftop garden at dusk",
+    "A lighthouse on a cliff during a thunderstorm, cinematic",
+    "A bowl of ramen in a neon-lit alley, photorealistic",
+]
+
+
+def load_flux_config(path):
+    with open(path) as f:
+        return yaml.safe_load(f).get('flux') or {}
+
+
+def worker(args):
+    """Runs in the child process: load one profile, render, print a JSON result line"""
+    import torch
+    from flux_backend import FluxRenderer
+
+    config = {**load_flux_config(args.config), 'profile': args.profile}
+    start = time.perf_counter()
+    renderer = FluxRenderer.from_config(config)
+    load_seconds = time.perf_counter() - start
+
+    # The first image pays for compilation and warm-up, time the rest
+    renderer.render(PROMPTS[0], seed=0)
+    start = time.perf_counter()
+    for i in range(args.images):
+        image = renderer.render(PROMPTS[i % len(PROMPTS)], seed=i)
+    render_seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        "load_seconds": load_seconds,
+        "seconds_per_image": render_seconds / args.images,
+        "size": f"{image.width}x{image.height}",
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "peak_cuda_mib": torch.cuda.max_memory_allocated() / 2**20 if torch.cuda.is_available() else 0.0,
+    }))
+
+
+def run_profile(args, profile):
+    command = [
+        sys.executable, __file__, "--worker",
+        "--config", args.config, "--profiles", profile, "--images", str(args.images),
+    ]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        error = (completed.stderr.strip().splitlines() or ["no output"])[-1]
+        print(f"{profile:<8} failed: {error}")
+        return
+    result = json.loads(lines[-1])
+    print(f"{profile:<8} {result['load_seconds']:8.1f}s {result['seconds_per_image']:10.2f}s {result['size']:>10} "
+          f"{result['peak_rss_mib']:10.0f} {result['peak_cuda_mib']:10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the local FLUX profiles')
+    parser.add_argument('--config', default=str(Path(__file__).parent.parent / "default_config.yaml"),
+                        help='Config file with the flux profiles')
+    parser.add_argument('--profiles', nargs='+', help='Profiles to compare (default: all configured)')
+    parser.add_argument('--images', type=int, default=3, help='Timed images per profile, after one warm-up')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        args.profile = args.profiles[0]
+        worker(args)
+        return
+
+    profiles = args.profiles or list(load_flux_config(args.config).get('profiles') or ["gpu"])
+    print(f"{args.images} images per profile after one warm-up\n")
+    print(f"{'profile':<8} {'load':>9} {'s/image':>11} {'size':>10} {'peak MiB':>10} {'cuda MiB':>10}")
+    for profile in profiles:
+        run_profile(args, profile)
+
+
+if __name__ == "__main__":
+    main()
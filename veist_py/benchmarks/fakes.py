@@ -0,0 +1,190 @@
+"""
+In-process stand-ins for Discord and the reaction merger, used to drive
+bot.py and veist_bot.py offline
+"""
+
+import asyncio
+import itertools
+import random
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+_ids = itertools.count(1000)
+
+
+class RateLimitBucket:
+    """Sliding-window limit of `limit` requests per `per` seconds"""
+
+    def __init__(self, limit: int, per: float):
+        self.limit = limit
+        self.per = per
+        self.calls = deque()
+
+    async def acquire(self) -> float:
+        """Wait for a free slot, returns the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            now = time.perf_counter()
+            while self.calls and now - self.calls[0] >= self.per:
+                self.calls.popleft()
+            if len(self.calls) < self.limit:
+                self.calls.append(now)
+                return waited
+            delay = self.per - (now - self.calls[0])
+            waited += delay
+            await asyncio.sleep(delay)
+
+
+class FakeDiscord:
+    """Shared API latency, Discord-like rate limits and call accounting"""
+
+    # (limit, seconds) per route kind and channel, roughly Discord's published buckets
+    RATE_LIMITS = {
+        'send': (5, 5.0),
+        'edit': (5, 5.0),
+        'delete': (5, 1.0),
+        'reaction': (1, 0.25),
+        'fetch': (50, 1.0),
+        'thread': (10, 10.0),
+    }
+    GLOBAL_LIMIT = (50, 1.0)
+
+    def __init__(self, latency: float = 0.05, rate_limits: bool = True):
+        self.latency = latency
+        self.rate_limits = rate_limits
+        self.buckets: Dict[tuple, RateLimitBucket] = {}
+        self.global_bucket = RateLimitBucket(*self.GLOBAL_LIMIT)
+        self.calls = Counter()
+        self.rate_limited = 0
+        self.rate_limit_seconds = 0.0
+        self.bytes_uploaded = 0
+        self.bot_user = FakeUser("veist", bot=True)
+
+    async def request(self, kind: str, channel_id: int):
+        self.calls[kind] += 1
+        if self.rate_limits:
+            bucket = self.buckets.get((kind, channel_id))
+            if bucket is None:
+                bucket = self.buckets[(kind, channel_id)] = RateLimitBucket(*self.RATE_LIMITS[kind])
+            waited = await bucket.acquire() + await self.global_bucket.acquire()
+            if waited:
+                self.rate_limited += 1
+                self.rate_limit_seconds += waited
+        if self.latency:
+            await asyncio.sleep(self.latency * random.uniform(0.5, 1.5))
+
+    def channel(self, name: str) -> 'FakeChannel':
+        return FakeChannel(self, name)
+
+    def reset_stats(self):
+        self.calls.clear()
+        self.rate_limited = 0
+        self.rate_limit_seconds = 0.0
+        self.bytes_uploaded = 0
+
+
+class FakeUser:
+    def __init__(self, name: str, bot: bool = False):
+        self.id = next(_ids)
+        self.name = name
+        self.bot = bot
+
+
+class FakeReaction:
+    def __init__(self, emoji: str, message: 'FakeMessage'):
+        self.emoji = emoji
+        self.message = message
+        self.count = 0
+
+
+class FakeMessage:
+    def __init__(self, channel: 'FakeChannel', content: Optional[str], author: FakeUser, attachment_size: int = 0):
+        self.id = next(_ids)
+        self.channel = channel
+        self.content = content or ""
+        self.author = author
+        self.attachment_size = attachment_size
+        self.reactions = []
+        self.deleted = False
+
+    def react(self, emoji: str, count: int = 1):
+        """A simulated user reaction, free of API cost"""
+        for reaction in self.reactions:
+            if reaction.emoji == emoji:
+                break
+        else:
+            reaction = FakeReaction(emoji, self)
+            self.reactions.append(reaction)
+        reaction.count += count
+
+    async def add_reaction(self, emoji):
+        await self.channel.discord.request('reaction', self.channel.id)
+        self.react(str(emoji))
+
+    async def edit(self, content=None, **kwargs):
+        await self.channel.discord.request('edit', self.channel.id)
+        if content is not None:
+            self.content = content
+        return self
+
+    async def delete(self):
+        await self.channel.discord.request('delete', self.channel.id)
+        self.deleted = True
+        self.channel.messages.pop(self.id, None)
+
+    async def create_thread(self, name: str, auto_archive_duration: int = 60):
+        await self.channel.discord.request('thread', self.channel.id)
+        return FakeThread(self.channel.discord, name, self.channel)
+
+
+class FakeChannel:
+    def __init__(self, discord: FakeDiscord, name: str):
+        self.id = next(_ids)
+        self.discord = discord
+        self.name = name
+        self.messages: Dict[int, FakeMessage] = {}
+
+    async def send(self, content=None, file=None, **kwargs):
+        await self.discord.request('send', self.id)
+        size = 0
+        if file is not None:
+            size = len(file.fp.read())
+            file.close()
+            self.discord.bytes_uploaded += size
+        message = FakeMessage(self, content, self.discord.bot_user, size)
+        self.messages[message.id] = message
+        return message
+
+    async def fetch_message(self, message_id: int):
+        await self.discord.request('fetch', self.id)
+        return self.messages[message_id]
+
+    @asynccontextmanager
+    async def typing(self):
+        yield
+
+
+class FakeThread(FakeChannel):
+    def __init__(self, discord: FakeDiscord, name: str, parent: FakeChannel):
+        super().__init__(discord, name)
+        self.parent = parent
+        self.archived = False
+
+    async def edit(self, archived=None, locked=None, **kwargs):
+        await self.discord.request('edit', self.id)
+        if archived is not None:
+            self.archived = archived
+
+
+class FakeMerger:
+    """Append-style merger that blocks for `latency` like a local LLM merge would"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def merge(self, prompt: str, reactions: Dict[str, int]) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        return f"{prompt}, but more " + " and ".join(emoji for emoji, count in reactions.items() if count > 0)
@@ -3,20 +3,37 @@ import discord
 from discord import app_commands
 from discord.ext import commands, tasks
 from dotenv import load_dotenv
-from generator import VeistGenerator
+from generator import DRAFT, FINAL, VeistGenerator
+from hedging import HedgedGenerator
+from circuit_breaker import backoff_delay, breaker_for
+from governor import governor_for
+from shadows import read_vote_vector
+from reaction_profiles import ReactionProfiles, channel_key, user_key
+from emoji_lexicon import EmojiLexicon
+from prompt_budget import PromptBudget
+from phash_index import index_for
 import asyncio
 import random
 import argparse
 import yaml
 from pathlib import Path
-from reaction_merging import create_merger
+from reaction_merging import create_deadline_merger
+from contact_sheet import ContactSheet
+from renditions import PreviewRenderer
+from tracing import Tracer
+from loop_watchdog import LoopWatchdog
+from metrics import (MetricsServer, instrument_discord, GENERATIONS, GENERATION_RETRIES,
+                     MERGES, MERGE_LATENCY, QUEUE_DEPTH)
+import io
+import time
 
 # Load environment variables
 load_dotenv()
 TOKEN = os.getenv('DISCORD_TOKEN')
 GUILD_ID = discord.Object(id=os.getenv('GUILD_ID', '0'))
 
-def load_config(config_path=None):
+def load_config(config_path=None, save=True):
+    """Defaults merged with the user config; with save, the user config is created or updated to match"""
     # Load default configuration
     default_config_path = Path(__file__).parent / "default_config.yaml"
     with open(default_config_path, 'r') as f:
@@ -30,6 +47,8 @@ def load_config(config_path=None):
             
     # If user config doesn't exist, create it from default
     if not user_config_path.exists():
+        if not save:
+            return default_config
         print(f"Config file not found at {user_config_path}, creating from default config...")
         with open(user_config_path, 'w') as f:
             yaml.safe_dump(default_config, f)
@@ -54,19 +73,20 @@ def load_config(config_path=None):
     final_config = merge_configs(default_config, user_config)
     
     # Optionally save the merged config if it's different from the user's config
-    if final_config != user_config:
+    if save and final_config != user_config:
         print("Updating config file with new default values...")
         with open(user_config_path, 'w') as f:
             yaml.safe_dump(final_config, f)
 
     return final_config
 
-# Load configuration with optional path
-CONFIG = load_config()
+# Load configuration with optional path; only the running bot writes config.yaml, not importers (tests, benchmarks)
+CONFIG = load_config(save=__name__ == "__main__")
 
 # Update constants from config
 MAX_RETRIES = CONFIG['retry']['max_attempts']
 RETRY_DELAY = CONFIG['retry']['delay_seconds']
+MAX_RETRY_DELAY = CONFIG['retry']['max_delay_seconds']
 
 STARTER_PROMPTS = [
     "a mysterious robot in a garden",
@@ -78,6 +98,22 @@ STARTER_PROMPTS = [
 
 # Archive duration for threads (in minutes)
 THREAD_ARCHIVE_DURATION = 60
+
+# Where every generator saves, matching VeistGenerator's default
+OUTPUT_DIR = Path(__file__).parent / "outputs"
+
+def create_generator(backend):
+    """VeistGenerator for a backend using the shared generation settings and output index"""
+    return VeistGenerator(
+        backend=backend,
+        index=index_for(OUTPUT_DIR, CONFIG['dedup']['max_distance']),
+        debug=CONFIG['display']['debug_output'],
+        dedup_distance=CONFIG['dedup']['max_distance'],
+        procedural_config=CONFIG['procedural'],
+        flux_config=CONFIG.get('flux'),
+        draft_config=CONFIG['quality_ladder']['drafts'].get(backend)
+    )
+
 class VeistBot(commands.Bot):
     def __init__(self):
         intents = discord.Intents.default()
@@ -85,19 +121,54 @@ class VeistBot(commands.Bot):
         intents.reactions = True
         
         super().__init__(command_prefix='!', intents=intents)
-        self.generator = VeistGenerator(
-            backend=CONFIG['generation']['backend'],
-            debug=CONFIG['display']['debug_output']
+        self.generator = create_generator(CONFIG['generation']['backend'])
+        self.hedger = None
+        # Rate and spend limits shared by every paid call in the process
+        self.governor = governor_for(CONFIG['governor'])
+        if CONFIG['hedging']['enabled']:
+            secondaries = [create_generator(backend) for backend in CONFIG['hedging']['secondary_backends']]
+            self.hedger = HedgedGenerator.from_config(
+                self.generator, secondaries, CONFIG['hedging'], governor=self.governor
+            )
+        # Used in order while the primary backend's circuit breaker is open
+        self.failover_generators = [
+            create_generator(backend) for backend in CONFIG['circuit_breaker']['failover_backends']
+        ]
+        # Long-run reaction history per user and channel
+        self.profiles = ReactionProfiles.from_config(CONFIG['profiles']) if CONFIG['profiles']['enabled'] else None
+        # Emoji interpretations learned by veist_bot.py let merges of known emoji skip the LLM
+        self.lexicon = EmojiLexicon.from_config(CONFIG['lexicon']) if CONFIG['lexicon']['enabled'] else None
+        self.reaction_merger = create_deadline_merger(
+            CONFIG['generation']['reaction_merging'], CONFIG['merging'], governor=self.governor, lexicon=self.lexicon
         )
-        self.reaction_merger = create_merger(CONFIG['generation']['reaction_merging'])
+        # Merged prompts are compacted to what the image model actually reads
+        self.prompt_budget = PromptBudget.from_config(CONFIG['prompt_budget'])
         self.generation_channel = None
         self.is_generating = False
         self.current_thread = None
         self.variation_count = 0
         self.MAX_VARIATIONS = CONFIG['generation']['max_variations']
         self.last_thread_message = None
+        # Who reacted to the last thread message in person, and what other bots (ShadowBot's replay) added
+        self.reactors_message_id = None
+        self.current_reactors = set()
+        self.replayed_reactions = {}
         self.last_prompt = None
         self.current_version_message = None
+        self.contact_sheet = None
+        self.last_image_path = None
+        # Variations render as cheap drafts; the final result is re-rendered from the last draft's seed
+        self.variation_quality = DRAFT if CONFIG['quality_ladder']['enabled'] else FINAL
+        self.last_quality = None
+        self.last_seed = None
+        self.last_backend = None
+        
+        # Discord posts use size-capped previews; full-res files stay on disk
+        self.previews = PreviewRenderer.from_config(CONFIG['previews'])
+        
+        # Per-stage latency tracing of each variation cycle
+        self.tracer = Tracer.from_config(CONFIG['tracing'])
+        self.tracer.start_session()
         
         # Meta reactions from config
         self.META_REACTIONS = [
@@ -115,6 +186,18 @@ class VeistBot(commands.Bot):
         self.waiting_for_feedback = False
 
     async def setup_hook(self):
+        # Serve operational metrics from the bot's own event loop
+        instrument_discord(self)
+        if CONFIG['metrics']['enabled']:
+            self.metrics_server = MetricsServer(host=CONFIG['metrics']['host'], port=CONFIG['metrics']['port'])
+            await self.metrics_server.start()
+            print(f"Serving metrics on http://{CONFIG['metrics']['host']}:{CONFIG['metrics']['port']}/metrics")
+        
+        # Report anything that blocks the gateway loop
+        if CONFIG['watchdog']['enabled']:
+            self.watchdog = LoopWatchdog.from_config(CONFIG['watchdog'], name="bot")
+            self.watchdog.start()
+        
         print("Syncing commands to guild...")
         self.tree.copy_global_to(guild=GUILD_ID)
         synced = await self.tree.sync(guild=GUILD_ID)
@@ -148,7 +231,7 @@ class VeistBot(commands.Bot):
             return
             
         # Start the generator
-        self.generator.start_prompter()
+        self.start_generators()
         
         # Generate first image with random prompt
         initial_prompt = random.choice(STARTER_PROMPTS)
@@ -179,6 +262,8 @@ class VeistBot(commands.Bot):
                 meta_stats[emoji] = max(0, count - 1)
             else:
                 regular_reactions[emoji] = count
+        
+        self.drop_replayed_reactions(regular_reactions, message.id)
                 
         if CONFIG['display']['debug_output']:
             print(f"Reaction check:")
@@ -189,46 +274,232 @@ class VeistBot(commands.Bot):
             
         return regular_reactions, meta_stats
 
-    def build_next_prompt(self, reactions):
+    def drop_replayed_reactions(self, regular_reactions, message_id):
+        """Leave out reactions other bots (ShadowBot's replay) put on the message, so only people are counted"""
+        if message_id != self.reactors_message_id:
+            return
+        for emoji, count in self.replayed_reactions.items():
+            if emoji in regular_reactions:
+                regular_reactions[emoji] -= count
+                if regular_reactions[emoji] <= 0:
+                    del regular_reactions[emoji]
+
+    def merge_input(self, regular_reactions):
+        """The in-person reactions plus ShadowBot's votes and the channel prior, for the merger only.
+        
+        Completion and waiting are decided on in-person reactions alone, so
+        standing shadow votes or the prior can't keep a session going by themselves.
+        """
+        reactions = dict(regular_reactions)
+        if CONFIG['shadows']['enabled']:
+            self.add_shadow_votes(reactions)
+        if self.profiles:
+            self.add_profile_prior(reactions)
+        return reactions
+
+    def add_shadow_votes(self, regular_reactions):
+        """Fold ShadowBot's decayed votes of absent users into the reaction counts, no Discord calls needed"""
+        shadow_config = CONFIG['shadows']
+        reactors = set()
+        if self.last_thread_message and self.last_thread_message.id == self.reactors_message_id:
+            reactors = self.current_reactors
+        # Users who reacted in person already voted, their shadows must not vote again
+        votes = read_vote_vector(shadow_config['db_path'], shadow_config['max_age_seconds'], reactors)
+        for emoji, weight in votes.items():
+            if emoji in self.META_REACTIONS:
+                continue
+            count = min(shadow_config['max_count'], int(weight * shadow_config['weight']))
+            if count > 0:
+                regular_reactions[emoji] = regular_reactions.get(emoji, 0) + count
+
+    def add_profile_prior(self, regular_reactions):
+        """Give the channel's long-run favourite emojis a small standing vote in every merge"""
+        prior = CONFIG['profiles']['channel_prior_count']
+        if prior <= 0:
+            return
+        key = channel_key(self.generation_channel.id)
+        for emoji, _ in self.profiles.top_k(key, CONFIG['profiles']['top_k']):
+            if emoji not in self.META_REACTIONS:
+                regular_reactions[emoji] = regular_reactions.get(emoji, 0) + prior
+
+    async def build_next_prompt(self, reactions):
         """Build next prompt based on previous prompt and reactions"""
         if not reactions:
             return random.choice(STARTER_PROMPTS)
         
-        return self.reaction_merger.merge(self.last_prompt, reactions)
+        strategy = CONFIG['generation']['reaction_merging']
+        MERGES.labels(strategy).inc()
+        with MERGE_LATENCY.labels(strategy).time():
+            prompt = await self.reaction_merger.merge(self.last_prompt, reactions)
+        return self.prompt_budget.enforce(prompt, previous=self.last_prompt)
 
     async def start_new_generation(self):
         """Start a fresh generation cycle"""
         self.current_thread = None
         self.variation_count = 0
         self.last_prompt = None
+        self.last_image_path = None
+        self.last_quality = None
+        self.last_seed = None
+        self.last_backend = None
+        self.contact_sheet = None
+        # A merge still running from the last session must not seed this one
+        self.reaction_merger.discard_late()
         await self.generate_and_send()
 
-    async def generate_with_retry(self, prompt):
-        """Attempt to generate image with retries"""
+    def all_generators(self):
+        """Primary, failover and hedge secondary generators"""
+        secondaries = self.hedger.secondaries if self.hedger else []
+        return [self.generator] + self.failover_generators + secondaries
+
+    def start_generators(self):
+        """Activate every generator, they refuse to render until started"""
+        for generator in self.all_generators():
+            generator.start_prompter()
+
+    def generator_for(self, backend):
+        return next((g for g in self.all_generators() if g.backend == backend), None)
+
+    def pick_generator(self, pinned=None):
+        """First configured generator (or only the pinned one) whose budget and circuit breaker let a call through.
+        
+        Backends past the governor's low-water mark are only used once no
+        backend with more headroom is available.
+        """
+        breaker_config = CONFIG['circuit_breaker']
+        generators = [pinned] if pinned else [self.generator] + self.failover_generators
+        for prefer_headroom in (True, False):
+            for generator in generators:
+                if prefer_headroom and self.governor.degraded(generator.provider):
+                    continue
+                # Cheap check first, so a refused budget doesn't claim a half-open probe
+                if not self.governor.allows(generator.provider, generator.backend, images=1):
+                    continue
+                breaker = breaker_for(generator.backend, breaker_config) if breaker_config['enabled'] else None
+                if breaker and not breaker.allow():
+                    continue
+                # acquire() is the real gate: another session may have drained the bucket since the check
+                if not self.governor.acquire(generator.provider, generator.backend, images=1):
+                    if breaker:
+                        breaker.release()
+                    continue
+                return generator
+        return None
+
+    def unavailable_for(self) -> float:
+        """Seconds until some backend's budget and circuit breaker would allow a call again"""
+        breaker_config = CONFIG['circuit_breaker']
+        waits = []
+        for generator in [self.generator] + self.failover_generators:
+            wait = self.governor.retry_after(generator.provider, generator.backend, images=1)
+            if breaker_config['enabled']:
+                wait = max(wait, breaker_for(generator.backend, breaker_config).retry_after())
+            waits.append(wait)
+        return min(waits)
+
+    async def run_generator(self, generator, prompt, quality=FINAL, seed=None, hedge=True):
+        if hedge and self.hedger and generator is self.generator:
+            return await self.hedger.generate_image(prompt, quality, seed)
+        return await self.loop.run_in_executor(None, generator.generate_image, prompt, quality, seed)
+
+    def record_outcome(self, backend, result):
+        """Feed a generation's outcome to the circuit breakers of every backend it involved.
+        
+        Hedged results name the backends that raised, so a failing primary
+        still trips its breaker while a secondary covers for it.
+        """
+        breaker_config = CONFIG['circuit_breaker']
+        failed = result.get("failed_backends")
+        if failed is None:
+            failed = [backend] if "error" in result else []
+        for failed_backend in failed:
+            breaker_for(failed_backend, breaker_config).record_failure()
+        if "error" in result:
+            return
+        winner = result.get("backend", backend)
+        breaker_for(winner, breaker_config).record_success()
+        if backend != winner and backend not in failed:
+            # The picked backend lost the race without failing, free a probe slot it may hold
+            breaker_for(backend, breaker_config).release()
+
+    async def generate_with_retry(self, prompt, quality=FINAL, seed=None, pinned=None):
+        """Attempt to generate image with retries, backing off and failing over per backend.
+        
+        A pinned generator is the only one tried, without hedging.
+        """
+        breaker_config = CONFIG['circuit_breaker']
         for attempt in range(MAX_RETRIES):
+            generator = self.pick_generator(pinned)
+            if generator is None:
+                # Every backend is failing or out of budget, keep the last image up and skip this cycle
+                backend = self.generator.backend
+                GENERATIONS.labels(backend, "unavailable").inc()
+                return {
+                    "error": f"{backend} is unavailable",
+                    "status": "unavailable",
+                    "retry_after": self.unavailable_for()
+                }
+            
+            backend = generator.backend
+            reason = "busy"
             try:
-                result = await self.loop.run_in_executor(
-                    None, 
-                    self.generator.generate_image,
-                    prompt
-                )
-                
-                if "error" in result and "too busy" in result["error"].lower():
-                    if attempt < MAX_RETRIES - 1:  # Don't message if it's the last attempt
-                        await self.generation_channel.send(f"⏳ Server busy, retrying in {RETRY_DELAY} seconds... (Attempt {attempt + 1}/{MAX_RETRIES})")
-                        await asyncio.sleep(RETRY_DELAY)
-                        continue
-                return result
-                
+                result = await self.run_generator(generator, prompt, quality, seed, hedge=pinned is None)
             except Exception as e:
-                if attempt < MAX_RETRIES - 1:
-                    await self.generation_channel.send(f"⚠️ Generation error, retrying in {RETRY_DELAY} seconds... (Attempt {attempt + 1}/{MAX_RETRIES})")
-                    await asyncio.sleep(RETRY_DELAY)
-                else:
-                    return {"error": str(e)}
+                result = {"error": str(e)}
+                reason = "exception"
+            
+            if breaker_config['enabled']:
+                self.record_outcome(backend, result)
+            
+            retryable = reason == "exception" or ("error" in result and "too busy" in result["error"].lower())
+            if retryable and attempt < MAX_RETRIES - 1:
+                GENERATION_RETRIES.labels(backend, reason).inc()
+                delay = backoff_delay(attempt, RETRY_DELAY, MAX_RETRY_DELAY)
+                status = "⏳ Server busy" if reason == "busy" else "⚠️ Generation error"
+                await self.update_timer_message(
+                    f"{status} ({backend}), retrying in {delay:.0f} seconds... (Attempt {attempt + 1}/{MAX_RETRIES})"
+                )
+                await asyncio.sleep(delay)
+                continue
+            
+            GENERATIONS.labels(backend, "error" if "error" in result else "generated").inc()
+            return result
         
+        GENERATIONS.labels(self.generator.backend, "error").inc()
         return {"error": "Maximum retry attempts reached"}
 
+    async def render_final(self):
+        """Path of the session's final image, re-rendering the last draft at full quality.
+        
+        Drafts keep the final resolution, so the backend that drew the draft
+        reproduces its composition from the same prompt and seed; another
+        backend would draw a different picture.
+        """
+        generator = self.generator_for(self.last_backend)
+        if self.last_quality != DRAFT or generator is None:
+            return self.last_image_path
+        
+        await self.update_timer_message("🖼️ Rendering final result at full quality...")
+        with self.tracer.span("final_render", backend=generator.backend):
+            result = await self.generate_with_retry(
+                self.last_prompt, quality=FINAL, seed=self.last_seed, pinned=generator
+            )
+        if "error" in result:
+            # Better the draft than no final result at all
+            print(f"Final render failed, posting the draft instead: {result['error']}")
+            return self.last_image_path
+        return result['path']
+
+    async def update_timer_message(self, content):
+        """Show a status in the main channel's single timer message instead of posting a new one"""
+        if self.timer_message:
+            try:
+                await self.timer_message.edit(content=content)
+                return
+            except discord.HTTPException:
+                pass
+        self.timer_message = await self.generation_channel.send(content)
+
     async def update_thread_message_status(self, status_text):
         """Update the status text on the last thread message"""
         if self.last_thread_message:
@@ -250,28 +521,47 @@ class VeistBot(commands.Bot):
         """Helper method to generate and send images"""
         if self.is_generating:
             return
-            
+        
+        QUEUE_DEPTH.labels("bot").inc()
+        try:
+            with self.tracer.span("cycle", variation=self.variation_count) as span:
+                outcome = await self._generate_and_send(prompt, is_initial)
+                if span:
+                    # Keep idle checks out of the full-cycle percentiles
+                    span.set("outcome", outcome)
+                    if outcome != "generated":
+                        span.name = f"cycle_{outcome}"
+        finally:
+            QUEUE_DEPTH.labels("bot").dec()
+        
+        if outcome == "generated" and CONFIG['display']['debug_output']:
+            print(f"Cycle latency (session {self.tracer.session_id}):\n{self.tracer.summary()}")
+
+    async def _generate_and_send(self, prompt=None, is_initial=False):
+        """Run one variation cycle, returns its outcome"""
         self.is_generating = True
         self.waiting_for_feedback = False
         
         try:
-            # Immediately show generating message in both thread and main channel
-            if self.current_thread and self.last_thread_message:
-                await self.update_thread_message_status("🔄 Generating new image...")
-            
-            # Create or update timer message in main channel immediately
-            if self.timer_message:
-                try:
-                    await self.timer_message.edit(content="🔄 Generating new image...")
-                except:
+            with self.tracer.span("status_update"):
+                # Immediately show generating message in both thread and main channel
+                if self.current_thread and self.last_thread_message:
+                    await self.update_thread_message_status("🔄 Generating new image...")
+                
+                # Create or update timer message in main channel immediately
+                if self.timer_message:
+                    try:
+                        await self.timer_message.edit(content="🔄 Generating new image...")
+                    except:
+                        self.timer_message = await self.generation_channel.send("🔄 Generating new image...")
+                else:
                     self.timer_message = await self.generation_channel.send("🔄 Generating new image...")
-            else:
-                self.timer_message = await self.generation_channel.send("🔄 Generating new image...")
             
             if not self.current_thread:
                 prompt = random.choice(STARTER_PROMPTS)
             elif not is_initial:
-                regular_reactions, meta_stats = await self.collect_reactions()
+                with self.tracer.span("collect_reactions"):
+                    regular_reactions, meta_stats = await self.collect_reactions()
                 
                 if CONFIG['display']['debug_output']:
                     print(f"Early completion check:")
@@ -284,20 +574,17 @@ class VeistBot(commands.Bot):
                     if CONFIG['display']['debug_output']:
                         print("Early completion conditions met!")
                     try:
-                        if self.last_thread_message and self.last_thread_message.attachments:
-                            attachment = self.last_thread_message.attachments[0]
-                            temp_filename = f"temp_{attachment.filename}"
-                            await attachment.save(temp_filename)
-                            
-                            final_file = discord.File(temp_filename)
+                        if self.last_image_path and os.path.exists(self.last_image_path):
+                            # The final result is posted at full resolution from disk
+                            final_file = discord.File(await self.render_final())
                             await self.current_version_message.delete()
                             await self.generation_channel.send(
                                 f"✨ Final Result\nPrompt: {self.last_prompt}", 
                                 file=final_file
                             )
-                            os.remove(temp_filename)
                             
                             await self.current_thread.send("❤️ Final result posted in main channel.")
+                            await self.send_contact_sheet()
                             await self.current_thread.edit(archived=True, locked=True)
                             
                             # Clean up timer message
@@ -305,27 +592,51 @@ class VeistBot(commands.Bot):
                                 await self.timer_message.delete()
                                 self.timer_message = None
                                 
+                            print(f"Session {self.tracer.session_id} latency:\n{self.tracer.summary()}")
                             self.loop.create_task(self.start_new_generation())
-                            return
+                            return "completed"
                     except Exception as e:
                         await self.current_thread.send(f"Error processing early completion: {str(e)}")
-                        return
+                        return "error"
                 
                 # Check if we have any non-meta reactions
                 if not any(count > 0 for count in regular_reactions.values()):
                     await self.update_thread_message_status("⏳ Waiting for reactions...")
                     self.waiting_for_feedback = True
-                    return
+                    return "waiting"
                 
                 # Only proceed if we have actual reactions
-                prompt = self.build_next_prompt(regular_reactions)
+                with self.tracer.span("build_next_prompt", strategy=CONFIG['generation']['reaction_merging']):
+                    prompt = await self.build_next_prompt(self.merge_input(regular_reactions))
             
             # Generate image
-            result = await self.generate_with_retry(prompt)
+            with self.tracer.span("generate", backend=CONFIG['generation']['backend']):
+                result = await self.generate_with_retry(prompt, self.variation_quality)
+            
+            if result.get("status") == "unavailable":
+                await self.update_timer_message(
+                    f"⏸️ Image backend unavailable, next attempt in {result['retry_after']:.0f} seconds"
+                )
+                return "unavailable"
             
             if "error" in result:
                 await self.generation_channel.send(f"Error generating image: {result['error']}")
-                return
+                return "error"
+            
+            # Regenerate near-duplicates of earlier outputs instead of posting them
+            regenerations = 0
+            while (CONFIG['dedup']['enabled'] and "duplicate_of" in result
+                   and regenerations < CONFIG['dedup']['max_regenerations']):
+                if CONFIG['display']['debug_output']:
+                    print(f"Near-duplicate of {result['duplicate_of']} (distance {result['hash_distance']}), regenerating...")
+                regenerations += 1
+                with self.tracer.span("generate", backend=CONFIG['generation']['backend'], regeneration=True):
+                    retry_result = await self.generate_with_retry(prompt, self.variation_quality)
+                if "error" in retry_result:
+                    break
+                # Later outputs must not be checked against the one thrown away
+                (self.generator_for(result.get('backend')) or self.generator).discard(result['path'])
+                result = retry_result
 
             if not self.current_thread:
                 # Initial post and thread creation
@@ -339,7 +650,10 @@ class VeistBot(commands.Bot):
                     name="Variations",
                     auto_archive_duration=THREAD_ARCHIVE_DURATION
                 )
+                self.tracer.start_session(self.current_thread.id)
                 self.variation_count = 0
+                if CONFIG['contact_sheet']['enabled']:
+                    self.contact_sheet = ContactSheet.from_config(CONFIG['contact_sheet'])
                 
                 # Post initial image with status below
                 message_content = f"Initial variation"
@@ -347,10 +661,10 @@ class VeistBot(commands.Bot):
                     message_content += f"\nPrompt: {result['prompt']}"
                 message_content += "\n\n🔄 Collecting feedback..."
                 
-                thread_file = discord.File(result["path"])
-                self.last_thread_message = await self.current_thread.send(
-                    message_content, 
-                    file=thread_file
+                self.last_thread_message = await self.send_image(
+                    self.current_thread,
+                    message_content,
+                    result["path"]
                 )
                 
                 # Post current version
@@ -358,10 +672,10 @@ class VeistBot(commands.Bot):
                 if CONFIG['display']['prompt_visibility'] == "Full":
                     current_version_content += f"\nPrompt: {result['prompt']}"
                 
-                current_file = discord.File(result["path"])
-                self.current_version_message = await self.generation_channel.send(
+                self.current_version_message = await self.send_image(
+                    self.generation_channel,
                     current_version_content,
-                    file=current_file
+                    result["path"]
                 )
             else:
                 # Clear status from previous message
@@ -383,43 +697,98 @@ class VeistBot(commands.Bot):
                     message_content += f"\nPrompt: {result['prompt']}"
                 message_content += "\n\n🔄 Collecting feedback..."
                 
-                thread_file = discord.File(result["path"])
-                self.last_thread_message = await self.current_thread.send(
+                self.last_thread_message = await self.send_image(
+                    self.current_thread,
                     message_content,
-                    file=thread_file
+                    result["path"]
                 )
                 
                 # Update current version
-                await self.current_version_message.delete()
+                with self.tracer.span("current_version_delete"):
+                    await self.current_version_message.delete()
                 current_version_content = f"💫 Current Version"
                 if CONFIG['display']['prompt_visibility'] == "Full":
                     current_version_content += f"\nPrompt: {result['prompt']}"
                 
-                current_file = discord.File(result["path"])
-                self.current_version_message = await self.generation_channel.send(
+                self.current_version_message = await self.send_image(
+                    self.generation_channel,
                     current_version_content,
-                    file=current_file
+                    result["path"]
                 )
 
             # Add reactions
-            for reaction in self.META_REACTIONS:
-                await self.last_thread_message.add_reaction(reaction)
+            with self.tracer.span("add_reactions", count=len(self.META_REACTIONS)):
+                for reaction in self.META_REACTIONS:
+                    await self.last_thread_message.add_reaction(reaction)
 
             self.last_prompt = result['prompt']
+            self.last_image_path = result['path']
+            self.last_quality = result.get('quality')
+            self.last_seed = result.get('seed')
+            self.last_backend = result.get('backend')
             self.variation_count += 1
             
+            if CONFIG['display']['debug_output']:
+                print(f"Preview uploads: {self.previews.stats.summary()}")
+            
+            # Add the new variation to the session summary
+            if self.contact_sheet is not None:
+                with self.tracer.span("contact_sheet"):
+                    await self.loop.run_in_executor(None, self.contact_sheet.add, result["path"])
+            
             # No more check for max variations - removed
 
             # Clean up timer message when generating a new image
             if self.timer_message:
                 await self.timer_message.delete()
                 self.timer_message = None
+            
+            return "generated"
 
         except Exception as e:
             await self.generation_channel.send(f"Error during generation: {str(e)}")
+            return "error"
         finally:
             self.is_generating = False
 
+    async def send_image(self, channel, content, image_path):
+        """Post an image as the channel's configured preview rendition"""
+        # Threads use their parent channel's preview settings
+        channel_name = channel.parent.name if isinstance(channel, discord.Thread) else channel.name
+        with self.tracer.span("render_preview", channel=channel_name):
+            data, filename, original_size = await self.loop.run_in_executor(
+                None,
+                self.previews.render,
+                image_path,
+                Path(image_path).stem,
+                channel_name
+            )
+        
+        with self.tracer.span("upload", channel=channel_name, bytes=len(data)):
+            start = time.perf_counter()
+            message = await channel.send(content, file=discord.File(io.BytesIO(data), filename=filename))
+            self.previews.stats.record_upload(original_size, len(data), time.perf_counter() - start)
+        return message
+
+    async def send_contact_sheet(self):
+        """Post the session summary of all variations to the current thread"""
+        if not self.contact_sheet or not len(self.contact_sheet):
+            return
+        
+        try:
+            data, extension = await self.loop.run_in_executor(
+                None,
+                self.contact_sheet.export,
+                CONFIG['contact_sheet']['export']
+            )
+            sheet_file = discord.File(io.BytesIO(data), filename=f"evolution_summary.{extension}")
+            await self.current_thread.send(
+                f"🎞️ Evolution summary ({len(self.contact_sheet)} variations)",
+                file=sheet_file
+            )
+        except Exception as e:
+            print(f"Error sending contact sheet: {e}")
+
     @tasks.loop(seconds=60)  # Default interval, will be changed in setup_hook
     async def generate_loop(self):
         """Main generation loop"""
@@ -430,6 +799,19 @@ class VeistBot(commands.Bot):
             await self.start_new_generation()
         else:
             await self.generate_and_send()
+        
+        if self.profiles:
+            await self.loop.run_in_executor(None, self.profiles.flush)
+        if self.lexicon:
+            # Also picks up interpretations veist_bot.py has learned since the last cycle
+            await self.loop.run_in_executor(None, self.lexicon.flush)
+        
+        # Stretch the interval while the primary backend's budget runs low
+        interval = CONFIG['generation']['seconds_per_variation']
+        if self.governor.degraded(self.generator.provider):
+            interval *= CONFIG['governor']['slowdown_factor']
+        if self.generate_loop.seconds != interval:
+            self.generate_loop.change_interval(seconds=interval)
             
     @generate_loop.before_loop
     async def before_generate_loop(self):
@@ -489,7 +871,7 @@ class VeistBot(commands.Bot):
             return
             
         # Calculate progress (0.0 to 1.0)
-        interval = CONFIG['generation']['seconds_per_variation']
+        interval = self.generate_loop.seconds
         progress = 1.0 - (time_left.total_seconds() / interval)
         
         # Create progress bar
@@ -523,7 +905,7 @@ class VeistBot(commands.Bot):
 
     async def on_reaction_add(self, reaction, user):
         """Handle reactions"""
-        if user.bot:
+        if user == self.user:
             return
             
         message = reaction.message
@@ -535,9 +917,37 @@ class VeistBot(commands.Bot):
         # Only process reactions to our own messages
         if message.author != self.user:
             return
+
+        emoji = str(reaction.emoji)
+        self.note_reactor(message.id, user, emoji)
+        if user.bot:
+            return
             
         if CONFIG['display']['debug_output']:
             print(f"Reaction in thread: {reaction.emoji}")
+        
+        if self.profiles and emoji not in self.META_REACTIONS:
+            self.profiles.record([user_key(user.id), channel_key(message.channel.parent_id)], emoji)
+
+    def note_reactor(self, message_id, user, emoji):
+        """Remember who reacted to the last thread message; other bots' reactions are ShadowBot's replay"""
+        if not self.last_thread_message or message_id != self.last_thread_message.id:
+            return
+        if message_id != self.reactors_message_id:
+            self.reactors_message_id = message_id
+            self.current_reactors = set()
+            self.replayed_reactions = {}
+        if user.bot:
+            self.replayed_reactions[emoji] = self.replayed_reactions.get(emoji, 0) + 1
+        else:
+            self.current_reactors.add(user.id)
+
+    async def close(self):
+        if self.profiles:
+            self.profiles.flush()
+        if self.lexicon:
+            self.lexicon.close()
+        await super().close()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Run the Veist Discord bot')
@@ -0,0 +1,115 @@
+"""
+Per-backend circuit breakers and jittered exponential backoff for generation retries
+"""
+
+import random
+import threading
+import time
+from typing import Dict
+
+from metrics import BREAKER_STATE, BREAKER_TRANSITIONS
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rng=random) -> float:
+    """Exponential backoff with equal jitter: half the step plus a random share of the other half"""
+    step = min(cap, base * 2 ** attempt)
+    return step / 2 + rng.uniform(0, step / 2)
+
+
+class CircuitBreaker:
+    """Stops calls to a failing backend, then lets a single probe through once the open period ends.
+
+    Each failed probe doubles the open period up to max_reset_timeout; a
+    success closes the breaker and resets it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 max_reset_timeout: float = 600.0, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.open_timeout = reset_timeout
+        self.probe_in_flight = False
+        self.lock = threading.Lock()
+        BREAKER_STATE.labels(name).set(_STATE_VALUES[CLOSED])
+
+    @classmethod
+    def from_config(cls, name: str, config: dict) -> 'CircuitBreaker':
+        return cls(
+            name,
+            failure_threshold=config.get('failure_threshold', 5),
+            reset_timeout=config.get('reset_timeout_seconds', 30.0),
+            max_reset_timeout=config.get('max_reset_timeout_seconds', 600.0),
+        )
+
+    def _transition(self, state: str):
+        if state != self.state:
+            self.state = state
+            BREAKER_STATE.labels(self.name).set(_STATE_VALUES[state])
+            BREAKER_TRANSITIONS.labels(self.name, state).inc()
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (claims the probe slot when half-open)"""
+        with self.lock:
+            if self.state == OPEN and self.clock() - self.opened_at >= self.open_timeout:
+                self._transition(HALF_OPEN)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            return False
+
+    def release(self):
+        """Give back a probe slot claimed by allow() for a call that never went out"""
+        with self.lock:
+            self.probe_in_flight = False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.probe_in_flight = False
+            self.open_timeout = self.reset_timeout
+            self._transition(CLOSED)
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                self.open_timeout = min(self.open_timeout * 2, self.max_reset_timeout)
+                self._open()
+            elif self.state == CLOSED and self.failures >= self.failure_threshold:
+                self._open()
+            self.probe_in_flight = False
+
+    def _open(self):
+        self.opened_at = self.clock()
+        self._transition(OPEN)
+
+    def retry_after(self) -> float:
+        """Seconds until the next probe is allowed"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.open_timeout - self.clock())
+
+
+# Shared by every session in the process, keyed by backend
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def breaker_for(backend: str, config: dict) -> CircuitBreaker:
+    breaker = _breakers.get(backend)
+    if breaker is None:
+        breaker = _breakers[backend] = CircuitBreaker.from_config(backend, config)
+    return breaker
@@ -0,0 +1,164 @@
+"""
+Side-by-side comparison renderer for evolution posts
+"""
+
+import asyncio
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+logger = logging.getLogger('veist_bot')
+
+
+@lru_cache(maxsize=None)
+def load_font(size: int):
+    """Load a label font once per size instead of on every render"""
+    try:
+        return ImageFont.truetype("Arial.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+class ComparisonRenderer:
+    """Renders "Previous Version" / "New Version" comparison images.
+
+    The previous image of an evolution is always the new image of the one
+    before it, so the decoded new image is kept and reused as the next old
+    image. Canvases are reused per layout and encoding skips optimize passes.
+    Rendering runs on a single worker thread so it never blocks the event loop.
+    """
+
+    FORMATS = {"PNG": "png", "WEBP": "webp", "JPEG": "jpg"}
+
+    def __init__(self, format: str = "PNG", compress_level: int = 1, quality: int = 85,
+                 padding: int = 20, text_height: int = 100):
+        self.format = format.upper()
+        if self.format not in self.FORMATS:
+            raise ValueError(f"Unknown comparison format: {format}")
+        self.compress_level = compress_level
+        self.quality = quality
+        self.padding = padding
+        self.text_height = text_height
+
+        self.font = load_font(16)
+        self.title_font = load_font(20)
+
+        # Last decoded image, keyed by its encoded bytes
+        self._cached_bytes: Optional[bytes] = None
+        self._cached_image: Optional[Image.Image] = None
+        # Canvases keyed by (width, height)
+        self._canvases: Dict[Tuple[int, int], Image.Image] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="comparison")
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'ComparisonRenderer':
+        return cls(
+            format=config.get('format', 'PNG'),
+            compress_level=config.get('compress_level', 1),
+            quality=config.get('quality', 85),
+        )
+
+    @property
+    def extension(self) -> str:
+        return self.FORMATS[self.format]
+
+    def _decode(self, image_bytes: bytes) -> Image.Image:
+        """Decode image bytes, reusing the cached image when the bytes match"""
+        if self._cached_bytes is not None and (
+                image_bytes is self._cached_bytes or image_bytes == self._cached_bytes):
+            return self._cached_image
+
+        image = Image.open(io.BytesIO(image_bytes))
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        else:
+            image.load()
+        return image
+
+    def _fit_height(self, image: Image.Image, height: int) -> Image.Image:
+        if image.height == height:
+            return image
+        width = int(image.width * height / image.height)
+        return image.resize((width, height), Image.Resampling.LANCZOS)
+
+    def _canvas(self, size: Tuple[int, int], split_x: int) -> Image.Image:
+        canvas = self._canvases.get(size)
+        if canvas is None:
+            canvas = Image.new('RGB', size, 'white')
+            self._canvases[size] = canvas
+        else:
+            # The image areas get pasted over; only clear the label strip and gutters
+            width, height = size
+            top = self.text_height + self.padding
+            for box in ((0, 0, width, top),
+                        (0, top, self.padding, height),
+                        (split_x - self.padding, top, split_x, height),
+                        (width - self.padding, top, width, height),
+                        (0, height - self.padding, width, height)):
+                canvas.paste('white', box)
+        return canvas
+
+    def _encode(self, image: Image.Image) -> bytes:
+        output = io.BytesIO()
+        if self.format == "PNG":
+            image.save(output, format='PNG', optimize=False, compress_level=self.compress_level)
+        elif self.format == "WEBP":
+            image.save(output, format='WEBP', quality=self.quality, method=0)
+        else:
+            image.save(output, format='JPEG', quality=self.quality, optimize=False)
+        return output.getvalue()
+
+    def render(self, old_image_bytes: bytes, new_image_bytes: bytes,
+               feedback_str: str, interpretation: Optional[str] = None) -> Optional[bytes]:
+        """Combine old and new images side by side with labels"""
+        try:
+            old_img = self._decode(old_image_bytes)
+            new_img = self._decode(new_image_bytes)
+
+            # Remember the new image - it is the old image of the next evolution
+            self._cached_bytes = new_image_bytes
+            self._cached_image = new_img
+
+            # Make images same height
+            height = min(old_img.height, new_img.height)
+            old_img = self._fit_height(old_img, height)
+            new_img = self._fit_height(new_img, height)
+
+            padding = self.padding
+            combined_width = old_img.width + new_img.width + padding * 3
+            combined_height = height + self.text_height + padding * 2
+            combined = self._canvas((combined_width, combined_height), old_img.width + padding * 2)
+
+            # Paste images
+            combined.paste(old_img, (padding, self.text_height + padding))
+            combined.paste(new_img, (old_img.width + padding * 2, self.text_height + padding))
+
+            # Add labels
+            draw = ImageDraw.Draw(combined)
+            draw.text((padding, 10), "Previous Version", fill='black', font=self.title_font)
+            draw.text((old_img.width + padding * 2, 10), "New Version", fill='black', font=self.title_font)
+
+            # Add feedback info
+            feedback_text = f"Applied: {feedback_str}"
+            if interpretation:
+                feedback_text += f"\nInterpretation: {interpretation}"
+            draw.text((padding, 40), feedback_text, fill='gray', font=self.font)
+
+            return self._encode(combined)
+
+        except Exception as e:
+            logger.error(f"Failed to combine images: {e}")
+            return None
+
+    async def render_async(self, old_image_bytes: bytes, new_image_bytes: bytes,
+                           feedback_str: str, interpretation: Optional[str] = None) -> Optional[bytes]:
+        """Render on the worker thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self.render,
+            old_image_bytes, new_image_bytes, feedback_str, interpretation
+        )
@@ -0,0 +1,139 @@
+"""
+Incremental contact sheet / filmstrip for an evolution session
+"""
+
+import io
+from pathlib import Path
+from typing import List, Tuple, Union
+
+from PIL import Image, ImageDraw
+
+from comparison import load_font
+
+ImageSource = Union[str, Path, bytes, Image.Image]
+
+
+class ContactSheet:
+    """Running tiled canvas of every variation in a session.
+
+    Each add() decodes only the new image (at reduced scale where the format
+    allows it), thumbnails it into the next free cell and keeps the cell as an
+    animation frame. The canvas grows by doubling its row capacity, so adding
+    a variation is amortized O(1) and exporting never touches earlier files.
+    """
+
+    def __init__(self, columns: int = 5, cell_size: Tuple[int, int] = (256, 256),
+                 padding: int = 4, label: bool = True, background: str = 'white'):
+        self.columns = columns
+        self.cell_width, self.cell_height = cell_size
+        self.padding = padding
+        self.label = label
+        self.background = background
+        self.font = load_font(14)
+
+        self.frames: List[Image.Image] = []
+        self._row_capacity = 0
+        self._canvas = None
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'ContactSheet':
+        cell_size = config.get('cell_size', [256, 256])
+        return cls(
+            columns=config.get('columns', 5),
+            cell_size=(cell_size[0], cell_size[1]),
+        )
+
+    def _load(self, source: ImageSource) -> Image.Image:
+        if isinstance(source, Image.Image):
+            return source
+        if isinstance(source, bytes):
+            image = Image.open(io.BytesIO(source))
+        else:
+            image = Image.open(source)
+        # Let JPEG decode at a reduced scale - we only need a thumbnail
+        image.draft('RGB', (self.cell_width, self.cell_height))
+        return image
+
+    def _make_cell(self, source: ImageSource) -> Image.Image:
+        image = self._load(source)
+        # Don't shrink an image the caller still holds
+        thumb = image.copy() if image is source else image
+        if thumb.mode != 'RGB':
+            thumb = thumb.convert('RGB')
+        thumb.thumbnail((self.cell_width, self.cell_height), Image.Resampling.BILINEAR)
+
+        cell = Image.new('RGB', (self.cell_width, self.cell_height), self.background)
+        cell.paste(thumb, ((self.cell_width - thumb.width) // 2, (self.cell_height - thumb.height) // 2))
+        if self.label:
+            ImageDraw.Draw(cell).text((6, 4), str(len(self.frames) + 1), fill='white',
+                                      font=self.font, stroke_width=2, stroke_fill='black')
+        return cell
+
+    def _cell_origin(self, index: int) -> Tuple[int, int]:
+        row, col = divmod(index, self.columns)
+        return (self.padding + col * (self.cell_width + self.padding),
+                self.padding + row * (self.cell_height + self.padding))
+
+    def _canvas_size(self, rows: int) -> Tuple[int, int]:
+        return (self.padding + self.columns * (self.cell_width + self.padding),
+                self.padding + rows * (self.cell_height + self.padding))
+
+    def _ensure_capacity(self, rows: int):
+        if rows <= self._row_capacity:
+            return
+        new_capacity = max(rows, self._row_capacity * 2, 1)
+        canvas = Image.new('RGB', self._canvas_size(new_capacity), self.background)
+        if self._canvas is not None:
+            canvas.paste(self._canvas, (0, 0))
+        self._canvas = canvas
+        self._row_capacity = new_capacity
+
+    def add(self, source: ImageSource) -> int:
+        """Append a variation, returns its 1-based position in the sheet"""
+        cell = self._make_cell(source)
+        index = len(self.frames)
+        self._ensure_capacity(index // self.columns + 1)
+        self._canvas.paste(cell, self._cell_origin(index))
+        self.frames.append(cell)
+        return index + 1
+
+    def grid(self) -> Image.Image:
+        """The tiled sheet trimmed to the rows in use"""
+        if not self.frames:
+            raise ValueError("Contact sheet is empty")
+        rows = (len(self.frames) - 1) // self.columns + 1
+        return self._canvas.crop((0, 0) + self._canvas_size(rows))
+
+    def export_grid(self, format: str = 'PNG') -> bytes:
+        output = io.BytesIO()
+        self.grid().save(output, format=format)
+        return output.getvalue()
+
+    def export_animation(self, format: str = 'WEBP', frame_ms: int = 600) -> bytes:
+        """Animated filmstrip built from the stored frames"""
+        if not self.frames:
+            raise ValueError("Contact sheet is empty")
+        output = io.BytesIO()
+        self.frames[0].save(
+            output,
+            format=format,
+            save_all=True,
+            append_images=self.frames[1:],
+            duration=frame_ms,
+            loop=0,
+        )
+        return output.getvalue()
+
+    def export(self, kind: str = 'grid') -> Tuple[bytes, str]:
+        """Export as 'grid', 'webp' or 'gif', returns (data, file extension)"""
+        kind = kind.lower()
+        if kind == 'grid':
+            return self.export_grid(), 'png'
+        if kind == 'webp':
+            return self.export_animation('WEBP'), 'webp'
+        if kind == 'gif':
+            return self.export_animation('GIF'), 'gif'
+        raise ValueError(f"Unknown contact sheet export: {kind}")
@@ -0,0 +1,206 @@
+"""
+Learned emoji -> interpretation table, persisted in SQLite and cached in memory
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+DEFAULT_DB_PATH = Path(__file__).parent / "emoji_lexicon.sqlite"
+
+# The table process_feedback used to hard-code
+SEED_ENTRIES = {
+    "🎦": "cinematic",
+    "📷": "photorealistic",
+}
+
+# "<emoji>: interpretation", where the emoji may be a custom <:name:id>
+ENTRY_PATTERN = re.compile(r"^\s*[-*]?\s*(<a?:\w+:\d+>|[^\w\s:]{1,8})\s*:\s*(.+?)\s*$")
+
+
+def parse_interpretations(text: str) -> Dict[str, str]:
+    """Table entries from a model's "<emoji>: interpretation" reply, one per line"""
+    entries = {}
+    for line in (text or "").splitlines():
+        match = ENTRY_PATTERN.match(line)
+        if match:
+            interpretation = match.group(2).strip(" .`*")
+            # A few words at most, longer text is explanation rather than an entry
+            if interpretation and len(interpretation.split()) <= 6:
+                entries[match.group(1)] = interpretation
+    return entries
+
+
+class LexiconEntry:
+    __slots__ = ("interpretation", "confidence", "uses")
+
+    def __init__(self, interpretation: str, confidence: float, uses: int = 0):
+        self.interpretation = interpretation
+        self.confidence = confidence
+        self.uses = uses
+
+
+class EmojiLexicon:
+    """Emoji interpretations with a confidence that grows each time users accept them.
+
+    Entries at or above min_confidence go into evolution prompts; entries at
+    or above merge_confidence are trusted to translate emoji locally, so a
+    merge whose reactions are all covered can skip the LLM. Reads come from
+    the in-memory cache. bot.py and veist_bot.py share the database, so
+    accept/reject update the stored rows rather than the cache, and flush
+    adds use counts to the stored ones and re-reads the table.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, min_confidence: float = 0.5, merge_confidence: float = 0.75,
+                 learning_rate: float = 0.3):
+        self.db_path = str(db_path or DEFAULT_DB_PATH)
+        self.min_confidence = min_confidence
+        self.merge_confidence = merge_confidence
+        self.learning_rate = learning_rate
+        self._lock = threading.Lock()
+        # Transactions are explicit so read-modify-write runs under one write lock
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS lexicon (
+                emoji TEXT PRIMARY KEY,
+                interpretation TEXT NOT NULL,
+                confidence REAL NOT NULL,
+                uses INTEGER NOT NULL,
+                updated REAL NOT NULL
+            )
+        """)
+        if self._conn.execute("SELECT COUNT(*) FROM lexicon").fetchone()[0] == 0:
+            now = time.time()
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO lexicon (emoji, interpretation, confidence, uses, updated) VALUES (?, ?, 1.0, 0, ?)",
+                [(emoji, text, now) for emoji, text in SEED_ENTRIES.items()]
+            )
+        # emoji -> uses since the last flush, added to the stored count instead of overwriting it
+        self._pending_uses: Dict[str, int] = {}
+        self.entries: Dict[str, LexiconEntry] = {}
+        self.reload()
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'EmojiLexicon':
+        return cls(
+            db_path=config.get('path'),
+            min_confidence=config.get('min_confidence', 0.5),
+            merge_confidence=config.get('merge_confidence', 0.75),
+            learning_rate=config.get('learning_rate', 0.3),
+        )
+
+    def reload(self):
+        """Re-read the table, picking up what other processes have learned"""
+        with self._lock:
+            self.entries = {
+                emoji: LexiconEntry(interpretation, confidence, uses + self._pending_uses.get(emoji, 0))
+                for emoji, interpretation, confidence, uses in self._conn.execute(
+                    "SELECT emoji, interpretation, confidence, uses FROM lexicon"
+                )
+            }
+
+    def _judge(self, interpretations: Dict[str, str], update: Callable):
+        """Apply update(stored entry or None, interpretation) to each emoji's stored row in one transaction"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                for emoji, interpretation in interpretations.items():
+                    row = self._conn.execute(
+                        "SELECT interpretation, confidence, uses FROM lexicon WHERE emoji = ?", (emoji,)
+                    ).fetchone()
+                    entry = update(LexiconEntry(*row) if row else None, interpretation)
+                    if entry is None:
+                        continue
+                    self._conn.execute(
+                        "INSERT INTO lexicon (emoji, interpretation, confidence, uses, updated) VALUES (?, ?, ?, 0, ?) "
+                        "ON CONFLICT(emoji) DO UPDATE SET interpretation = excluded.interpretation, "
+                        "confidence = excluded.confidence, updated = excluded.updated",
+                        (emoji, entry.interpretation, entry.confidence, now)
+                    )
+                    entry.uses += self._pending_uses.get(emoji, 0)
+                    self.entries[emoji] = entry
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _accepted(self, entry: Optional[LexiconEntry], interpretation: str) -> LexiconEntry:
+        if entry is None:
+            return LexiconEntry(interpretation, 0.5)
+        if entry.interpretation.lower() == interpretation.lower():
+            entry.confidence += (1 - entry.confidence) * self.learning_rate
+        else:
+            # A competing reading wins once the old one has lost enough support
+            entry.confidence *= 1 - self.learning_rate
+            if entry.confidence < 0.5:
+                entry.interpretation, entry.confidence = interpretation, 0.5
+        return entry
+
+    def _rejected(self, entry: Optional[LexiconEntry], interpretation: str) -> Optional[LexiconEntry]:
+        if entry is None or entry.interpretation.lower() != interpretation.lower():
+            return None
+        entry.confidence *= 1 - self.learning_rate
+        return entry
+
+    def accept(self, interpretations: Dict[str, str]):
+        """Users kept an evolution made with these interpretations"""
+        self._judge(interpretations, self._accepted)
+
+    def reject(self, interpretations: Dict[str, str]):
+        """Users went back on an evolution made with these interpretations"""
+        self._judge(interpretations, self._rejected)
+
+    def _count_use(self, emoji: str, entry: LexiconEntry):
+        with self._lock:
+            entry.uses += 1
+            self._pending_uses[emoji] = self._pending_uses.get(emoji, 0) + 1
+
+    def lookup(self, emoji: str, min_confidence: Optional[float] = None) -> Optional[str]:
+        entry = self.entries.get(emoji)
+        threshold = self.merge_confidence if min_confidence is None else min_confidence
+        if entry is None or entry.confidence < threshold:
+            return None
+        self._count_use(emoji, entry)
+        return entry.interpretation
+
+    def covers(self, emojis: Iterable[str]) -> bool:
+        """Whether every emoji can be translated locally"""
+        return all(
+            emoji in self.entries and self.entries[emoji].confidence >= self.merge_confidence for emoji in emojis
+        )
+
+    def format_table(self, emojis: Iterable[str] = (), limit: int = 12) -> str:
+        """Compact "<emoji>: interpretation" lines for a prompt, the given emojis first"""
+        entries = self.entries
+        wanted = [emoji for emoji in emojis if emoji in entries]
+        ranked = sorted(entries, key=lambda e: (entries[e].confidence, entries[e].uses), reverse=True)
+        lines = []
+        for emoji in dict.fromkeys(wanted + ranked):
+            entry = entries[emoji]
+            if entry.confidence >= self.min_confidence:
+                self._count_use(emoji, entry)
+                lines.append(f"{emoji}: {entry.interpretation}")
+            if len(lines) >= limit:
+                break
+        return "\n".join(lines)
+
+    def flush(self):
+        """Add the uses counted since the last flush to the stored counts, then pick up other processes' changes"""
+        with self._lock:
+            pending, self._pending_uses = self._pending_uses, {}
+            if pending:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.executemany(
+                    "UPDATE lexicon SET uses = uses + ? WHERE emoji = ?",
+                    [(uses, emoji) for emoji, uses in pending.items()]
+                )
+                self._conn.execute("COMMIT")
+        self.reload()
+
+    def close(self):
+        self.flush()
+        self._conn.close()
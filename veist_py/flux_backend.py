@@ -0,0 +1,109 @@
+"""
+Local FLUX.1-schnell rendering with per-host profiles (GPU defaults, CPU draft resolution and tuning)
+"""
+
+import os
+from typing import Optional
+
+from PIL import Image
+
+DEFAULT_MODEL = "black-forest-labs/FLUX.1-schnell"
+
+# Used for any setting a profile leaves out; matches what the flux backend always did
+PROFILE_DEFAULTS = {
+    'device': None,
+    'dtype': "bfloat16",
+    'width': 1344,
+    'height': 768,
+    'steps': 4,
+    'max_sequence_length': 256,
+    'offload': None,
+    'attention_slicing': False,
+    'vae_tiling': False,
+    'compile': False,
+    'threads': None,
+    'upscale': False,
+}
+
+
+def resolve_profile(config: dict, cuda_available: bool) -> dict:
+    """Settings of the configured profile ("auto" picks gpu or cpu by host) over the defaults"""
+    name = config.get('profile', "auto")
+    if name == "auto":
+        name = "gpu" if cuda_available else "cpu"
+    profiles = config.get('profiles') or {}
+    if name not in profiles and name != "gpu":
+        raise ValueError(f"Unknown flux profile: {name}")
+    return {**PROFILE_DEFAULTS, **(profiles.get(name) or {}), 'name': name}
+
+
+class FluxRenderer:
+    """FluxPipeline set up from a profile.
+
+    The CPU profile renders a reduced draft resolution with fewer T5 tokens,
+    slices attention and tiles the VAE to cap peak memory, pins torch to the
+    configured thread count and can Lanczos-upscale back to full size.
+    Offloading ("model" or "sequential") only applies with CUDA, where it
+    trades speed for GPU memory.
+    """
+
+    def __init__(self, profile: dict, model: str = DEFAULT_MODEL):
+        # Local weights are optional, only import the GPU stack when used
+        import torch
+        from diffusers import FluxPipeline
+        self.torch = torch
+        self.profile = profile
+        self.model = model
+
+        # A profile can pin itself to the CPU; otherwise CUDA is used when present
+        use_cuda = profile['device'] != "cpu" and torch.cuda.is_available()
+        if profile['threads']:
+            torch.set_num_threads(profile['threads'])
+        elif not use_cuda:
+            # Hyperthreads slow down the matmuls, one thread per physical core is the usual sweet spot
+            torch.set_num_threads(max(1, (os.cpu_count() or 2) // 2))
+
+        self.pipe = FluxPipeline.from_pretrained(model, torch_dtype=getattr(torch, profile['dtype']))
+        self.device = "cpu"
+        if use_cuda:
+            if profile['offload'] == "model":
+                self.pipe.enable_model_cpu_offload()
+            elif profile['offload'] == "sequential":
+                self.pipe.enable_sequential_cpu_offload()
+            else:
+                self.pipe = self.pipe.to("cuda:0")
+                self.device = "cuda:0"
+
+        if profile['attention_slicing']:
+            try:
+                self.pipe.enable_attention_slicing()
+            except Exception as e:
+                print(f"Attention slicing not supported by this pipeline: {e}")
+        if profile['vae_tiling']:
+            self.pipe.vae.enable_slicing()
+            self.pipe.vae.enable_tiling()
+        if profile['compile']:
+            self.pipe.transformer = torch.compile(self.pipe.transformer)
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'FluxRenderer':
+        import torch
+        return cls(resolve_profile(config, torch.cuda.is_available()), config.get('model', DEFAULT_MODEL))
+
+    def render(self, prompt: str, seed: Optional[int] = None, **overrides) -> Image.Image:
+        """Render with the profile's settings, any of which overrides replaces (draft renders)"""
+        profile = {**self.profile, **overrides}
+        generator = self.torch.Generator("cpu").manual_seed(seed) if seed is not None else None
+        with self.torch.inference_mode():
+            image = self.pipe(
+                prompt,
+                width=profile['width'],
+                height=profile['height'],
+                guidance_scale=0.0,
+                num_inference_steps=profile['steps'],
+                max_sequence_length=profile['max_sequence_length'],
+                generator=generator,
+            ).images[0]
+        if profile['upscale']:
+            image = image.resize((PROFILE_DEFAULTS['width'], PROFILE_DEFAULTS['height']), Image.Resampling.LANCZOS)
+        return image
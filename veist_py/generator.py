@@ -1,52 +1,69 @@
 from huggingface_hub import InferenceClient
 import os
+import random
 from PIL import Image
 from io import BytesIO
 from dotenv import load_dotenv
 from pathlib import Path
 from typing import Dict, List
 from datetime import datetime
-import torch
-from diffusers import FluxPipeline
 import replicate
 import requests
+from phash_index import OutputIndex, index_for
+from procedural import ProceduralBackend
+from flux_backend import FluxRenderer
+from metrics import BACKEND_LATENCY
 
 # Load environment variables
 load_dotenv()
 
+# Quality ladder rungs: cheap drafts while users vote, full quality for the final result
+DRAFT = "draft"
+FINAL = "final"
+
 class VeistGenerator:
-    def __init__(self, backend='huggingface', debug=False):
+    def __init__(self, backend='huggingface', debug=False, dedup_distance=6, output_dir=None,
+                 procedural_config=None, flux_config=None, draft_config=None, index: OutputIndex = None):
         self.active = False
         self.gen_type = 'none'
         self.gen_interval = 30  # seconds
         self.current_prompt = ""
         self.backend = backend
         self.debug = debug
+        # Paid provider the cost governor meters this backend under (None for local backends)
+        self.provider = None
+        # Backend settings overridden for draft renders (resolution, steps, ...)
+        self.draft_settings = draft_config or {}
         
         # Initialize the appropriate backend
         if backend == 'huggingface':
             hf_token = os.getenv('HF_TOKEN')
             self.client = InferenceClient(token=hf_token) if hf_token else None
             self.model = "stabilityai/stable-diffusion-xl-base-1.0"
+            self.provider = "huggingface"
         elif backend == 'flux':
-            self.pipe = FluxPipeline.from_pretrained(
-                "black-forest-labs/FLUX.1-schnell",
-                torch_dtype=torch.bfloat16
-            )
-            if torch.cuda.is_available():
-                self.pipe = self.pipe.to("cuda:0")
-            self.model = "black-forest-labs/FLUX.1-schnell"
+            # Profile picks GPU or CPU settings; torch is only imported inside FluxRenderer
+            self.flux = FluxRenderer.from_config(flux_config or {})
+            self.model = self.flux.model
         elif backend == 'replicate_flux_schnell':
             # Check if REPLICATE_API_TOKEN is set
             if not os.getenv('REPLICATE_API_TOKEN'):
                 raise ValueError("REPLICATE_API_TOKEN not set in environment variables")
             self.model = "black-forest-labs/flux-schnell"
+            self.provider = "replicate"
+        elif backend == 'procedural':
+            # Offline stand-in for load testing, no network or weights needed
+            self.procedural = ProceduralBackend.from_config(procedural_config or {})
+            self.model = "procedural"
         else:
             raise ValueError(f"Unknown backend: {backend}")
         
         # Ensure outputs directory exists
-        self.output_dir = Path(__file__).parent / "outputs"
-        self.output_dir.mkdir(exist_ok=True)
+        self.output_dir = Path(output_dir) if output_dir else Path(__file__).parent / "outputs"
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Perceptual-hash index for near-duplicate detection, shared with other generators saving here
+        self.index = index or index_for(self.output_dir, max_distance=dedup_distance)
         
         # Add reaction tracking
         self.reactions: Dict[str, List[str]] = {}  # image_path -> list of reactions
@@ -81,43 +98,32 @@ class VeistGenerator:
         reaction_text = ", ".join(recent_reactions)
         return f"Based on reactions: {reaction_text}"
     
-    def generate_image(self, prompt: str = None) -> dict:
-        """Generate image with optional reaction-based enhancement"""
-        if not self.active:
-            return {"error": "Generator is not active"}
-            
-        if self.backend == 'huggingface' and not self.client:
-            return {"error": "HF_TOKEN not set"}
+    def build_prompt(self, prompt: str = None) -> str:
+        """Full prompt for a generation, with reaction context in reaction mode"""
+        # Use the provided prompt or current_prompt
+        base_prompt = prompt or self.current_prompt or "a beautiful landscape"
         
-        try:
-            # Use the provided prompt or current_prompt
-            base_prompt = prompt or self.current_prompt or "a beautiful landscape"
-            
-            # Add reaction context if in reaction mode
-            if self.gen_type == 'reaction':
-                reaction_context = self.get_reaction_prompt()
-                full_prompt = f"{base_prompt}. {reaction_context}".strip()
-            else:
-                full_prompt = base_prompt
-            
-            if self.debug:
-                print(f"Generating {self.backend} image with full prompt: {full_prompt}")
-            
-            # Generate image using the appropriate backend
+        # Add reaction context if in reaction mode
+        if self.gen_type == 'reaction':
+            reaction_context = self.get_reaction_prompt()
+            return f"{base_prompt}. {reaction_context}".strip()
+        return base_prompt
+    
+    def render(self, full_prompt: str, quality: str = FINAL, seed: int = None) -> Image.Image:
+        """Generate an image for the prompt using the appropriate backend"""
+        overrides = self.draft_settings if quality == DRAFT else {}
+        with BACKEND_LATENCY.labels(self.backend, self.model, quality).time():
             if self.backend == 'huggingface':
-                image = self.client.text_to_image(
+                if not self.client:
+                    raise ValueError("HF_TOKEN not set")
+                return self.client.text_to_image(
                     full_prompt,
                     model=self.model,
+                    seed=seed,
+                    **overrides
                 )
             elif self.backend == 'flux':
-                image = self.pipe(
-                    full_prompt,
-                    width=1344,
-                    height=768,
-                    guidance_scale=0.0,
-                    num_inference_steps=4,
-                    max_sequence_length=256,
-                ).images[0]
+                return self.flux.render(full_prompt, seed=seed, **overrides)
             elif self.backend == 'replicate_flux_schnell':
                 # Use replicate API
                 input = {
@@ -125,7 +131,10 @@ class VeistGenerator:
                     "aspect_ratio": "16:9",
                     "output_format": "jpg",
                     "disable_safety_checker": True,
+                    **overrides
                 }
+                if seed is not None:
+                    input["seed"] = seed
                 
                 output = replicate.run(
                     "black-forest-labs/flux-schnell",
@@ -141,22 +150,69 @@ class VeistGenerator:
                     raise Exception(f"Failed to download image: {response.status_code}")
                 
                 # Convert to PIL Image
-                image = Image.open(BytesIO(response.content))
+                return Image.open(BytesIO(response.content))
+            elif self.backend == 'procedural':
+                return self.procedural.generate(full_prompt, seed=seed, **overrides)
+    
+    def save_result(self, image: Image.Image, full_prompt: str, quality: str = FINAL, seed: int = None) -> dict:
+        """Save a generated image, index it and build the result dict"""
+        # Save to a file in outputs directory with timestamp
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Quality and seed keep a final from overwriting its draft within the same second
+        output_path = self.output_dir / f"output_{timestamp}_{hash(full_prompt)}_{quality}_{seed}.jpg"
+        image.save(output_path)
+        
+        # Check against everything generated so far, then index this one
+        image_hash = self.index.hash_image(image)
+        duplicate = self.index.nearest_duplicate(image_hash)
+        self.index.add(output_path, image_hash)
+        
+        # Track this as the last generated image
+        self.last_generated = str(output_path)
+        
+        result = {
+            "type": self.gen_type,
+            "prompt": full_prompt,
+            "status": "generated",
+            "path": str(output_path),
+            "quality": quality,
+            "seed": seed,
+            "backend": self.backend
+        }
+        if duplicate:
+            result["duplicate_of"], result["hash_distance"] = duplicate
+        return result
+    
+    def discard(self, path: str):
+        """Delete an output that won't be used (a regenerated near-duplicate) and unindex it"""
+        self.index.remove(path)
+        Path(path).unlink(missing_ok=True)
+        if self.last_generated == str(path):
+            self.last_generated = None
+    
+    def generate_image(self, prompt: str = None, quality: str = FINAL, seed: int = None) -> dict:
+        """Generate image with optional reaction-based enhancement.
+        
+        The seed is recorded in the result so a draft can be re-rendered
+        as its final version; a new one is drawn when none is given.
+        """
+        if not self.active:
+            return {"error": "Generator is not active"}
             
-            # Save to a file in outputs directory with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_path = self.output_dir / f"output_{timestamp}_{hash(full_prompt)}.jpg"
-            image.save(output_path)
+        if self.backend == 'huggingface' and not self.client:
+            return {"error": "HF_TOKEN not set"}
+        
+        full_prompt = None
+        try:
+            full_prompt = self.build_prompt(prompt)
             
-            # Track this as the last generated image
-            self.last_generated = str(output_path)
+            if self.debug:
+                print(f"Generating {self.backend} image with full prompt: {full_prompt}")
             
-            return {
-                "type": self.gen_type,
-                "prompt": full_prompt,
-                "status": "generated",
-                "path": str(output_path)
-            }
+            if seed is None:
+                seed = random.randrange(2**32)
+            image = self.render(full_prompt, quality, seed)
+            return self.save_result(image, full_prompt, quality, seed)
             
         except Exception as e:
             return {
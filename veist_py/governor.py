@@ -0,0 +1,136 @@
+"""
+Token-bucket rate and spend limits shared by every paid call (image backends, mergers, publisher)
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from metrics import GOVERNOR_DECISIONS, GOVERNOR_HEADROOM
+
+
+class BudgetExceeded(Exception):
+    """A paid call was refused because its provider is out of budget"""
+
+    def __init__(self, provider: str, retry_after: float):
+        self.provider = provider
+        self.retry_after = retry_after
+        super().__init__(f"{provider} budget reached, next call allowed in {retry_after:.0f} seconds")
+
+
+class TokenBucket:
+    """Holds up to capacity tokens, refilled continuously at rate tokens per second"""
+
+    def __init__(self, capacity: float, rate: float, clock=time.monotonic):
+        self.capacity = capacity
+        self.rate = rate
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def level(self) -> float:
+        """Share of the bucket still available, 0 to 1"""
+        self._refill()
+        return self.tokens / self.capacity
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount tokens are available (inf if it exceeds the capacity)"""
+        self._refill()
+        if amount > self.capacity:
+            return float('inf')
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+    def take(self, amount: float):
+        self._refill()
+        self.tokens -= amount
+
+
+class CostGovernor:
+    """Per-provider buckets for requests per minute, images per hour and estimated daily spend.
+
+    Providers without limits are unmetered. Callers check degraded() to step
+    down (lower quality, cheaper strategy) before acquire() starts refusing.
+    """
+
+    def __init__(self, providers: Dict[str, dict], costs: Dict[str, float], low_water: float = 0.2,
+                 clock=time.monotonic):
+        self.costs = costs
+        self.low_water = low_water
+        self.lock = threading.Lock()
+        # provider -> bucket name -> (bucket, what a call consumes from it: "requests", "images" or "cost")
+        self.buckets: Dict[str, Dict[str, tuple]] = {}
+        for provider, limits in providers.items():
+            buckets = {}
+            if limits.get('requests_per_minute'):
+                rpm = limits['requests_per_minute']
+                buckets['requests_per_minute'] = (TokenBucket(rpm, rpm / 60, clock), "requests")
+            if limits.get('images_per_hour'):
+                iph = limits['images_per_hour']
+                buckets['images_per_hour'] = (TokenBucket(iph, iph / 3600, clock), "images")
+            if limits.get('daily_budget'):
+                budget = limits['daily_budget']
+                buckets['daily_budget'] = (TokenBucket(budget, budget / 86400, clock), "cost")
+            self.buckets[provider] = buckets
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'CostGovernor':
+        if not config.get('enabled', True):
+            return cls({}, {})
+        return cls(
+            config.get('providers') or {},
+            config.get('costs') or {},
+            low_water=config.get('low_water', 0.2),
+        )
+
+    def _amounts(self, kind: str, images: int) -> Dict[str, float]:
+        return {"requests": 1, "images": images, "cost": self.costs.get(kind, 0.0)}
+
+    def retry_after(self, provider: Optional[str], kind: str, images: int = 0) -> float:
+        """Seconds until a call of this kind would be allowed (0 if it is allowed now)"""
+        amounts = self._amounts(kind, images)
+        with self.lock:
+            return max(
+                (bucket.wait_time(amounts[unit]) for bucket, unit in self.buckets.get(provider, {}).values()),
+                default=0.0
+            )
+
+    def allows(self, provider: Optional[str], kind: str, images: int = 0) -> bool:
+        return self.retry_after(provider, kind, images) == 0
+
+    def acquire(self, provider: Optional[str], kind: str, images: int = 0) -> bool:
+        """Charge a call against the provider's buckets, or refuse it without charging anything"""
+        amounts = self._amounts(kind, images)
+        with self.lock:
+            buckets = self.buckets.get(provider, {})
+            allowed = all(bucket.wait_time(amounts[unit]) == 0 for bucket, unit in buckets.values())
+            if allowed:
+                for bucket, unit in buckets.values():
+                    bucket.take(amounts[unit])
+            for name, (bucket, _) in buckets.items():
+                GOVERNOR_HEADROOM.labels(provider, name).set(bucket.level())
+        GOVERNOR_DECISIONS.labels(provider or "none", kind, "allowed" if allowed else "denied").inc()
+        return allowed
+
+    def headroom(self, provider: Optional[str]) -> float:
+        """Lowest remaining share across the provider's buckets"""
+        with self.lock:
+            return min((bucket.level() for bucket, _ in self.buckets.get(provider, {}).values()), default=1.0)
+
+    def degraded(self, provider: Optional[str]) -> bool:
+        return self.headroom(provider) < self.low_water
+
+
+# One governor per process, so every session and module draws on the same budget
+_governor: Optional[CostGovernor] = None
+
+
+def governor_for(config: dict) -> CostGovernor:
+    global _governor
+    if _governor is None:
+        _governor = CostGovernor.from_config(config)
+    return _governor
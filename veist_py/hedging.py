@@ -0,0 +1,178 @@
+"""
+Hedged image generation across backends for tail-latency control
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from generator import FINAL
+from metrics import HEDGES
+from tracing import percentile
+
+
+class HedgePolicy:
+    """When to fire a secondary backend, and how many secondaries the budget allows"""
+
+    def __init__(self, quantile: float = 90, min_delay: float = 2.0, max_delay: float = 30.0,
+                 min_samples: int = 20, max_hedge_fraction: float = 0.2, max_hedges_per_hour: Optional[int] = None,
+                 window: int = 200):
+        self.quantile = quantile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.max_hedge_fraction = max_hedge_fraction
+        self.max_hedges_per_hour = max_hedges_per_hour
+        self.window = window
+        # Per backend: recent successful render latencies
+        self.latencies: Dict[str, deque] = {}
+        # Recent requests (True if a secondary fired) and hedge timestamps, for the cost caps
+        self.requests = deque(maxlen=window)
+        self.hedge_times = deque()
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'HedgePolicy':
+        return cls(
+            quantile=config.get('quantile', 90),
+            min_delay=config.get('min_delay_seconds', 2.0),
+            max_delay=config.get('max_delay_seconds', 30.0),
+            min_samples=config.get('min_samples', 20),
+            max_hedge_fraction=config.get('max_hedge_fraction', 0.2),
+            max_hedges_per_hour=config.get('max_hedges_per_hour'),
+            window=config.get('window', 200),
+        )
+
+    def record_latency(self, backend: str, seconds: float):
+        samples = self.latencies.get(backend)
+        if samples is None:
+            samples = self.latencies[backend] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def delay(self, backend: str) -> float:
+        """How long to wait on the backend before hedging: its latency percentile within the budget"""
+        samples = self.latencies.get(backend, ())
+        if len(samples) < self.min_samples:
+            return self.max_delay
+        return min(self.max_delay, max(self.min_delay, percentile(sorted(samples), self.quantile)))
+
+    def allow_hedge(self) -> bool:
+        hedged = sum(self.requests)
+        if hedged >= self.max_hedge_fraction * self.window:
+            return False
+        if self.max_hedges_per_hour is not None:
+            cutoff = time.monotonic() - 3600
+            while self.hedge_times and self.hedge_times[0] < cutoff:
+                self.hedge_times.popleft()
+            if len(self.hedge_times) >= self.max_hedges_per_hour:
+                return False
+        return True
+
+    def record_request(self, hedged: bool):
+        self.requests.append(hedged)
+        if hedged:
+            self.hedge_times.append(time.monotonic())
+
+
+class HedgedGenerator:
+    """Races a primary VeistGenerator against secondaries once it runs slow or fails.
+
+    The first image to arrive is saved through the generator that drew it,
+    so it lands in that generator's output index under its backend. Losing
+    renders are abandoned: their worker threads finish in the background and
+    the image is discarded. Results list the backends that raised under
+    failed_backends, so their circuit breakers see failures a winner hid.
+    """
+
+    def __init__(self, primary, secondaries: List, policy: HedgePolicy, governor=None):
+        self.primary = primary
+        self.secondaries = secondaries
+        self.policy = policy
+        # Each fired secondary is a paid render of its own, charged like any other
+        self.governor = governor
+
+    @classmethod
+    def from_config(cls, primary, secondaries: List, config: dict, governor=None) -> 'HedgedGenerator':
+        return cls(primary, secondaries, HedgePolicy.from_config(config), governor)
+
+    @property
+    def backend(self) -> str:
+        return self.primary.backend
+
+    def _timed_render(self, generator, full_prompt: str, quality: str, seed: int):
+        start = time.perf_counter()
+        image = generator.render(full_prompt, quality, seed)
+        # Recorded for losers too, so slow backends still shape their percentile
+        self.policy.record_latency(generator.backend, time.perf_counter() - start)
+        return image
+
+    async def generate_image(self, prompt: str = None, quality: str = FINAL, seed: int = None) -> dict:
+        if not self.primary.active:
+            return {"error": "Generator is not active"}
+        if seed is None:
+            seed = random.randrange(2**32)
+
+        loop = asyncio.get_running_loop()
+        full_prompt = self.primary.build_prompt(prompt)
+        attempts = {}
+        backups = list(self.secondaries)
+        fired = []
+        errors = []
+        failed = []
+
+        def launch(generator):
+            attempts[loop.run_in_executor(None, self._timed_render, generator, full_prompt, quality, seed)] = generator
+
+        def hedge():
+            while backups and self.policy.allow_hedge():
+                backup = backups.pop(0)
+                # Secondaries over their provider's budget are skipped
+                if self.governor is None or self.governor.acquire(backup.provider, backup.backend, images=1):
+                    fired.append(backup)
+                    launch(backup)
+                    return
+
+        launch(self.primary)
+        timeout = self.policy.delay(self.primary.backend)
+        try:
+            while attempts:
+                done, _ = await asyncio.wait(attempts, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Primary is past its usual latency, race one secondary against it
+                    timeout = None
+                    hedge()
+                    continue
+
+                for future in done:
+                    generator = attempts.pop(future)
+                    try:
+                        image = future.result()
+                    except Exception as e:
+                        errors.append(f"{generator.backend}: {e}")
+                        failed.append(generator.backend)
+                        if not attempts:
+                            hedge()
+                        continue
+
+                    for loser in attempts:
+                        loser.cancel()
+                    if fired:
+                        HEDGES.labels(self.primary.backend, fired[0].backend, generator.backend).inc()
+                    result = await loop.run_in_executor(None, generator.save_result, image, full_prompt, quality, seed)
+                    result["failed_backends"] = failed
+                    if fired:
+                        result["hedged"] = True
+                    return result
+        finally:
+            self.policy.record_request(bool(fired))
+
+        if fired:
+            HEDGES.labels(self.primary.backend, fired[0].backend, "none").inc()
+        return {
+            "error": "; ".join(errors),
+            "type": self.primary.gen_type,
+            "prompt": full_prompt,
+            "status": "error",
+            "failed_backends": failed
+        }
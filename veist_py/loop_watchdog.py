@@ -0,0 +1,105 @@
+"""
+Event-loop lag watchdog that reports the stack of whatever is blocking the loop
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from pathlib import Path
+from typing import Optional
+
+from metrics import LOOP_BLOCKS, LOOP_LAG
+
+logger = logging.getLogger('veist_watchdog')
+
+PROJECT_DIR = str(Path(__file__).parent)
+
+
+def blocking_site(frame) -> str:
+    """file:function of the innermost project frame, falling back to the innermost frame"""
+    innermost = frame
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(PROJECT_DIR) and 'site-packages' not in filename:
+            return f"{Path(filename).name}:{frame.f_code.co_name}"
+        frame = frame.f_back
+    if innermost is None:
+        return "unknown"
+    return f"{Path(innermost.f_code.co_filename).name}:{innermost.f_code.co_name}"
+
+
+class LoopWatchdog:
+    """Heartbeat task on the loop plus a monitor thread that samples the loop's stack when it stalls.
+
+    Lag of every heartbeat goes to the veist_event_loop_lag_seconds histogram,
+    and each stall longer than threshold is logged once with the offending
+    stack and counted in veist_event_loop_blocks_total by blocking site.
+    """
+
+    def __init__(self, name: str = "bot", threshold: float = 0.25, interval: float = 0.05, max_reports: int = 50):
+        self.name = name
+        self.threshold = threshold
+        self.interval = interval
+        self.lag = LOOP_LAG.labels(name)
+        # Recent (site, stack) reports, newest last
+        self.reports = deque(maxlen=max_reports)
+        self._last_beat = time.monotonic()
+        self._reported_beat = None
+        self._loop_thread_id = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @classmethod
+    def from_config(cls, config: dict, name: str = "bot") -> 'LoopWatchdog':
+        return cls(
+            name=name,
+            threshold=config.get('threshold_seconds', 0.25),
+            interval=config.get('interval_seconds', 0.05),
+        )
+
+    async def _heartbeat(self):
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.lag.observe(max(0.0, now - start - self.interval))
+            self._last_beat = now
+
+    def _monitor(self):
+        while not self._stopped.wait(self.interval):
+            beat = self._last_beat
+            stalled = time.monotonic() - beat
+            if stalled < self.threshold or beat == self._reported_beat:
+                continue
+            # Report each stall once, while the blocking call is still on the stack
+            self._reported_beat = beat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            site = blocking_site(frame)
+            stack = "".join(traceback.format_stack(frame)) if frame else ""
+            del frame
+            LOOP_BLOCKS.labels(self.name, site).inc()
+            self.reports.append((site, stack))
+            logger.warning(f"Event loop ({self.name}) blocked for {stalled:.2f}s+ in {site}:\n{stack}")
+
+    def start(self):
+        """Start watching the running loop"""
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._monitor, name=f"watchdog-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._thread:
+            self._thread.join()
+            self._thread = None
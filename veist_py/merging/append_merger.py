@@ -2,7 +2,15 @@ from typing import Dict
 from merging.reaction_merger import ReactionMerger
 
 class AppendMerger(ReactionMerger):
-    """Simple append strategy that adds 'more X' for each reaction"""
+    """Simple append strategy that adds 'more X' for each reaction.
+    
+    With a lexicon, emoji it confidently knows are written as their interpretation.
+    """
+    fast = True
+
+    def __init__(self, lexicon=None):
+        self.lexicon = lexicon
+
     def merge(self, prompt: str, reactions: Dict[str, int]) -> str:
         # print(f"AppendMerger received prompt: {prompt}")
         # print(f"AppendMerger received reactions: {reactions}")
@@ -22,7 +30,8 @@ class AppendMerger(ReactionMerger):
         # Create list of reactions, repeating based on count
         reaction_list = []
         for reaction, count in active_reactions.items():
-            reaction_list.extend([reaction] * count)
+            word = self.lexicon.lookup(reaction) if self.lexicon else None
+            reaction_list.extend([word or reaction] * count)
             
         reaction_text = " and ".join(reaction_list)
         result = f"{prompt}, but more {reaction_text}"
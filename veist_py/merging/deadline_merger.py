@@ -0,0 +1,98 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+from merging.reaction_merger import ReactionMerger
+from merging.append_merger import AppendMerger
+from metrics import MERGE_FALLBACKS
+
+class DeadlineMerger:
+    """Runs a merger on its own worker thread with a deadline, falling back to AppendMerger.
+
+    A merge that misses the deadline keeps running; if use_late_results is
+    set, its result replaces whatever prompt the next merge after it finishes
+    builds on (the fallback, possibly compacted by the caller), until
+    discard_late() drops it at the end of a session.
+    Paid strategies also fall back while their provider's budget runs low,
+    and merges whose emoji the lexicon already knows skip the merger entirely.
+    """
+    def __init__(self, merger: ReactionMerger, strategy: str, deadline: Optional[float] = None,
+                 use_late_results: bool = True, governor=None, lexicon=None):
+        self.merger = merger
+        self.strategy = strategy
+        self.deadline = deadline
+        self.use_late_results = use_late_results
+        self.governor = governor
+        self.lexicon = lexicon
+        self.fallback = AppendMerger(lexicon)
+        # One worker: local models can't run two merges at once anyway
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"merge-{strategy}")
+        self.running: Optional[Future] = None
+        # Merge that missed its deadline, swapped in as the base once it is done
+        self.late: Optional[Future] = None
+
+    @classmethod
+    def from_config(cls, merger: ReactionMerger, strategy: str, config: dict, governor=None,
+                    lexicon=None) -> 'DeadlineMerger':
+        return cls(
+            merger,
+            strategy,
+            deadline=(config.get('deadlines') or {}).get(strategy),
+            use_late_results=config.get('use_late_results', True),
+            governor=governor,
+            lexicon=lexicon,
+        )
+
+    def _within_budget(self) -> bool:
+        """Charge a paid merge to the governor, stepping down to append once the budget runs low"""
+        # Duck-typed mergers (benchmark fakes) may not declare a provider
+        provider = getattr(self.merger, 'provider', None)
+        if self.governor is None or provider is None:
+            return True
+        return not self.governor.degraded(provider) and self.governor.acquire(provider, self.strategy)
+
+    def _base_prompt(self, prompt: str) -> str:
+        """Swap in a finished late merge for the prompt, a still-running one stays pending"""
+        if self.late is None or not self.late.done():
+            return prompt
+        future, self.late = self.late, None
+        if future.cancelled() or future.exception():
+            return prompt
+        return future.result()
+
+    def discard_late(self):
+        """Forget a late merge, e.g. when the session it belongs to ends"""
+        self.late = None
+
+    def _fall_back(self, prompt: str, reactions: Dict[str, int], reason: str) -> str:
+        MERGE_FALLBACKS.labels(self.strategy, reason).inc()
+        print(f"{self.strategy} merge {reason}, falling back to append")
+        return self.fallback.merge(prompt, reactions)
+
+    async def merge(self, prompt: str, reactions: Dict[str, int]) -> str:
+        if self.use_late_results:
+            prompt = self._base_prompt(prompt)
+        if self.running is not None and not self.running.done():
+            return self._fall_back(prompt, reactions, "busy")
+        if (self.lexicon is not None and not getattr(self.merger, 'fast', False)
+                and self.lexicon.covers(e for e, count in reactions.items() if count > 0)):
+            return self._fall_back(prompt, reactions, "lexicon")
+        if not self._within_budget():
+            return self._fall_back(prompt, reactions, "budget")
+        if self.deadline is None:
+            # Fast strategies run inline
+            return self.merger.merge(prompt, reactions)
+
+        self.running = self.executor.submit(self.merger.merge, prompt, reactions)
+        pending = asyncio.wrap_future(self.running)
+        try:
+            return await asyncio.wait_for(asyncio.shield(pending), self.deadline)
+        except asyncio.TimeoutError:
+            # Nobody awaits the late merge, so retrieve its outcome to keep asyncio quiet
+            pending.add_done_callback(lambda f: f.cancelled() or f.exception())
+            result = self._fall_back(prompt, reactions, "timeout")
+            if self.use_late_results:
+                self.late = self.running
+            return result
+        except Exception as e:
+            print(f"{self.strategy} merge failed: {e}")
+            return self._fall_back(prompt, reactions, "error")
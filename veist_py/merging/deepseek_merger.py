@@ -1,6 +1,4 @@
-from typing import Dict
-from transformers import AutoModelForCausalLM, AutoTokenizer
-import torch
+from typing import Dict, Optional
 from merging.reaction_merger import ReactionMerger
 import json
 
@@ -33,17 +31,67 @@ Here are your prompt and reactions:
 
 """
 
+# Weight precision options for the local model
+MODES = ("full", "bf16", "int8", "int4")
+
 class DeepseekMerger(ReactionMerger):
-    def __init__(self):
-        self.model_name = "deepseek-ai/DeepSeek-R1-Distill-Llama-8B"
+    """Rewrites the prompt with a local DeepSeek-R1 distill.
+    
+    Modes trade quality for memory: "full" loads float32 weights (~32 GB for
+    the 8B model), "bf16" halves that and runs on CPU too, "int8" dynamically
+    quantizes the Linear layers for CPU inference, and "int4" loads 4-bit
+    weights through bitsandbytes, which needs CUDA. int8 loads float32 weights
+    before quantizing, so its peak RSS during loading is that of "full". On
+    CPU-only hosts the 1.5B distill in bf16 or int8 is the practical choice.
+    """
+    def __init__(self, model_name: str = "deepseek-ai/DeepSeek-R1-Distill-Llama-8B", mode: str = "full",
+                 threads: Optional[int] = None, max_new_tokens: int = 1024):
+        if mode not in MODES:
+            raise ValueError(f"Unknown deepseek mode: {mode} (options: {', '.join(MODES)})")
+        # Heavy optional dependencies, only needed when this strategy is selected
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+        self.model_name = model_name
+        self.mode = mode
+        self.max_new_tokens = max_new_tokens
         # self.model_name = "Qwen/Qwen2.5-1.5B-Instruct"
         # model_name = "google/gemma-2-2b-it"
+        if threads:
+            torch.set_num_threads(threads)
+        self.device = "cuda:1" if torch.cuda.is_available() else "cpu"
 
         self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
         # model = AutoModelForCausalLM.from_pretrained(model_name, device_map="auto", torch_dtype=torch.float)
-        self.model = AutoModelForCausalLM.from_pretrained(self.model_name)
-        if torch.cuda.is_available():
-            self.model = self.model.to("cuda:1")
+        if mode == "int4":
+            if self.device == "cpu":
+                raise ValueError("deepseek int4 mode needs CUDA (bitsandbytes); use int8 or bf16 on CPU")
+            from transformers import BitsAndBytesConfig
+            self.model = AutoModelForCausalLM.from_pretrained(
+                self.model_name,
+                quantization_config=BitsAndBytesConfig(load_in_4bit=True, bnb_4bit_compute_dtype=torch.bfloat16),
+                device_map={"": self.device},
+            )
+            return
+        
+        dtype = torch.bfloat16 if mode == "bf16" else torch.float32
+        # Stream weights in rather than materializing a second random-initialized copy
+        self.model = AutoModelForCausalLM.from_pretrained(self.model_name, torch_dtype=dtype, low_cpu_mem_usage=True)
+        if mode == "int8":
+            # Dynamic int8 Linear layers are a CPU kernel, so the model stays on the CPU
+            self.device = "cpu"
+            self.model = torch.ao.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        elif self.device != "cpu":
+            self.model = self.model.to(self.device)
+        self.model.eval()
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'DeepseekMerger':
+        return cls(
+            model_name=config.get('model', "deepseek-ai/DeepSeek-R1-Distill-Llama-8B"),
+            mode=config.get('mode', "full"),
+            threads=config.get('threads'),
+            max_new_tokens=config.get('max_new_tokens', 1024),
+        )
 
     """Simple append strategy that adds 'more X' for each reaction"""
     def merge(self, prompt: str, reactions: Dict[str, int]) -> str:
@@ -70,10 +118,11 @@ class DeepseekMerger(ReactionMerger):
         messages = [
             {"role": "user", "content": prompt},
          ]
+        import torch
         tokenized_chat = self.tokenizer.apply_chat_template(messages, tokenize=True, add_generation_prompt=True, return_tensors="pt")
-        if torch.cuda.is_available():
-            tokenized_chat = tokenized_chat.to("cuda:1")
-        outputs = self.model.generate(tokenized_chat, max_new_tokens=1024)
+        tokenized_chat = tokenized_chat.to(self.device)
+        with torch.inference_mode():
+            outputs = self.model.generate(tokenized_chat, max_new_tokens=self.max_new_tokens)
 
         raw_output = self.tokenizer.decode(outputs[0])
         print(f"raw_outputs: {raw_output}")
@@ -36,6 +36,8 @@ Here's the prompt and reactions:
 """
 
 class DeepseekReplicateMerger(ReactionMerger):
+    provider = "replicate"
+
     def __init__(self):
         # Check if REPLICATE_API_TOKEN is set
         replicate_token = os.getenv('REPLICATE_API_TOKEN')
@@ -2,5 +2,10 @@ from typing import Dict
 
 class ReactionMerger:
     """Base class for reaction merging strategies"""
+    # Paid provider the cost governor meters this strategy under (None for local strategies)
+    provider = None
+    # Runs locally in microseconds, or decides itself when a slow merger is worth calling
+    fast = False
+
     def merge(self, prompt: str, reactions: Dict[str, int]) -> str:
         raise NotImplementedError
\ No newline at end of file
@@ -0,0 +1,53 @@
+from collections import Counter, deque
+from typing import Dict
+from merging.reaction_merger import ReactionMerger
+
+class TieredMerger(ReactionMerger):
+    """Merges locally by default and escalates to a slower merger only for novel reaction sets.
+    
+    A reaction set is novel when one of its emoji hasn't appeared in the last
+    `memory` merges and the lexicon can't translate it. Escalations are
+    charged to the escalation merger's provider at the escalation strategy's
+    cost and stay local while its budget runs low.
+    """
+    # Decides on its own when the slow merger is worth calling
+    fast = True
+
+    def __init__(self, local: ReactionMerger, escalation: ReactionMerger, memory: int = 20, lexicon=None,
+                 governor=None, escalation_strategy: str = "deepseek_replicate"):
+        self.local = local
+        self.escalation = escalation
+        self.lexicon = lexicon
+        self.governor = governor
+        # Cost kind of an escalation, as listed under governor costs
+        self.escalation_strategy = escalation_strategy
+        self.recent = deque(maxlen=memory)
+        self.seen = Counter()
+        self.escalations = 0
+
+    def is_novel(self, emojis) -> bool:
+        return any(
+            self.seen[emoji] == 0 and not (self.lexicon and self.lexicon.covers([emoji]))
+            for emoji in emojis
+        )
+
+    def _remember(self, emojis):
+        if len(self.recent) == self.recent.maxlen:
+            self.seen.subtract(self.recent[0])
+        self.recent.append(emojis)
+        self.seen.update(emojis)
+
+    def _can_escalate(self) -> bool:
+        provider = self.escalation.provider
+        if self.governor is None or provider is None:
+            return True
+        return not self.governor.degraded(provider) and self.governor.acquire(provider, self.escalation_strategy)
+
+    def merge(self, prompt: str, reactions: Dict[str, int]) -> str:
+        emojis = frozenset(emoji for emoji, count in reactions.items() if count > 0)
+        novel = self.is_novel(emojis)
+        self._remember(emojis)
+        if novel and self._can_escalate():
+            self.escalations += 1
+            return self.escalation.merge(prompt, reactions)
+        return self.local.merge(prompt, reactions)
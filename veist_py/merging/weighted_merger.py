@@ -0,0 +1,49 @@
+from typing import Dict, List, Tuple
+from merging.reaction_merger import ReactionMerger
+
+class WeightedMerger(ReactionMerger):
+    """Deterministic local strategy: counts become a few weighted terms instead of one repetition per vote.
+    
+    Counts are normalized against the most popular reaction and only the
+    max_terms heaviest are kept, so the added text stays bounded however
+    many votes arrive. The "phrase" style writes "much more X, more Y and a
+    hint of Z"; the "syntax" style writes "(X:1.50)" weights for backends
+    that parse them.
+    """
+    fast = True
+
+    def __init__(self, max_terms: int = 4, style: str = "phrase", lexicon=None):
+        if style not in ("phrase", "syntax"):
+            raise ValueError(f"Unknown weighted prompt style: {style}")
+        self.max_terms = max_terms
+        self.style = style
+        self.lexicon = lexicon
+
+    def weights(self, reactions: Dict[str, int]) -> List[Tuple[str, float]]:
+        """The heaviest reactions as (emoji, weight), weights relative to the top reaction"""
+        active = [(emoji, count) for emoji, count in reactions.items() if count > 0]
+        if not active:
+            return []
+        active.sort(key=lambda item: item[1], reverse=True)
+        top = active[0][1]
+        return [(emoji, count / top) for emoji, count in active[:self.max_terms]]
+
+    def term(self, emoji: str, weight: float) -> str:
+        word = (self.lexicon.lookup(emoji) if self.lexicon else None) or emoji
+        if self.style == "syntax":
+            return f"({word}:{1 + 0.5 * weight:.2f})"
+        if weight >= 0.75:
+            return f"much more {word}"
+        if weight >= 0.4:
+            return f"more {word}"
+        return f"a hint of {word}"
+
+    def merge(self, prompt: str, reactions: Dict[str, int]) -> str:
+        terms = [self.term(emoji, weight) for emoji, weight in self.weights(reactions or {})]
+        if not terms:
+            return prompt
+        if self.style == "syntax":
+            return f"{prompt}, {' '.join(terms)}"
+        if len(terms) == 1:
+            return f"{prompt}, with {terms[0]}"
+        return f"{prompt}, with {', '.join(terms[:-1])} and {terms[-1]}"
@@ -0,0 +1,276 @@
+"""
+Lightweight Prometheus-style metrics and an embedded HTTP endpoint
+"""
+
+import asyncio
+import bisect
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+# Default latency buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 45, 60, 120)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], '_Metric'] = {}
+
+    def labels(self, *values):
+        """Child metric for a label combination (cached, so hot paths only pay a dict lookup)"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        return type(self)(self.name, self.documentation)
+
+    def _samples(self):
+        """Yield (label values, child) for exposition"""
+        if self.labelnames:
+            yield from self._children.items()
+        else:
+            yield (), self
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._samples():
+            lines.extend(child._render_values(self.labelnames, values))
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0.0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def _render_values(self, labelnames, values):
+        return [f"{self.name}{_format_labels(labelnames, values)} {self.value}"]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def _render_values(self, labelnames, values):
+        return [f"{self.name}{_format_labels(labelnames, values)} {self.value}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Non-cumulative counts per bucket, last slot is +Inf
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    def _new_child(self):
+        return Histogram(self.name, self.documentation, buckets=self.buckets)
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def time(self) -> '_Timer':
+        """Context manager observing the elapsed time of a block"""
+        return _Timer(self)
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def _render_values(self, labelnames, values):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            le = f'le="{bound}"'
+            lines.append(f"{self.name}_bucket{_format_labels(labelnames, values, le)} {cumulative}")
+        cumulative += self.counts[-1]
+        le = 'le="+Inf"'
+        lines.append(f"{self.name}_bucket{_format_labels(labelnames, values, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(labelnames, values)} {self.sum}")
+        lines.append(f"{self.name}_count{_format_labels(labelnames, values)} {cumulative}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+
+    def _get_or_create(self, cls, name, documentation, labelnames, **kwargs):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls(name, documentation, labelnames, **kwargs)
+        elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+            raise ValueError(f"Metric {name} already registered with a different type or labels")
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self.metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+# Shared metrics for the Veist bots
+GENERATIONS = REGISTRY.counter(
+    "veist_generations_total", "Image generations by backend and outcome", ("backend", "status"))
+GENERATION_RETRIES = REGISTRY.counter(
+    "veist_generation_retries_total", "Generation retries by backend and reason", ("backend", "reason"))
+BACKEND_LATENCY = REGISTRY.histogram(
+    "veist_backend_latency_seconds", "Image backend call latency per model and quality", ("backend", "model", "quality"))
+BREAKER_STATE = REGISTRY.gauge(
+    "veist_circuit_breaker_state", "Backend circuit breaker state (0 closed, 1 half-open, 2 open)", ("backend",))
+BREAKER_TRANSITIONS = REGISTRY.counter(
+    "veist_circuit_breaker_transitions_total", "Backend circuit breaker state changes", ("backend", "state"))
+GOVERNOR_DECISIONS = REGISTRY.counter(
+    "veist_governor_decisions_total", "Paid calls allowed or denied by the cost governor", ("provider", "kind", "decision"))
+GOVERNOR_HEADROOM = REGISTRY.gauge(
+    "veist_governor_headroom_ratio", "Share of each provider budget bucket still available", ("provider", "bucket"))
+HEDGES = REGISTRY.counter(
+    "veist_hedged_requests_total", "Generations that fired a secondary backend, by winner", ("primary", "secondary", "winner"))
+MERGES = REGISTRY.counter(
+    "veist_merges_total", "Reaction merges by strategy", ("strategy",))
+MERGE_LATENCY = REGISTRY.histogram(
+    "veist_merge_latency_seconds", "Reaction merge latency per strategy", ("strategy",))
+MERGE_FALLBACKS = REGISTRY.counter(
+    "veist_merge_fallbacks_total", "Merges answered by the append fallback by strategy and reason", ("strategy", "reason"))
+PROMPT_TOKENS = REGISTRY.histogram(
+    "veist_prompt_tokens", "Tokens in each merged prompt after the budget is enforced",
+    buckets=(8, 16, 32, 64, 128, 192, 256, 384, 512, 1024))
+PROMPT_GROWTH = REGISTRY.histogram(
+    "veist_prompt_growth_tokens", "Change in prompt tokens from one variation to the next",
+    buckets=(-64, -16, -4, 0, 4, 8, 16, 32, 64, 128))
+PROMPT_COMPACTIONS = REGISTRY.counter(
+    "veist_prompt_compactions_total", "Over-budget prompts compacted, by step", ("step",))
+EVOLUTIONS = REGISTRY.counter(
+    "veist_evolutions_total", "veist_bot.py evolutions by module and outcome", ("module", "status"))
+OPENAI_LATENCY = REGISTRY.histogram(
+    "veist_openai_latency_seconds", "OpenAI Responses API latency per model", ("model",))
+PUBLISH_JOBS = REGISTRY.counter(
+    "veist_publish_jobs_total", "NFT publish jobs by outcome", ("status",))
+DISCORD_API_CALLS = REGISTRY.counter(
+    "veist_discord_api_calls_total", "Discord REST calls by method and route", ("method", "route"))
+QUEUE_DEPTH = REGISTRY.gauge(
+    "veist_queue_depth", "Generation jobs in flight or waiting", ("bot",))
+LOOP_LAG = REGISTRY.histogram(
+    "veist_event_loop_lag_seconds", "How late the event loop woke a watchdog heartbeat", ("bot",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60))
+LOOP_BLOCKS = REGISTRY.counter(
+    "veist_event_loop_blocks_total", "Event loop stalls over the watchdog threshold by blocking site", ("bot", "site"))
+
+
+def instrument_discord(client):
+    """Count every Discord REST request a discord.py client makes"""
+    http = client.http
+    original_request = http.request
+
+    async def counted_request(route, **kwargs):
+        DISCORD_API_CALLS.labels(route.method, route.path).inc()
+        return await original_request(route, **kwargs)
+
+    http.request = counted_request
+
+
+class MetricsServer:
+    """Serves the registry as text/plain on /metrics from the running event loop"""
+
+    def __init__(self, registry: Registry = REGISTRY, host: str = "127.0.0.1", port: int = 9464):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    def render(self) -> str:
+        return self.registry.render()
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            # Skip headers up to the blank line
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            path = request_line.split(b" ")[1] if request_line.count(b" ") >= 2 else b"/"
+            if path.split(b"?")[0] in (b"/", b"/metrics"):
+                status, body = b"200 OK", self.render().encode()
+            else:
+                status, body = b"404 Not Found", b"not found\n"
+            writer.write(
+                b"HTTP/1.1 " + status + b"\r\n"
+                b"Content-Type: text/plain; version=0.0.4\r\n"
+                b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+                b"Connection: close\r\n\r\n" + body
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        return self.server
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the subset of the OpenAI Responses API used by veist_bot.py
+
+Supports responses.create with previous_response_id chaining, the
+image_generation tool (base64 PNG results) and output_text messages, with
+configurable latency. Run it as a server and point the bot at it:
+
+    python openai_stub.py --port 8765 --latency 2
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=stub python veist_bot.py
+
+or inject StubOpenAI as bot.openai_client in tests and benchmarks.
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import itertools
+import json
+import threading
+import time
+import unicodedata
+from typing import Dict, Optional, Tuple
+
+from openai.types.responses import Response
+
+from procedural import render_prompt_image
+
+# Latency multiplier per image_generation quality
+QUALITY_LATENCY = {"low": 1.0, "medium": 2.0, "high": 4.0, "auto": 2.0}
+
+EMOJI_WORDS = {
+    "🔥": "fiery", "🌊": "oceanic", "🌈": "rainbow colors", "⭐": "starry", "🤖": "more robotic",
+    "🎨": "painterly", "🌙": "moonlit", "🍄": "mushrooms", "🎦": "cinematic", "📷": "photorealistic",
+}
+
+
+class ResponseNotFound(Exception):
+    pass
+
+
+def input_text(value) -> str:
+    """Flatten a Responses API input (string or list of message items) to text"""
+    if isinstance(value, str):
+        return value
+    parts = []
+    for item in value or []:
+        content = item.get('content', '') if isinstance(item, dict) else item
+        if isinstance(content, str):
+            parts.append(content)
+        else:
+            parts.extend(part.get('text', '') for part in content if isinstance(part, dict))
+    return "\n".join(parts)
+
+
+def interpret_emoji(text: str) -> str:
+    """A lookup-table style reply for the emoji in a prompt"""
+    seen = []
+    for char in text:
+        if unicodedata.category(char) == 'So' and char not in seen:
+            seen.append(char)
+    return "\n".join(f"{emoji}: {EMOJI_WORDS.get(emoji, 'surprise')}" for emoji in seen)
+
+
+class ResponseStore:
+    """Keeps response chains and builds Responses API payloads"""
+
+    def __init__(self, latency: float = 0.0, image_size: Tuple[int, int] = (1024, 1024)):
+        self.latency = latency
+        self.image_size = image_size
+        self.responses: Dict[str, dict] = {}
+        # response id -> accumulated conversation text, used to seed the image
+        self.history: Dict[str, str] = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def delay(self, request: dict) -> float:
+        for tool in request.get('tools') or []:
+            if tool.get('type') == 'image_generation':
+                return self.latency * QUALITY_LATENCY.get(tool.get('quality', 'auto'), 1.0)
+        return self.latency
+
+    def create(self, request: dict) -> dict:
+        previous_id = request.get('previous_response_id')
+        with self.lock:
+            if previous_id and previous_id not in self.history:
+                raise ResponseNotFound(f"Previous response with id '{previous_id}' not found.")
+            number = next(self.ids)
+        history = self.history.get(previous_id, "") + input_text(request.get('input')) + "\n"
+
+        output = []
+        tools = request.get('tools') or []
+        if any(tool.get('type') == 'image_generation' for tool in tools):
+            image = io.BytesIO()
+            render_prompt_image(history[-400:], self.image_size).save(image, format='PNG', compress_level=1)
+            output.append({
+                'type': 'image_generation_call',
+                'id': f"ig_{number:08d}",
+                'status': 'completed',
+                'result': base64.b64encode(image.getvalue()).decode(),
+            })
+        text = interpret_emoji(input_text(request.get('input'))) or "Done."
+        output.append({
+            'type': 'message',
+            'id': f"msg_{number:08d}",
+            'role': 'assistant',
+            'status': 'completed',
+            'content': [{'type': 'output_text', 'text': text, 'annotations': []}],
+        })
+
+        response = {
+            'id': f"resp_stub_{number:08d}",
+            'object': 'response',
+            'created_at': time.time(),
+            'model': request.get('model', 'gpt-4o-mini'),
+            'status': 'completed',
+            'previous_response_id': previous_id,
+            'output': output,
+            'parallel_tool_calls': True,
+            'tool_choice': 'auto',
+            'tools': tools,
+        }
+        with self.lock:
+            self.responses[response['id']] = response
+            self.history[response['id']] = history
+        return response
+
+    def get(self, response_id: str) -> dict:
+        if response_id not in self.responses:
+            raise ResponseNotFound(f"Response with id '{response_id}' not found.")
+        return self.responses[response_id]
+
+
+class _StubResponses:
+    def __init__(self, store: ResponseStore):
+        self.store = store
+
+    def create(self, **kwargs) -> Response:
+        # Blocks like the real synchronous client
+        time.sleep(self.store.delay(kwargs))
+        return Response.construct(**self.store.create(kwargs))
+
+    def retrieve(self, response_id: str) -> Response:
+        return Response.construct(**self.store.get(response_id))
+
+
+class StubOpenAI:
+    """In-process replacement for OpenAI() exposing client.responses"""
+
+    def __init__(self, latency: float = 0.0, store: Optional[ResponseStore] = None):
+        self.store = store or ResponseStore(latency)
+        self.responses = _StubResponses(self.store)
+
+
+class StubServer:
+    """HTTP server for POST /v1/responses and GET /v1/responses/{id}"""
+
+    def __init__(self, store: Optional[ResponseStore] = None, host: str = "127.0.0.1", port: int = 8765):
+        self.store = store or ResponseStore()
+        self.host = host
+        self.port = port
+        self.server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    async def _respond(self, request_line: bytes, body: bytes) -> Tuple[int, dict]:
+        parts = request_line.decode('latin-1').split()
+        method, path = (parts[0], parts[1].split('?')[0]) if len(parts) >= 2 else ("", "")
+        try:
+            if method == "POST" and path == "/v1/responses":
+                request = json.loads(body or b"{}")
+                await asyncio.sleep(self.store.delay(request))
+                loop = asyncio.get_running_loop()
+                return 200, await loop.run_in_executor(None, self.store.create, request)
+            if method == "GET" and path.startswith("/v1/responses/"):
+                return 200, self.store.get(path.rsplit('/', 1)[-1])
+            return 404, {'error': {'message': f"Unknown route {method} {path}", 'type': 'invalid_request_error'}}
+        except ResponseNotFound as e:
+            return 400, {'error': {'message': str(e), 'type': 'invalid_request_error',
+                                   'param': 'previous_response_id', 'code': 'previous_response_not_found'}}
+        except json.JSONDecodeError as e:
+            return 400, {'error': {'message': f"Invalid JSON body: {e}", 'type': 'invalid_request_error'}}
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.strip().lower() == 'content-length':
+                    length = int(value.strip())
+            body = await reader.readexactly(length) if length else b""
+
+            status, payload = await self._respond(request_line, body)
+            data = json.dumps(payload).encode()
+            reason = {200: b"OK", 400: b"Bad Request", 404: b"Not Found"}[status]
+            writer.write(
+                b"HTTP/1.1 " + str(status).encode() + b" " + reason + b"\r\n"
+                b"Content-Type: application/json\r\n"
+                b"Content-Length: " + str(len(data)).encode() + b"\r\n"
+                b"Connection: close\r\n\r\n" + data
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    def start_in_thread(self) -> str:
+        """Serve from a background thread (the sync OpenAI client would block a shared loop), returns base_url"""
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.stop())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="openai-stub", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self.base_url
+
+    def stop_thread(self):
+        if self._thread:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+
+async def serve(args):
+    server = StubServer(ResponseStore(args.latency, (args.size, args.size)), args.host, args.port)
+    await server.start()
+    print(f"OpenAI Responses stub listening on {server.base_url} (latency {args.latency}s)")
+    async with server.server:
+        await server.server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local OpenAI Responses API stub for veist_bot.py')
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=1.0, help='Seconds per low-quality image, scaled by quality')
+    parser.add_argument('--size', type=int, default=1024, help='Side of the generated square images')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
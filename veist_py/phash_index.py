@@ -0,0 +1,264 @@
+"""
+Perceptual-hash index over generated outputs for near-duplicate detection
+"""
+
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from PIL import Image
+
+logger = logging.getLogger('veist_bot')
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.webp'}
+INDEX_FILENAME = "phash_index.jsonl"
+
+
+def dhash(image: Union[str, Path, Image.Image], hash_size: int = 8) -> int:
+    """64-bit difference hash: compares neighbouring pixels of a tiny grayscale copy"""
+    if not isinstance(image, Image.Image):
+        with Image.open(image) as img:
+            img.draft('L', (hash_size * 4, hash_size * 4))
+            return dhash(img.convert('L'), hash_size)
+
+    small = image.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class MultiIndexHash:
+    """Multi-index hashing for Hamming radius search over 64-bit hashes.
+
+    Each hash is split into max_distance + 1 disjoint bit blocks, with one
+    exact-match table per block. By pigeonhole, anything within max_distance
+    agrees exactly on at least one block, so a lookup only verifies the few
+    candidates sharing a block instead of scanning the whole history.
+    """
+
+    def __init__(self, max_distance: int = 6, bits: int = 64):
+        self.max_distance = max_distance
+        num_blocks = min(max_distance + 1, bits)
+        base, extra = divmod(bits, num_blocks)
+        self.blocks = []  # (shift, mask) per block
+        shift = 0
+        for i in range(num_blocks):
+            width = base + (1 if i < extra else 0)
+            self.blocks.append((shift, (1 << width) - 1))
+            shift += width
+        self.tables: List[Dict[int, List[int]]] = [{} for _ in self.blocks]
+        self.values: Dict[int, List[object]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(values) for values in self.values.values())
+
+    def add(self, value_hash: int, value):
+        values = self.values.get(value_hash)
+        if values is None:
+            self.values[value_hash] = [value]
+            for table, (shift, mask) in zip(self.tables, self.blocks):
+                table.setdefault((value_hash >> shift) & mask, []).append(value_hash)
+        else:
+            values.append(value)
+
+    def remove(self, value_hash: int, value):
+        values = self.values.get(value_hash)
+        if values is None or value not in values:
+            return
+        values.remove(value)
+        if not values:
+            del self.values[value_hash]
+            for table, (shift, mask) in zip(self.tables, self.blocks):
+                block = (value_hash >> shift) & mask
+                table[block].remove(value_hash)
+                if not table[block]:
+                    del table[block]
+
+    def search(self, query: int, max_distance: Optional[int] = None) -> List[Tuple[int, object]]:
+        """All (distance, value) pairs within max_distance, closest first"""
+        if max_distance is None:
+            max_distance = self.max_distance
+        if max_distance > self.max_distance:
+            # The block split only guarantees recall up to self.max_distance
+            candidates = self.values.keys()
+        else:
+            candidates = set()
+            for table, (shift, mask) in zip(self.tables, self.blocks):
+                candidates.update(table.get((query >> shift) & mask, ()))
+
+        matches = []
+        for candidate in candidates:
+            distance = hamming(query, candidate)
+            if distance <= max_distance:
+                matches.extend((distance, value) for value in self.values[candidate])
+        matches.sort(key=lambda match: match[0])
+        return matches
+
+
+class OutputIndex:
+    """Near-duplicate index for everything saved to an outputs directory.
+
+    Hashes are persisted to an append-only log inside the directory, and any
+    image files missing from the log are hashed by a background thread after
+    startup (scanned is set once it is done). A second table
+    tracks published images so the same picture isn't minted twice.
+    Lookups use multi-index hashing, so checking a new image against the
+    whole history only touches a handful of candidates.
+    """
+
+    def __init__(self, output_dir: Union[str, Path], max_distance: int = 6):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(exist_ok=True)
+        self.max_distance = max_distance
+        self.index_path = self.output_dir / INDEX_FILENAME
+
+        self.hashes: Dict[str, int] = {}
+        self.images = MultiIndexHash(max_distance)
+        self.published = MultiIndexHash(max_distance)
+        self._published_paths = set()
+        self._lock = threading.Lock()
+        self.scanned = threading.Event()
+
+        self._load()
+        threading.Thread(target=self._scan, name="output-index-scan", daemon=True).start()
+
+    def _key(self, path: Union[str, Path]) -> str:
+        return Path(path).name
+
+    def _append(self, record: dict):
+        with open(self.index_path, 'a') as f:
+            f.write(json.dumps(record) + "\n")
+
+    def _load(self):
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if 'hash' in record:
+                    value_hash = int(record['hash'], 16)
+                    self.hashes[record['path']] = value_hash
+                    self.images.add(value_hash, record['path'])
+                elif 'removed' in record:
+                    self._forget(record['removed'])
+                elif 'published' in record and record['published'] in self.hashes:
+                    self._published_paths.add(record['published'])
+                    self.published.add(self.hashes[record['published']], record['published'])
+
+    def _scan(self):
+        """Hash any outputs that were saved before the index existed"""
+        try:
+            for path in self.output_dir.iterdir():
+                if path.suffix.lower() in IMAGE_SUFFIXES and path.name not in self.hashes:
+                    try:
+                        value_hash = dhash(path)
+                    except Exception as e:
+                        # Includes outputs discarded while the scan was running
+                        logger.warning(f"Could not hash {path}: {e}")
+                        continue
+                    if path.exists():
+                        self.add(path, value_hash)
+        except OSError as e:
+            logger.warning(f"Stopped scanning {self.output_dir}: {e}")
+        finally:
+            self.scanned.set()
+
+    def hash_image(self, image: Union[str, Path, Image.Image]) -> int:
+        return dhash(image)
+
+    def find(self, value_hash: int, max_distance: Optional[int] = None) -> List[Tuple[int, str]]:
+        """Indexed images within max_distance of the hash, closest first"""
+        if max_distance is None:
+            max_distance = self.max_distance
+        with self._lock:
+            return self.images.search(value_hash, max_distance)
+
+    def nearest_duplicate(self, value_hash: int) -> Optional[Tuple[str, int]]:
+        """(path, distance) of the closest near-duplicate, or None"""
+        matches = self.find(value_hash)
+        if not matches:
+            return None
+        distance, name = matches[0]
+        return str(self.output_dir / name), distance
+
+    def add(self, path: Union[str, Path], value_hash: Optional[int] = None) -> int:
+        """Index a saved output, returns its hash"""
+        if value_hash is None:
+            value_hash = dhash(path)
+        key = self._key(path)
+        with self._lock:
+            if key in self.hashes:
+                return self.hashes[key]
+            self.hashes[key] = value_hash
+            self.images.add(value_hash, key)
+            self._append({'path': key, 'hash': f"{value_hash:016x}"})
+        return value_hash
+
+    def _forget(self, key: str):
+        value_hash = self.hashes.pop(key, None)
+        if value_hash is None:
+            return
+        self.images.remove(value_hash, key)
+        if key in self._published_paths:
+            self._published_paths.discard(key)
+            self.published.remove(value_hash, key)
+
+    def remove(self, path: Union[str, Path]):
+        """Unindex a discarded output so later images aren't checked against it"""
+        key = self._key(path)
+        with self._lock:
+            if key not in self.hashes:
+                return
+            self._forget(key)
+            self._append({'removed': key})
+
+    def published_duplicate(self, path: Union[str, Path]) -> Optional[Tuple[str, int]]:
+        """(path, distance) of an already-published near-duplicate, or None"""
+        value_hash = self.hashes.get(self._key(path))
+        if value_hash is None:
+            value_hash = self.add(path)
+        with self._lock:
+            matches = self.published.search(value_hash, self.max_distance)
+        if not matches:
+            return None
+        distance, name = matches[0]
+        return str(self.output_dir / name), distance
+
+    def mark_published(self, path: Union[str, Path]):
+        key = self._key(path)
+        value_hash = self.hashes.get(key)
+        if value_hash is None:
+            value_hash = self.add(path)
+        with self._lock:
+            if key in self._published_paths:
+                return
+            self._published_paths.add(key)
+            self.published.add(value_hash, key)
+            self._append({'published': key})
+
+
+# One index per output directory, shared by every generator and module saving there
+_indexes: Dict[str, OutputIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def index_for(output_dir: Union[str, Path], max_distance: int = 6) -> OutputIndex:
+    key = str(Path(output_dir).resolve())
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = OutputIndex(output_dir, max_distance)
+        return index
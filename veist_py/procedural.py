@@ -0,0 +1,77 @@
+"""
+Deterministic procedural image backend for offline and load testing
+"""
+
+import hashlib
+import random
+import time
+from typing import Tuple
+
+from PIL import Image, ImageDraw
+
+BUSY_MESSAGE = "Model too busy, unable to get response in less than 60 second(s)"
+
+
+def prompt_seed(prompt: str, seed: int = 0) -> int:
+    """Stable 64-bit seed for a prompt (unlike hash(), which is salted per process)"""
+    digest = hashlib.sha256(f"{seed}:{prompt}".encode()).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+def render_prompt_image(prompt: str, size: Tuple[int, int] = (1344, 768), seed: int = 0) -> Image.Image:
+    """Gradient, shapes and the prompt text, identical for identical prompts"""
+    rng = random.Random(prompt_seed(prompt, seed))
+    width, height = size
+
+    # Two-colour gradient at a prompt-dependent angle
+    start = tuple(rng.randrange(256) for _ in range(3))
+    end = tuple(rng.randrange(256) for _ in range(3))
+    mask = Image.linear_gradient('L').rotate(rng.randrange(360)).resize(size)
+    image = Image.composite(Image.new('RGB', size, start), Image.new('RGB', size, end), mask)
+
+    draw = ImageDraw.Draw(image)
+    for _ in range(rng.randint(6, 16)):
+        x, y = rng.randrange(width), rng.randrange(height)
+        r = rng.randrange(height // 20, height // 3)
+        fill = tuple(rng.randrange(256) for _ in range(3))
+        if rng.random() < 0.5:
+            draw.ellipse((x - r, y - r, x + r, y + r), fill=fill)
+        else:
+            draw.rectangle((x - r, y - r, x + r, y + r), fill=fill)
+    draw.text((16, height - 32), prompt[:160], fill='white')
+    return image
+
+
+class ProceduralBackend:
+    """Renders prompt images locally with synthetic latency and failures.
+
+    Failures are raised as exceptions, the same way the hosted backends
+    surface them, so "too busy" errors exercise the bot's retry path.
+    """
+
+    def __init__(self, width: int = 1344, height: int = 768, latency_seconds: float = 0.0,
+                 latency_jitter: float = 0.0, busy_rate: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.size = (width, height)
+        self.latency_seconds = latency_seconds
+        self.latency_jitter = latency_jitter
+        self.busy_rate = busy_rate
+        self.error_rate = error_rate
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'ProceduralBackend':
+        return cls(**config)
+
+    def generate(self, prompt: str, seed: int = None, latency_scale: float = 1.0) -> Image.Image:
+        """Prompt image for the backend's seed, or the given one; drafts scale the synthetic latency down"""
+        delay = (self.latency_seconds + self.rng.uniform(-1, 1) * self.latency_jitter) * latency_scale
+        if delay > 0:
+            time.sleep(delay)
+
+        roll = self.rng.random()
+        if roll < self.busy_rate:
+            raise RuntimeError(BUSY_MESSAGE)
+        if roll < self.busy_rate + self.error_rate:
+            raise RuntimeError("Procedural backend failure")
+        return render_prompt_image(prompt, self.size, self.seed if seed is None else seed)
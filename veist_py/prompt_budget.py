@@ -0,0 +1,102 @@
+"""
+Token budget for merged prompts: counts with the image model's tokenizer and compacts prompts that run over
+"""
+
+import math
+import re
+from typing import Callable, List, Optional
+
+from metrics import PROMPT_COMPACTIONS, PROMPT_GROWTH, PROMPT_TOKENS
+
+# Words, runs of punctuation and single symbols (emoji) as the estimate sees them
+ESTIMATE_PATTERN = re.compile(r"[A-Za-z0-9']+|[^\sA-Za-z0-9']")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough sentencepiece count for when no tokenizer is installed: ~4 letters a token, symbols cost 2"""
+    total = 0
+    for piece in ESTIMATE_PATTERN.findall(text):
+        if piece.isascii():
+            total += math.ceil(len(piece) / 4) if piece[0].isalnum() else 1
+        else:
+            total += 2
+    return total
+
+
+def load_token_counter(tokenizer_name: Optional[str]) -> Callable[[str], int]:
+    """Token counter for the named Hugging Face tokenizer, or the estimate without transformers"""
+    if tokenizer_name:
+        try:
+            from transformers import AutoTokenizer
+            tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+            return lambda text: len(tokenizer(text).input_ids)
+        except Exception as e:
+            print(f"Could not load tokenizer {tokenizer_name}, estimating prompt tokens instead: {e}")
+    return estimate_tokens
+
+
+def split_clauses(prompt: str) -> List[str]:
+    return [clause.strip() for clause in prompt.split(",") if clause.strip()]
+
+
+class PromptBudget:
+    """Keeps merged prompts within the image model's token limit.
+
+    FLUX reads at most max_sequence_length (256) T5 tokens and silently drops
+    the rest, so anything past the budget is paid for and never drawn. Over
+    budget, enforce() compacts in steps until the prompt fits: repeated
+    words and clauses are collapsed, then the oldest modifier clauses after
+    the base description are dropped, and as a last resort the tail is cut.
+    """
+
+    def __init__(self, max_tokens: int = 256, count_tokens: Callable[[str], int] = estimate_tokens):
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'PromptBudget':
+        return cls(
+            max_tokens=config.get('max_tokens', 256),
+            count_tokens=load_token_counter(config.get('tokenizer')),
+        )
+
+    def dedupe(self, prompt: str) -> str:
+        """Collapse "X and X and X" runs and repeated clauses, keeping the latest copy of each clause"""
+        # (?!\S) rather than \b, which never matches after an emoji
+        prompt = re.sub(r"(\S+)(?: and \1(?!\S))+", r"\1", prompt)
+        clauses = split_clauses(prompt)
+        kept = []
+        for index, clause in enumerate(clauses):
+            if index == 0 or clause.lower() not in (c.lower() for c in clauses[index + 1:]):
+                kept.append(clause)
+        return ", ".join(kept)
+
+    def trim_history(self, prompt: str) -> str:
+        """Drop the oldest modifiers after the base clause until the prompt fits"""
+        clauses = split_clauses(prompt)
+        while len(clauses) > 2 and self.count_tokens(", ".join(clauses)) > self.max_tokens:
+            del clauses[1]
+        return ", ".join(clauses)
+
+    def truncate(self, prompt: str) -> str:
+        words = prompt.split()
+        while len(words) > 1 and self.count_tokens(" ".join(words)) > self.max_tokens:
+            # Cut proportionally first, then word by word near the limit
+            excess = self.count_tokens(" ".join(words)) - self.max_tokens
+            words = words[:-max(1, excess // 2)]
+        return " ".join(words)
+
+    def enforce(self, prompt: str, previous: Optional[str] = None) -> str:
+        """The prompt within budget, recording its length and growth over the previous prompt"""
+        tokens = self.count_tokens(prompt)
+        for step, compact in (("dedupe", self.dedupe), ("trim_history", self.trim_history), ("truncate", self.truncate)):
+            if tokens <= self.max_tokens:
+                break
+            prompt = compact(prompt)
+            tokens = self.count_tokens(prompt)
+            PROMPT_COMPACTIONS.labels(step).inc()
+
+        PROMPT_TOKENS.observe(tokens)
+        if previous:
+            PROMPT_GROWTH.observe(tokens - self.count_tokens(previous))
+        return prompt
@@ -4,11 +4,16 @@ from merging.reaction_merger import ReactionMerger
 from merging.append_merger import AppendMerger
 from merging.deepseek_merger import DeepseekMerger
 from merging.deepseek_replicate_merger import DeepseekReplicateMerger
+from merging.weighted_merger import WeightedMerger
+from merging.tiered_merger import TieredMerger
+from merging.deadline_merger import DeadlineMerger
 
-def create_merger(strategy: str = "append") -> ReactionMerger:
+def create_merger(strategy: str = "append", lexicon=None, config: dict = None, governor=None) -> ReactionMerger:
     """Factory function to create the appropriate merger"""
     strategies = {
         "append": AppendMerger,
+        "weighted": WeightedMerger,
+        "tiered": TieredMerger,
         "deepseek": DeepseekMerger,
         "deepseek_replicate": DeepseekReplicateMerger,
         # Add more strategies here as needed
@@ -17,4 +22,30 @@ def create_merger(strategy: str = "append") -> ReactionMerger:
     if strategy not in strategies:
         raise ValueError(f"Unknown reaction merging strategy: {strategy}")
     
-    return strategies[strategy]() 
\ No newline at end of file
+    config = config or {}
+    # Local strategies translate emoji with the lexicon themselves
+    if strategy == "append":
+        return AppendMerger(lexicon)
+    if strategy == "weighted":
+        weighted = config.get('weighted', {})
+        return WeightedMerger(weighted.get('max_terms', 4), weighted.get('style', "phrase"), lexicon)
+    if strategy == "tiered":
+        tiered = config.get('tiered', {})
+        escalate_to = tiered.get('escalate_to', "deepseek_replicate")
+        return TieredMerger(
+            create_merger("weighted", lexicon, config),
+            create_merger(escalate_to, lexicon, config),
+            memory=tiered.get('memory', 20),
+            lexicon=lexicon,
+            governor=governor,
+            escalation_strategy=escalate_to,
+        )
+    if strategy == "deepseek":
+        return DeepseekMerger.from_config(config.get('deepseek', {}))
+    return strategies[strategy]()
+
+def create_deadline_merger(strategy: str, config: dict, governor=None, lexicon=None) -> DeadlineMerger:
+    """The strategy's merger wrapped with its configured deadline, budget and append fallback"""
+    return DeadlineMerger.from_config(
+        create_merger(strategy, lexicon, config, governor), strategy, config, governor=governor, lexicon=lexicon
+    )
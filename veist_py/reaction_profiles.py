@@ -0,0 +1,181 @@
+"""
+Per-user and per-channel reaction history as a decayed key x emoji count matrix, memory-mapped to disk
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def user_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def channel_key(channel_id: int) -> str:
+    return f"channel:{channel_id}"
+
+
+class ReactionProfiles:
+    """Decayed emoji counts per user and per channel.
+
+    Rows are allocated on a key's first reaction and emoji columns on an
+    emoji's first use, so the matrix only spans keys and emojis actually
+    seen. Each row remembers when it was last decayed; decay is applied to
+    whole rows (or the whole matrix) at once. With a path, the counts and
+    timestamps live in memory-mapped .npy files next to an index.json of keys
+    and emojis; without one they stay in memory.
+
+    One process writes the profiles; others (ShadowBot) open them with
+    readonly=True and reload() to pick up what the writer last flushed.
+    """
+
+    def __init__(self, path: Optional[str] = None, half_life: float = 7 * 24 * 3600,
+                 initial_rows: int = 1024, initial_emojis: int = 64, readonly: bool = False):
+        self.path = Path(path) if path else None
+        self.half_life = half_life
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        if self.path and not readonly:
+            self.path.mkdir(parents=True, exist_ok=True)
+        self._load()
+        if self.counts is None:
+            if readonly:
+                self.counts = np.zeros((0, 0), dtype=np.float32)
+                self.updated = np.zeros(0, dtype=np.float64)
+            else:
+                self.counts = self._allocate("counts", (initial_rows, initial_emojis), np.float32)
+                self.updated = self._allocate("updated", (initial_rows,), np.float64)
+
+    @classmethod
+    def from_config(cls, config: dict, readonly: bool = False) -> 'ReactionProfiles':
+        return cls(
+            path=config.get('path'),
+            half_life=config.get('half_life_hours', 168) * 3600,
+            readonly=readonly,
+        )
+
+    def _load(self):
+        """Map the arrays and read the index; counts is None when nothing is on disk yet"""
+        self.keys: List[str] = []
+        self.emojis: List[str] = []
+        self.counts = self.updated = None
+        if self.path:
+            index_path = self.path / "index.json"
+            if index_path.exists():
+                index = json.loads(index_path.read_text())
+                self.keys, self.emojis = index['keys'], index['emojis']
+            if (self.path / "counts.npy").exists():
+                mode = "r" if self.readonly else "r+"
+                self.counts = np.load(self.path / "counts.npy", mmap_mode=mode)
+                self.updated = np.load(self.path / "updated.npy", mmap_mode=mode)
+                # A reader can catch the index of a later flush than the arrays
+                self.keys = self.keys[:min(self.counts.shape[0], self.updated.shape[0])]
+                self.emojis = self.emojis[:self.counts.shape[1]]
+        self.rows: Dict[str, int] = {key: row for row, key in enumerate(self.keys)}
+        self.columns: Dict[str, int] = {emoji: col for col, emoji in enumerate(self.emojis)}
+
+    def reload(self):
+        """Re-read the arrays and index the writing process last flushed"""
+        if self.path is None or not self.readonly:
+            return
+        with self._lock:
+            self._load()
+            if self.counts is None:
+                self.counts = np.zeros((0, 0), dtype=np.float32)
+                self.updated = np.zeros(0, dtype=np.float64)
+
+    def _allocate(self, name: str, shape: Tuple[int, ...], dtype, suffix: str = "") -> np.ndarray:
+        if self.path is None:
+            return np.zeros(shape, dtype=dtype)
+        return np.lib.format.open_memmap(self.path / f"{name}{suffix}.npy", mode="w+", dtype=dtype, shape=shape)
+
+    def _grow(self, name: str, array: np.ndarray, shape: Tuple[int, ...]) -> np.ndarray:
+        """Copy into a larger array; on disk the new file replaces the old one once complete"""
+        grown = self._allocate(name, shape, array.dtype, suffix=".tmp" if self.path else "")
+        grown[tuple(slice(0, n) for n in array.shape)] = array
+        if self.path is None:
+            return grown
+        grown.flush()
+        del grown
+        os.replace(self.path / f"{name}.tmp.npy", self.path / f"{name}.npy")
+        return np.load(self.path / f"{name}.npy", mmap_mode="r+")
+
+    def _row(self, key: str) -> int:
+        row = self.rows.get(key)
+        if row is None:
+            row = self.rows[key] = len(self.keys)
+            self.keys.append(key)
+            if row >= self.counts.shape[0]:
+                rows = self.counts.shape[0] * 2
+                self.counts = self._grow("counts", self.counts, (rows, self.counts.shape[1]))
+                self.updated = self._grow("updated", self.updated, (rows,))
+            # After a crash the row can still hold counts of a key the lost index had there
+            self.counts[row] = 0
+            self.updated[row] = 0
+        return row
+
+    def _column(self, emoji: str) -> int:
+        col = self.columns.get(emoji)
+        if col is None:
+            col = self.columns[emoji] = len(self.emojis)
+            self.emojis.append(emoji)
+            if col >= self.counts.shape[1]:
+                self.counts = self._grow("counts", self.counts, (self.counts.shape[0], self.counts.shape[1] * 2))
+            self.counts[:, col] = 0
+        return col
+
+    def _decay_rows(self, rows, now: float):
+        factors = 0.5 ** (np.maximum(0.0, now - self.updated[rows]) / self.half_life)
+        self.counts[rows] *= factors[..., None].astype(np.float32)
+        self.updated[rows] = now
+
+    def record(self, keys: List[str], emoji: str, amount: float = 1.0, now: Optional[float] = None):
+        """Add a reaction to every key's profile (typically the user's and the channel's)"""
+        now = time.time() if now is None else now
+        with self._lock:
+            col = self._column(emoji)
+            rows = np.array([self._row(key) for key in keys])
+            self._decay_rows(rows, now)
+            self.counts[rows, col] += amount
+
+    def decay_all(self, now: Optional[float] = None):
+        """Bring every row's counts up to date in one pass"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._decay_rows(slice(0, len(self.keys)), now)
+
+    def vector(self, key: str, now: Optional[float] = None) -> np.ndarray:
+        """Decayed counts of a key over all known emojis, zeros for unseen keys"""
+        now = time.time() if now is None else now
+        with self._lock:
+            row = self.rows.get(key)
+            if row is None:
+                return np.zeros(len(self.emojis), dtype=np.float32)
+            factor = 0.5 ** (max(0.0, now - self.updated[row]) / self.half_life)
+            return self.counts[row, :len(self.emojis)] * np.float32(factor)
+
+    def top_k(self, key: str, k: int, now: Optional[float] = None) -> List[Tuple[str, float]]:
+        """The key's k heaviest emojis as (emoji, weight), heaviest first"""
+        weights = self.vector(key, now)
+        if k < len(weights):
+            candidates = np.argpartition(-weights, k)[:k]
+        else:
+            candidates = np.arange(len(weights))
+        ranked = candidates[np.argsort(-weights[candidates], kind="stable")]
+        return [(self.emojis[col], float(weights[col])) for col in ranked if weights[col] > 0]
+
+    def flush(self):
+        """Write the arrays and index to disk"""
+        if self.path is None or self.readonly:
+            return
+        with self._lock:
+            self.counts.flush()
+            self.updated.flush()
+            tmp_path = self.path / "index.json.tmp"
+            tmp_path.write_text(json.dumps({'keys': self.keys, 'emojis': self.emojis}))
+            os.replace(tmp_path, self.path / "index.json")
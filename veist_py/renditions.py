@@ -0,0 +1,141 @@
+"""
+Size-capped preview renditions for Discord posts
+"""
+
+import io
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from PIL import Image
+
+ImageSource = Union[str, Path, bytes]
+
+EXTENSIONS = {"WEBP": "webp", "JPEG": "jpg", "PNG": "png"}
+
+
+@dataclass(frozen=True)
+class PreviewSettings:
+    format: str = "WEBP"  # WEBP, JPEG or "original" to upload the full file
+    max_side: int = 1024
+    quality: int = 80
+
+    @property
+    def is_original(self) -> bool:
+        return self.format.lower() == "original"
+
+
+class RenditionStats:
+    """Running totals of what previews saved on uploads"""
+
+    def __init__(self):
+        self.uploads = 0
+        self.original_bytes = 0
+        self.uploaded_bytes = 0
+        self.encode_seconds = 0.0
+        self.upload_seconds = 0.0
+
+    def record_encode(self, seconds: float):
+        self.encode_seconds += seconds
+
+    def record_upload(self, original_bytes: int, uploaded_bytes: int, seconds: float):
+        self.uploads += 1
+        self.original_bytes += original_bytes
+        self.uploaded_bytes += uploaded_bytes
+        self.upload_seconds += seconds
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - self.uploaded_bytes
+
+    @property
+    def estimated_seconds_saved(self) -> float:
+        """Bytes saved at the measured upload throughput, minus time spent encoding"""
+        if not self.uploaded_bytes or not self.upload_seconds:
+            return 0.0
+        throughput = self.uploaded_bytes / self.upload_seconds
+        return self.bytes_saved / throughput - self.encode_seconds
+
+    def summary(self) -> str:
+        if not self.uploads:
+            return "No uploads yet"
+        saved_pct = 100 * self.bytes_saved / self.original_bytes if self.original_bytes else 0
+        return (
+            f"{self.uploads} uploads, {self.uploaded_bytes / 1024:.0f} KiB sent "
+            f"vs {self.original_bytes / 1024:.0f} KiB full-res ({saved_pct:.0f}% saved), "
+            f"upload {self.upload_seconds:.1f}s, encode {self.encode_seconds:.2f}s, "
+            f"~{self.estimated_seconds_saved:.1f}s saved"
+        )
+
+
+def make_preview(source: ImageSource, settings: PreviewSettings) -> bytes:
+    """Downscale and re-encode an image within settings.max_side"""
+    if isinstance(source, bytes):
+        image = Image.open(io.BytesIO(source))
+    else:
+        image = Image.open(source)
+    # JPEG sources can decode straight to a reduced scale
+    image.draft('RGB', (settings.max_side, settings.max_side))
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    image.thumbnail((settings.max_side, settings.max_side), Image.Resampling.LANCZOS)
+
+    output = io.BytesIO()
+    if settings.format.upper() == "WEBP":
+        image.save(output, format='WEBP', quality=settings.quality, method=4)
+    elif settings.format.upper() == "JPEG":
+        image.save(output, format='JPEG', quality=settings.quality, optimize=False)
+    else:
+        image.save(output, format='PNG', compress_level=1)
+    return output.getvalue()
+
+
+class PreviewRenderer:
+    """Chooses preview settings per channel and renders upload payloads"""
+
+    def __init__(self, default: PreviewSettings, channels: Optional[Dict[str, PreviewSettings]] = None):
+        self.default = default
+        self.channels = channels or {}
+        self.stats = RenditionStats()
+        # The same file usually goes to a thread and its parent channel in a row
+        self._last = (None, None)  # (key, rendition), swapped as one attribute
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'PreviewRenderer':
+        default = PreviewSettings(**config.get('default', {}))
+        channels = {}
+        for name, overrides in (config.get('channels') or {}).items():
+            channels[name] = PreviewSettings(**{**vars(default), **overrides})
+        return cls(default, channels)
+
+    def settings_for(self, channel_name: Optional[str]) -> PreviewSettings:
+        return self.channels.get(channel_name, self.default)
+
+    def render(self, source: ImageSource, stem: str,
+               channel_name: Optional[str] = None) -> Tuple[bytes, str, int]:
+        """Returns (upload bytes, filename, full-res size in bytes) for a channel"""
+        settings = self.settings_for(channel_name)
+        key = None if isinstance(source, bytes) else (str(source), stem, settings)
+        last_key, last_render = self._last
+        if key is not None and key == last_key:
+            return last_render
+
+        if isinstance(source, bytes):
+            original = source
+            extension = None
+        else:
+            original = Path(source).read_bytes()
+            extension = Path(source).suffix.lstrip('.')
+
+        rendition = (original, f"{stem}.{extension or 'png'}", len(original))
+        if not settings.is_original:
+            start = time.perf_counter()
+            data = make_preview(original, settings)
+            self.stats.record_encode(time.perf_counter() - start)
+            # Keep the original when it is already smaller than the "preview"
+            if len(data) < len(original):
+                rendition = (data, f"{stem}.{EXTENSIONS.get(settings.format.upper(), 'png')}", len(original))
+
+        self._last = (key, rendition)
+        return rendition
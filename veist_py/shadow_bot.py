@@ -1,54 +1,105 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from dotenv import load_dotenv
 import os
-from typing import Dict
+import yaml
+from pathlib import Path
+from reaction_profiles import ReactionProfiles, channel_key
+from shadows import ShadowRegistry, ShadowReplayer
 
 load_dotenv()
 TOKEN = os.getenv('DISCORD_SHADOWBOT_TOKEN')
 VEIST_BOT_ID = int(os.getenv('VEIST_BOT_ID', '0'))
+# Shadows kept in memory; less active ones live in shadows.sqlite until they are seen again
+SHADOW_CACHE_SIZE = int(os.getenv('SHADOW_CACHE_SIZE', '10000'))
+# Distinct shadow reactions replayed per Veist post, and the spacing between them
+SHADOW_MAX_REACTIONS = int(os.getenv('SHADOW_MAX_REACTIONS', '10'))
+SHADOW_REACTION_INTERVAL = float(os.getenv('SHADOW_REACTION_INTERVAL', '0.3'))
+# Shadow votes halve in weight every SHADOW_VOTE_HALF_LIFE seconds; bot.py reads them from shadows.sqlite
+SHADOW_VOTE_HALF_LIFE = float(os.getenv('SHADOW_VOTE_HALF_LIFE', str(6 * 3600)))
+SHADOW_VOTE_PUBLISH_SECONDS = float(os.getenv('SHADOW_VOTE_PUBLISH_SECONDS', '30'))
 
-class ShadowData:
-    def __init__(self, member: discord.Member):
-        self.member = member
-        self.name = f"👻shadow_{member.name}"
-        self.message_count = 0
+def load_config_section(name):
+    """A section of the Veist bots' config, user config.yaml over the defaults"""
+    section = {}
+    for filename in ("default_config.yaml", "config.yaml"):
+        path = Path(__file__).parent / filename
+        if path.exists():
+            with open(path, 'r') as f:
+                section.update((yaml.safe_load(f) or {}).get(name) or {})
+    return section
+
+def load_meta_reactions():
+    """The Veist bots' meta reactions, which shadows never vote for"""
+    return list(load_config_section('meta_reactions').values())
 
 class ShadowBot(commands.Bot):
     def __init__(self):
         intents = discord.Intents.default()
-        intents.members = True
         intents.message_content = True
         intents.reactions = True
-        super().__init__(command_prefix='!', intents=intents)
-        
-        self.shadows: Dict[int, ShadowData] = {}
+        # Shadows are created on first activity, so no members intent or startup chunking
+        super().__init__(command_prefix='!', intents=intents, chunk_guilds_at_startup=False)
+
+        # A replayed all_done would end bot.py's session, so meta reactions are left out of votes and replay
+        self.shadows = ShadowRegistry(capacity=SHADOW_CACHE_SIZE, half_life=SHADOW_VOTE_HALF_LIFE,
+                                      ignored_emojis=load_meta_reactions())
+        self.replayer = ShadowReplayer(interval=SHADOW_REACTION_INTERVAL, max_reactions=SHADOW_MAX_REACTIONS)
+        # bot.py's reaction profiles fill the replay with the channel's long-run favourites
+        profiles_config = load_config_section('profiles')
+        self.profiles = None
+        if profiles_config.get('enabled') and profiles_config.get('path'):
+            self.profiles = ReactionProfiles.from_config(profiles_config, readonly=True)
 
     async def setup_hook(self):
         await self.tree.sync()
+        self.publish_votes.change_interval(seconds=SHADOW_VOTE_PUBLISH_SECONDS)
+        self.publish_votes.start()
+
+    @tasks.loop(seconds=30)
+    async def publish_votes(self):
+        """Refresh the vote vector bot.py merges into its reactions"""
+        self.shadows.publish_votes()
+        if self.profiles:
+            self.profiles.reload()
 
     async def on_ready(self):
         print(f'{self.user} is ready to create shadows!')
-        for guild in self.guilds:
-            for member in guild.members:
-                if not member.bot:
-                    self.create_shadow(member)
 
-    def create_shadow(self, member: discord.Member) -> ShadowData:
-        shadow = ShadowData(member)
-        self.shadows[member.id] = shadow
-        return shadow
+    async def close(self):
+        self.publish_votes.cancel()
+        self.shadows.publish_votes()
+        self.shadows.close()
+        await super().close()
 
     async def on_message(self, message):
         if message.author.id == VEIST_BOT_ID:
-            try:
-                await message.add_reaction("👻")
-            except Exception:
-                pass
+            # Repeat what the shadows last reacted with, or just mark the post before anyone has
+            self.replayer.schedule(message, self.replay_emojis(message) or ["👻"])
+        elif not message.author.bot:
+            self.shadows.record_message(message.author.id)
 
         await self.process_commands(message)
 
+    def replay_emojis(self, message):
+        """The shadows' top emojis, topped up with the channel's favourites from the reaction profiles"""
+        emojis = self.shadows.top_emojis(SHADOW_MAX_REACTIONS)
+        if self.profiles and len(emojis) < SHADOW_MAX_REACTIONS:
+            # Veist posts go to threads; bot.py profiles the generation channel they hang off
+            channel_id = getattr(message.channel, 'parent_id', None) or message.channel.id
+            for emoji, _ in self.profiles.top_k(channel_key(channel_id), SHADOW_MAX_REACTIONS):
+                if len(emojis) >= SHADOW_MAX_REACTIONS:
+                    break
+                if emoji not in emojis and emoji not in self.shadows.ignored_emojis:
+                    emojis.append(emoji)
+        return emojis
+
+    async def on_raw_reaction_add(self, payload):
+        if payload.user_id != self.user.id and not (payload.member and payload.member.bot):
+            on_veist_post = payload.message_author_id == VEIST_BOT_ID
+            self.shadows.record_reaction(payload.user_id, str(payload.emoji) if on_veist_post else None)
+
 bot = ShadowBot()
 
 if __name__ == "__main__":
-    bot.run(TOKEN) 
\ No newline at end of file
+    bot.run(TOKEN)
@@ -0,0 +1,312 @@
+"""
+Compact shadow registry for ShadowBot: created on first activity, LRU-evicted to SQLite,
+plus paced replay of the shadows' reactions onto new Veist posts and the decayed
+vote vector bot.py merges into its reactions
+"""
+
+import asyncio
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_DB_PATH = Path(__file__).parent / "shadows.sqlite"
+# Votes below this weight are left out of the published vector
+MIN_VOTE_WEIGHT = 0.01
+
+
+def shadow_name(user) -> str:
+    return f"👻shadow_{user.name}"
+
+
+class ShadowData:
+    """Activity counters for one user's shadow, keyed by ID rather than a Member reference"""
+    __slots__ = ("user_id", "message_count", "reaction_count", "last_active", "last_emoji", "voted_at")
+
+    def __init__(self, user_id: int, message_count: int = 0, reaction_count: int = 0, last_active: float = 0.0,
+                 last_emoji: Optional[str] = None, voted_at: float = 0.0):
+        self.user_id = user_id
+        self.message_count = message_count
+        self.reaction_count = reaction_count
+        self.last_active = last_active
+        # Last reaction the user left on a Veist post, which the shadow repeats and votes for
+        self.last_emoji = last_emoji
+        self.voted_at = voted_at
+
+
+class ShadowRegistry:
+    """Keeps the most recently active shadows in memory and the rest in SQLite.
+
+    Shadows are created the first time a user is seen, so startup never needs
+    the member list. Once more than capacity shadows are loaded, the least
+    recently active one is written back to the database and dropped.
+
+    Every shadow, loaded or not, votes for its last emoji with a weight that
+    halves every half_life seconds since the user reacted. The per-emoji
+    sums are kept incrementally, so reading the vector never scans shadows.
+    Ignored emojis (the bots' meta reactions) are counted but never voted
+    for, so they are neither replayed nor merged.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, capacity: int = 10000, half_life: float = 6 * 3600,
+                 ignored_emojis: Iterable[str] = ()):
+        self.db_path = str(db_path or DEFAULT_DB_PATH)
+        self.capacity = capacity
+        self.half_life = half_life
+        self.ignored_emojis = frozenset(ignored_emojis)
+        self._lock = threading.Lock()
+        # user ID -> shadow, least recently active first
+        self._shadows: "OrderedDict[int, ShadowData]" = OrderedDict()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS shadows (
+                user_id INTEGER PRIMARY KEY,
+                message_count INTEGER NOT NULL,
+                reaction_count INTEGER NOT NULL,
+                last_active REAL NOT NULL,
+                last_emoji TEXT,
+                voted_at REAL NOT NULL DEFAULT 0
+            )
+        """)
+        # Databases from before replay and votes lack the vote columns
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(shadows)")}
+        if "last_emoji" not in columns:
+            self._conn.execute("ALTER TABLE shadows ADD COLUMN last_emoji TEXT")
+        if "voted_at" not in columns:
+            self._conn.execute("ALTER TABLE shadows ADD COLUMN voted_at REAL NOT NULL DEFAULT 0")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS shadow_votes (
+                emoji TEXT PRIMARY KEY,
+                weight REAL NOT NULL,
+                updated REAL NOT NULL
+            )
+        """)
+        # Each voter's share of shadow_votes, so readers can leave out users who are present
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS shadow_voters (
+                user_id INTEGER PRIMARY KEY,
+                emoji TEXT NOT NULL,
+                weight REAL NOT NULL,
+                updated REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS shadows_voted_at ON shadows (voted_at)")
+        self._conn.commit()
+
+        # emoji -> [summed weight, time it was decayed to]
+        self._votes: Dict[str, list] = {}
+        now = time.time()
+        for emoji, voted_at in self._conn.execute(
+            "SELECT last_emoji, voted_at FROM shadows WHERE last_emoji IS NOT NULL"
+        ):
+            if emoji not in self.ignored_emojis:
+                self._add_vote(emoji, self._decay(now - voted_at), now)
+
+    def _decay(self, age: float) -> float:
+        return 0.5 ** (max(0.0, age) / self.half_life)
+
+    def _add_vote(self, emoji: str, weight: float, now: float):
+        vote = self._votes.get(emoji)
+        if vote is None:
+            vote = self._votes[emoji] = [0.0, now]
+        vote[0] = vote[0] * self._decay(now - vote[1]) + weight
+        vote[1] = now
+
+    def __len__(self) -> int:
+        return len(self._shadows)
+
+    def _load(self, user_id: int) -> Optional[ShadowData]:
+        row = self._conn.execute(
+            "SELECT message_count, reaction_count, last_active, last_emoji, voted_at FROM shadows WHERE user_id = ?",
+            (user_id,)
+        ).fetchone()
+        return ShadowData(user_id, *row) if row else None
+
+    def _save(self, shadows):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO shadows (user_id, message_count, reaction_count, last_active, last_emoji, voted_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(s.user_id, s.message_count, s.reaction_count, s.last_active, s.last_emoji, s.voted_at) for s in shadows]
+        )
+        self._conn.commit()
+
+    def get(self, user_id: int) -> Optional[ShadowData]:
+        """Existing shadow from memory or the database, without marking it active"""
+        with self._lock:
+            shadow = self._shadows.get(user_id)
+            return shadow if shadow is not None else self._load(user_id)
+
+    def touch(self, user_id: int) -> ShadowData:
+        """The user's shadow, created on first sight and marked most recently active"""
+        with self._lock:
+            shadow = self._shadows.pop(user_id, None)
+            if shadow is None:
+                shadow = self._load(user_id) or ShadowData(user_id)
+            shadow.last_active = time.time()
+            self._shadows[user_id] = shadow
+            if len(self._shadows) > self.capacity:
+                evicted = []
+                while len(self._shadows) > self.capacity:
+                    evicted.append(self._shadows.popitem(last=False)[1])
+                self._save(evicted)
+            return shadow
+
+    def record_message(self, user_id: int) -> ShadowData:
+        shadow = self.touch(user_id)
+        shadow.message_count += 1
+        return shadow
+
+    def record_reaction(self, user_id: int, emoji: Optional[str] = None) -> ShadowData:
+        """Count a reaction; emoji is given for reactions on Veist posts, which the shadow will repeat"""
+        shadow = self.touch(user_id)
+        shadow.reaction_count += 1
+        if emoji is not None and emoji not in self.ignored_emojis:
+            now = time.time()
+            with self._lock:
+                # Each user holds a single vote: withdraw what is left of the previous one
+                if shadow.last_emoji is not None and shadow.last_emoji not in self.ignored_emojis:
+                    self._add_vote(shadow.last_emoji, -self._decay(now - shadow.voted_at), now)
+                self._add_vote(emoji, 1.0, now)
+                shadow.last_emoji = emoji
+                shadow.voted_at = now
+        return shadow
+
+    def vote_vector(self, limit: Optional[int] = None) -> Dict[str, float]:
+        """Current decayed vote weight per emoji, heaviest first"""
+        now = time.time()
+        with self._lock:
+            weights = [
+                (emoji, weight * self._decay(now - updated)) for emoji, (weight, updated) in self._votes.items()
+            ]
+        weights = sorted((w for w in weights if w[1] >= MIN_VOTE_WEIGHT), key=lambda w: w[1], reverse=True)
+        return dict(weights[:limit])
+
+    def top_emojis(self, limit: int) -> List[str]:
+        """Emojis with the most shadow votes, most popular first"""
+        return list(self.vote_vector(limit))
+
+    def _voters(self, now: float) -> Dict[int, tuple]:
+        """user ID -> (emoji, decayed weight) of every shadow whose vote still counts; call with the lock held"""
+        cutoff = now - self.half_life * math.log2(1 / MIN_VOTE_WEIGHT)
+        voters = {
+            user_id: (emoji, voted_at) for user_id, emoji, voted_at in self._conn.execute(
+                "SELECT user_id, last_emoji, voted_at FROM shadows WHERE last_emoji IS NOT NULL AND voted_at >= ?",
+                (cutoff,)
+            )
+        }
+        # Loaded shadows may be newer than their rows
+        for shadow in self._shadows.values():
+            if shadow.last_emoji is not None and shadow.voted_at >= cutoff:
+                voters[shadow.user_id] = (shadow.last_emoji, shadow.voted_at)
+            else:
+                voters.pop(shadow.user_id, None)
+        return {
+            user_id: (emoji, self._decay(now - voted_at))
+            for user_id, (emoji, voted_at) in voters.items() if emoji not in self.ignored_emojis
+        }
+
+    def publish_votes(self, limit: int = 20):
+        """Write the vote vector, and each voter's share of it, where other local processes (bot.py) can read it"""
+        vector = self.vote_vector(limit)
+        now = time.time()
+        with self._lock:
+            voters = self._voters(now)
+            with self._conn:
+                self._conn.execute("DELETE FROM shadow_votes")
+                self._conn.executemany(
+                    "INSERT INTO shadow_votes (emoji, weight, updated) VALUES (?, ?, ?)",
+                    [(emoji, weight, now) for emoji, weight in vector.items()]
+                )
+                self._conn.execute("DELETE FROM shadow_voters")
+                self._conn.executemany(
+                    "INSERT INTO shadow_voters (user_id, emoji, weight, updated) VALUES (?, ?, ?, ?)",
+                    [(user_id, emoji, weight, now) for user_id, (emoji, weight) in voters.items() if emoji in vector]
+                )
+
+    def flush(self):
+        """Write every loaded shadow back to the database"""
+        with self._lock:
+            self._save(list(self._shadows.values()))
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+
+def read_vote_vector(db_path: Optional[str] = None, max_age: float = 600,
+                     exclude_users: Iterable[int] = ()) -> Dict[str, float]:
+    """The vote vector ShadowBot last published, empty if it is missing or older than max_age seconds.
+
+    The shadows of exclude_users (users reacting in person) are left out.
+    """
+    try:
+        conn = sqlite3.connect(f"file:{db_path or DEFAULT_DB_PATH}?mode=ro", uri=True)
+    except sqlite3.OperationalError:
+        return {}
+    exclude_users = list(exclude_users)
+    try:
+        cutoff = time.time() - max_age
+        votes = dict(conn.execute(
+            "SELECT emoji, weight FROM shadow_votes WHERE updated >= ? ORDER BY weight DESC", (cutoff,)
+        ).fetchall())
+        if votes and exclude_users:
+            placeholders = ", ".join("?" * len(exclude_users))
+            for emoji, weight in conn.execute(
+                f"SELECT emoji, weight FROM shadow_voters WHERE updated >= ? AND user_id IN ({placeholders})",
+                (cutoff, *exclude_users)
+            ):
+                if emoji in votes:
+                    votes[emoji] -= weight
+    except sqlite3.OperationalError:
+        return {}
+    finally:
+        conn.close()
+    return {emoji: weight for emoji, weight in votes.items() if weight >= MIN_VOTE_WEIGHT}
+
+
+class ShadowReplayer:
+    """Adds the shadows' aggregate reactions to new posts without tripping Discord's rate limits.
+
+    Each post gets one reaction per distinct emoji, at most max_reactions, so
+    the number of API calls doesn't grow with the number of shadows. Adds are
+    queued per channel (Discord's reaction route is limited per channel) and
+    spaced interval seconds apart. A newer post in the channel replaces any
+    reactions still queued for the previous one.
+    """
+
+    def __init__(self, interval: float = 0.3, max_reactions: int = 10):
+        self.interval = interval
+        self.max_reactions = max_reactions
+        # channel ID -> (message, emoji) adds still to make
+        self.lanes: Dict[int, deque] = {}
+        self.workers: Dict[int, asyncio.Task] = {}
+        self.calls = 0
+
+    def schedule(self, message, emojis: List[str]):
+        channel_id = message.channel.id
+        lane = self.lanes.setdefault(channel_id, deque())
+        lane.clear()
+        for emoji in list(dict.fromkeys(emojis))[:self.max_reactions]:
+            lane.append((message, emoji))
+
+        worker = self.workers.get(channel_id)
+        if worker is None or worker.done():
+            self.workers[channel_id] = asyncio.create_task(self._drain(lane))
+
+    async def _drain(self, lane: deque):
+        while lane:
+            message, emoji = lane.popleft()
+            try:
+                await message.add_reaction(emoji)
+            except Exception as e:
+                print(f"Failed to replay {emoji} on {message.id}: {e}")
+            self.calls += 1
+            await asyncio.sleep(self.interval)
+
+    async def wait(self):
+        """Wait for every queued reaction to be sent"""
+        await asyncio.gather(*self.workers.values())
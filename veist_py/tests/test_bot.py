@@ -0,0 +1,191 @@
+import unittest
+import asyncio
+import copy
+import os
+import tempfile
+from unittest import mock
+import bot
+import circuit_breaker
+from generator import DRAFT, FINAL, VeistGenerator
+from governor import CostGovernor
+from hedging import HedgedGenerator, HedgePolicy
+from PIL import Image
+from reaction_profiles import ReactionProfiles, channel_key
+from shadows import ShadowRegistry
+
+def make_bot(output_dir, **overrides):
+    """bot.VeistBot without side effects: no lexicon, profiles or shared governor, outputs in output_dir.
+
+    overrides replace top-level config sections. Call from a running event loop;
+    the patched CONFIG stays in place until stop_patches() is called on the result.
+    """
+    config = copy.deepcopy(bot.CONFIG)
+    config['lexicon']['enabled'] = False
+    config['profiles']['enabled'] = False
+    config['hedging']['enabled'] = False
+    config['governor']['enabled'] = False
+    config['tracing']['exporters'] = []
+    config['circuit_breaker']['failover_backends'] = []
+    config.update(overrides)
+    patches = [
+        mock.patch.object(bot, 'CONFIG', config),
+        mock.patch.object(bot, 'governor_for', CostGovernor.from_config),
+        mock.patch.object(bot, 'create_generator', lambda backend: VeistGenerator(
+            backend='procedural', output_dir=output_dir, procedural_config={'width': 64, 'height': 64})),
+    ]
+    for patch in patches:
+        patch.start()
+    veist = bot.VeistBot()
+    veist.loop = asyncio.get_running_loop()
+    veist.stop_patches = lambda: [patch.stop() for patch in patches]
+    return veist
+
+class TestFailover(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        # Breakers are process-wide, don't leave this one open for other tests
+        circuit_breaker._breakers.pop('huggingface', None)
+        circuit_breaker._breakers.pop('procedural', None)
+        self.tmpdir.cleanup()
+
+    def make_bot(self):
+        """bot.py with a tokenless huggingface primary and a procedural failover"""
+        veist = make_bot(self.tmpdir.name)
+        self.addCleanup(veist.stop_patches)
+        with mock.patch.dict(os.environ, {'HF_TOKEN': ''}):
+            veist.generator = VeistGenerator(backend='huggingface', output_dir=self.tmpdir.name)
+        veist.failover_generators = [
+            VeistGenerator(backend='procedural', output_dir=self.tmpdir.name,
+                           procedural_config={'width': 64, 'height': 64})
+        ]
+        veist.start_generators()
+        return veist
+
+    def test_open_primary_fails_over(self):
+        async def run():
+            veist = self.make_bot()
+            breaker_config = bot.CONFIG['circuit_breaker']
+            breaker = circuit_breaker.breaker_for('huggingface', breaker_config)
+            for _ in range(breaker_config['failure_threshold']):
+                breaker.record_failure()
+            return await veist.generate_with_retry("a robot")
+
+        result = asyncio.run(run())
+        self.assertEqual(result['status'], "generated")
+        self.assertTrue(result['path'].startswith(self.tmpdir.name))
+
+    def test_refused_acquire_skips_backend(self):
+        async def run():
+            veist = self.make_bot()
+            # The budget check passed, but another session drained the primary's bucket before acquire
+            veist.governor = mock.Mock()
+            veist.governor.degraded.return_value = False
+            veist.governor.allows.return_value = True
+            veist.governor.acquire.side_effect = lambda provider, backend, images: backend != 'huggingface'
+            return veist.pick_generator(), veist.failover_generators[0]
+
+        picked, failover = asyncio.run(run())
+        self.assertIs(picked, failover)
+
+    def test_hedged_primary_failure_reaches_its_breaker(self):
+        async def run():
+            veist = self.make_bot()
+            # The tokenless primary raises, the procedural secondary covers for it
+            veist.hedger = HedgedGenerator(veist.generator, veist.failover_generators, HedgePolicy(max_delay=10))
+            veist.failover_generators = []
+            return await veist.generate_with_retry("a robot")
+
+        result = asyncio.run(run())
+        self.assertEqual(result['backend'], "procedural")
+        breaker_config = bot.CONFIG['circuit_breaker']
+        self.assertEqual(circuit_breaker.breaker_for('huggingface', breaker_config).failures, 1)
+        self.assertEqual(circuit_breaker.breaker_for('procedural', breaker_config).failures, 0)
+
+    def test_final_render_uses_draft_backend(self):
+        async def run():
+            veist = self.make_bot()
+            veist.update_timer_message = mock.AsyncMock()
+            # The failover drew the draft while the primary was down
+            draft = veist.failover_generators[0].generate_image("a robot", DRAFT)
+            veist.last_prompt, veist.last_image_path = draft['prompt'], draft['path']
+            veist.last_quality, veist.last_seed, veist.last_backend = DRAFT, draft['seed'], draft['backend']
+            return draft, await veist.render_final()
+
+        draft, final_path = asyncio.run(run())
+        self.assertNotEqual(final_path, draft['path'])
+        self.assertIn(f"_{FINAL}_{draft['seed']}", final_path)
+
+class TestReactionChecks(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "shadows.sqlite")
+        # Fresh shadow votes ShadowBot keeps publishing for absent users
+        registry = ShadowRegistry(self.db_path)
+        for user_id in range(10):
+            registry.record_reaction(user_id, "🔥")
+        registry.publish_votes()
+        registry.close()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_cycle(self, reactions, channel_favourite=None):
+        """One _generate_and_send cycle on a variation carrying reactions (emoji -> count)"""
+        async def run():
+            shadows = {**bot.CONFIG['shadows'], 'enabled': True, 'db_path': self.db_path, 'weight': 1.0}
+            profiles = {**bot.CONFIG['profiles'], 'channel_prior_count': 2}
+            veist = make_bot(self.tmpdir.name, shadows=shadows, profiles=profiles)
+            self.addCleanup(veist.stop_patches)
+            veist.generation_channel = mock.AsyncMock(id=9)
+            if channel_favourite:
+                veist.profiles = ReactionProfiles()
+                veist.profiles.record([channel_key(9)], channel_favourite)
+            image_path = os.path.join(self.tmpdir.name, "last.jpg")
+            Image.new("RGB", (8, 8)).save(image_path)
+            veist.last_image_path, veist.last_prompt = image_path, "a robot"
+            message = mock.Mock(id=1, reactions=[mock.Mock(emoji=emoji, count=count) for emoji, count in reactions.items()])
+            veist.last_thread_message = message
+            veist.current_thread = mock.AsyncMock()
+            veist.current_thread.fetch_message.return_value = message
+            veist.current_version_message = mock.AsyncMock()
+            veist.update_thread_message_status = mock.AsyncMock()
+            veist.send_contact_sheet = mock.AsyncMock()
+            veist.start_new_generation = mock.AsyncMock()
+            veist.build_next_prompt = mock.AsyncMock(return_value="a robot on fire")
+            outcome = await veist._generate_and_send()
+            return outcome, veist.build_next_prompt
+
+        return asyncio.run(run())
+
+    def test_all_done_completes_despite_shadow_votes(self):
+        # The bot's own all_done plus one person's
+        outcome, build_next_prompt = self.run_cycle({bot.CONFIG['meta_reactions']['all_done']: 2})
+        self.assertEqual(outcome, "completed")
+        build_next_prompt.assert_not_called()
+
+    def test_shadow_votes_alone_wait_for_reactions(self):
+        outcome, build_next_prompt = self.run_cycle({})
+        self.assertEqual(outcome, "waiting")
+        build_next_prompt.assert_not_called()
+
+    def test_channel_prior_doesnt_block_all_done(self):
+        outcome, _ = self.run_cycle({bot.CONFIG['meta_reactions']['all_done']: 2}, channel_favourite="🤖")
+        self.assertEqual(outcome, "completed")
+        outcome, _ = self.run_cycle({}, channel_favourite="🤖")
+        self.assertEqual(outcome, "waiting")
+
+    def test_channel_prior_joins_the_merge(self):
+        _, build_next_prompt = self.run_cycle({"🌊": 1}, channel_favourite="🤖")
+        self.assertEqual(build_next_prompt.call_args.args[0]["🤖"], 2)
+
+    def test_shadow_votes_join_in_person_reactions(self):
+        outcome, build_next_prompt = self.run_cycle({"🌊": 1})
+        self.assertNotIn(outcome, ("completed", "waiting"))
+        reactions = build_next_prompt.call_args.args[0]
+        self.assertEqual(reactions["🌊"], 1)
+        self.assertEqual(reactions["🔥"], bot.CONFIG['shadows']['max_count'])
+
+if __name__ == '__main__':
+    unittest.main()
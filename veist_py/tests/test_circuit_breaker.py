@@ -0,0 +1,67 @@
+import unittest
+import random
+from circuit_breaker import CircuitBreaker, backoff_delay, CLOSED, HALF_OPEN, OPEN
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=10,
+                                      max_reset_timeout=25, clock=self.clock)
+
+    def trip(self):
+        for _ in range(3):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record_failure()
+
+    def test_opens_after_threshold(self):
+        self.trip()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.retry_after(), 10)
+
+    def test_success_resets_failure_count(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_single_half_open_probe(self):
+        self.trip()
+        self.clock.now = 10
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertFalse(self.breaker.allow())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+    def test_failed_probe_doubles_open_period(self):
+        self.trip()
+        self.clock.now = 10
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.retry_after(), 20)
+        self.clock.now = 30
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        # Capped at max_reset_timeout
+        self.assertEqual(self.breaker.retry_after(), 25)
+
+    def test_backoff_delay_bounds(self):
+        rng = random.Random(0)
+        for attempt in range(8):
+            step = min(60, 5 * 2 ** attempt)
+            delay = backoff_delay(attempt, 5, 60, rng)
+            self.assertGreaterEqual(delay, step / 2)
+            self.assertLessEqual(delay, step)
+
+if __name__ == '__main__':
+    unittest.main()
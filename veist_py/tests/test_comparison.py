@@ -0,0 +1,42 @@
+import unittest
+import io
+from PIL import Image
+from comparison import ComparisonRenderer
+
+def make_image_bytes(color, size=(64, 48)):
+    output = io.BytesIO()
+    Image.new('RGB', size, color).save(output, format='PNG')
+    return output.getvalue()
+
+class TestComparisonRenderer(unittest.TestCase):
+    def setUp(self):
+        self.renderer = ComparisonRenderer(padding=4, text_height=20)
+        self.red = make_image_bytes('red')
+        self.blue = make_image_bytes('blue')
+        self.green = make_image_bytes('green')
+
+    def test_render_layout(self):
+        combined = Image.open(io.BytesIO(self.renderer.render(self.red, self.blue, "🔥: 1")))
+        self.assertEqual(combined.size, (64 * 2 + 4 * 3, 48 + 20 + 4 * 2))
+        self.assertEqual(combined.getpixel((4 + 10, 30)), (255, 0, 0))
+        self.assertEqual(combined.getpixel((64 + 8 + 10, 30)), (0, 0, 255))
+
+    def test_new_image_reused_as_next_old(self):
+        self.renderer.render(self.red, self.blue, "🔥: 1")
+        cached = self.renderer._cached_image
+        self.assertIs(self.renderer._decode(self.blue), cached)
+
+    def test_canvas_is_reused_and_redrawn(self):
+        self.renderer.render(self.red, self.blue, "🔥: 1")
+        combined = Image.open(io.BytesIO(self.renderer.render(self.blue, self.green, "🌊: 2")))
+        self.assertEqual(len(self.renderer._canvases), 1)
+        self.assertEqual(combined.getpixel((4 + 10, 30)), (0, 0, 255))
+        self.assertEqual(combined.getpixel((64 + 8 + 10, 30))[1], 128)
+
+    def test_webp_format(self):
+        renderer = ComparisonRenderer(format="webp")
+        self.assertEqual(renderer.extension, "webp")
+        self.assertEqual(Image.open(io.BytesIO(renderer.render(self.red, self.blue, "🔥: 1"))).format, "WEBP")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import io
+from PIL import Image
+from contact_sheet import ContactSheet
+
+def make_image_bytes(color, size=(160, 90), format='JPEG'):
+    output = io.BytesIO()
+    Image.new('RGB', size, color).save(output, format=format)
+    return output.getvalue()
+
+class TestContactSheet(unittest.TestCase):
+    def setUp(self):
+        self.sheet = ContactSheet(columns=3, cell_size=(32, 32), padding=2, label=False)
+
+    def test_empty_sheet(self):
+        self.assertEqual(len(self.sheet), 0)
+        with self.assertRaises(ValueError):
+            self.sheet.grid()
+
+    def test_grid_grows_by_rows(self):
+        for color in ['red', 'green', 'blue', 'white']:
+            self.sheet.add(make_image_bytes(color))
+        grid = self.sheet.grid()
+        self.assertEqual(grid.size, (2 + 3 * 34, 2 + 2 * 34))
+        # Fourth cell starts the second row
+        self.assertGreater(grid.getpixel((2 + 16, 36 + 16))[2], 200)
+        self.assertEqual(self.sheet._row_capacity, 2)
+
+    def test_caller_image_not_modified(self):
+        image = Image.new('RGB', (100, 100), 'red')
+        self.sheet.add(image)
+        self.assertEqual(image.size, (100, 100))
+
+    def test_exports(self):
+        self.sheet.add(make_image_bytes('red'))
+        self.sheet.add(make_image_bytes('blue', format='PNG'))
+        data, extension = self.sheet.export('gif')
+        self.assertEqual(extension, 'gif')
+        animation = Image.open(io.BytesIO(data))
+        self.assertEqual(animation.n_frames, 2)
+        data, extension = self.sheet.export('grid')
+        self.assertEqual(Image.open(io.BytesIO(data)).format, 'PNG')
+        with self.assertRaises(ValueError):
+            self.sheet.export('mp4')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import asyncio
+import threading
+from governor import CostGovernor
+from merging.deadline_merger import DeadlineMerger
+from merging.reaction_merger import ReactionMerger
+from prompt_budget import PromptBudget
+
+class SlowMerger(ReactionMerger):
+    """Waits for release before returning an LLM-style rewrite"""
+    def __init__(self):
+        self.release = threading.Event()
+
+    def merge(self, prompt, reactions):
+        self.release.wait(5)
+        return f"{prompt} reimagined"
+
+class FailingMerger(ReactionMerger):
+    def merge(self, prompt, reactions):
+        raise RuntimeError("model unavailable")
+
+class PlainMerger:
+    """Duck-typed merger without ReactionMerger's provider/fast attributes, like the benchmark fakes"""
+    def merge(self, prompt, reactions):
+        return f"{prompt} rewritten"
+
+class TestDeadlineMerger(unittest.TestCase):
+    def test_timeout_falls_back_and_swaps_in_late_result(self):
+        slow = SlowMerger()
+        merger = DeadlineMerger(slow, "slow", deadline=0.05)
+
+        async def run():
+            first = await merger.merge("a robot", {"🔥": 1})
+            slow.release.set()
+            await asyncio.sleep(0.05)
+            second = await merger.merge(first, {"🌊": 1})
+            return first, second
+
+        first, second = asyncio.run(run())
+        self.assertEqual(first, "a robot, but more 🔥")
+        self.assertEqual(second, "a robot reimagined reimagined")
+
+    def test_late_result_survives_prompt_compaction(self):
+        slow = SlowMerger()
+        merger = DeadlineMerger(slow, "slow", deadline=0.05)
+        budget = PromptBudget(max_tokens=6, count_tokens=lambda text: len(text.split()))
+        base = "a robot in a garden, but more 🌊"
+
+        async def run():
+            # The fallback goes over budget, so bot.py keeps a compacted prompt rather than the fallback itself
+            fallback = await merger.merge(base, {"🔥": 1})
+            compacted = budget.enforce(fallback, previous=base)
+            self.assertNotEqual(compacted, fallback)
+            slow.release.set()
+            await asyncio.sleep(0.05)
+            return await merger.merge(compacted, {"🤖": 1})
+
+        self.assertEqual(asyncio.run(run()), f"{base} reimagined reimagined")
+
+    def test_running_late_result_stays_pending(self):
+        slow = SlowMerger()
+        merger = DeadlineMerger(slow, "slow", deadline=0.05)
+
+        async def run():
+            first = await merger.merge("a robot", {"🔥": 1})
+            # Still running a cycle later: that merge falls back, the late result is kept
+            second = await merger.merge(first, {"🌊": 1})
+            slow.release.set()
+            await asyncio.sleep(0.05)
+            third = await merger.merge(second, {"🤖": 1})
+            return second, third
+
+        second, third = asyncio.run(run())
+        self.assertEqual(second, "a robot, but more 🔥, but more 🌊")
+        self.assertEqual(third, "a robot reimagined reimagined")
+
+    def test_discarded_late_result_is_not_used(self):
+        slow = SlowMerger()
+        merger = DeadlineMerger(slow, "slow", deadline=0.05)
+
+        async def run():
+            await merger.merge("a robot", {"🔥": 1})
+            merger.discard_late()
+            slow.release.set()
+            await asyncio.sleep(0.05)
+            return await merger.merge("a garden", {"🌊": 1})
+
+        self.assertEqual(asyncio.run(run()), "a garden reimagined")
+
+    def test_busy_merger_falls_back_immediately(self):
+        slow = SlowMerger()
+        merger = DeadlineMerger(slow, "slow", deadline=0.05, use_late_results=False)
+
+        async def run():
+            await merger.merge("a robot", {"🔥": 1})
+            return await merger.merge("a robot", {"🌊": 2})
+
+        self.assertEqual(asyncio.run(run()), "a robot, but more 🌊 and 🌊")
+        slow.release.set()
+
+    def test_errors_fall_back(self):
+        merger = DeadlineMerger(FailingMerger(), "failing", deadline=1)
+        self.assertEqual(asyncio.run(merger.merge("a robot", {"🔥": 1})), "a robot, but more 🔥")
+
+    def test_no_deadline_runs_inline(self):
+        slow = SlowMerger()
+        slow.release.set()
+        merger = DeadlineMerger.from_config(slow, "append", {'deadlines': {'deepseek': 20}})
+        self.assertIsNone(merger.deadline)
+        self.assertEqual(asyncio.run(merger.merge("a robot", {"🔥": 1})), "a robot reimagined")
+
+    def test_duck_typed_merger_with_governor(self):
+        governor = CostGovernor({}, {})
+        merger = DeadlineMerger(PlainMerger(), "plain", governor=governor)
+        for _ in range(3):
+            self.assertEqual(asyncio.run(merger.merge("a robot", {"🔥": 1})), "a robot rewritten")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,10 @@
+import unittest
+from merging.deepseek_merger import DeepseekMerger
+
+class TestDeepseekMerger(unittest.TestCase):
+    def test_unknown_mode_rejected_before_loading(self):
+        with self.assertRaises(ValueError):
+            DeepseekMerger(mode="int2")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import asyncio
+import tempfile
+import os
+from emoji_lexicon import EmojiLexicon, parse_interpretations
+from merging.append_merger import AppendMerger
+from merging.deadline_merger import DeadlineMerger
+from merging.reaction_merger import ReactionMerger
+
+class LLMMerger(ReactionMerger):
+    def __init__(self):
+        self.calls = 0
+
+    def merge(self, prompt, reactions):
+        self.calls += 1
+        return f"{prompt} reimagined"
+
+class TestEmojiLexicon(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "lexicon.sqlite")
+        self.lexicon = EmojiLexicon(self.db_path)
+
+    def tearDown(self):
+        self.lexicon._conn.close()
+        self.tmpdir.cleanup()
+
+    def test_parse_interpretations(self):
+        text = "🔥: fiery glow\n- 🌊: ocean waves\nI made the robot warmer: because of the fire\n<:veist:123>: veist style"
+        self.assertEqual(parse_interpretations(text), {
+            "🔥": "fiery glow", "🌊": "ocean waves", "<:veist:123>": "veist style"
+        })
+        self.assertEqual(parse_interpretations(None), {})
+
+    def test_seeded_table_in_prompt(self):
+        self.assertEqual(self.lexicon.format_table(["📷"]), "📷: photorealistic\n🎦: cinematic")
+
+    def test_acceptance_builds_confidence(self):
+        self.lexicon.accept({"🔥": "fiery glow"})
+        self.assertIn("🔥: fiery glow", self.lexicon.format_table())
+        self.assertFalse(self.lexicon.covers(["🔥"]))
+        self.lexicon.accept({"🔥": "fiery glow"})
+        self.lexicon.accept({"🔥": "fiery glow"})
+        self.assertTrue(self.lexicon.covers(["🔥", "🎦"]))
+        self.lexicon.reject({"🔥": "fiery glow"})
+        self.assertFalse(self.lexicon.covers(["🔥"]))
+        # Persisted for the next process
+        reopened = EmojiLexicon(self.db_path)
+        self.assertAlmostEqual(reopened.entries["🔥"].confidence, self.lexicon.entries["🔥"].confidence)
+        reopened._conn.close()
+
+    def test_processes_share_the_table(self):
+        other = EmojiLexicon(self.db_path)
+        self.lexicon.reject({"🎦": "cinematic"})
+        other.accept({"🔥": "fiery glow"})
+        self.lexicon.lookup("🎦", min_confidence=0)
+        other.format_table(["🎦"], limit=1)
+        other.format_table(["🎦"], limit=1)
+        # Closing the process with the stale cache doesn't undo the rejection
+        other.close()
+        self.lexicon.flush()
+        self.assertAlmostEqual(self.lexicon.entries["🎦"].confidence, 0.7)
+        self.assertEqual(self.lexicon.entries["🎦"].uses, 3)
+        self.assertEqual(self.lexicon.entries["🔥"].interpretation, "fiery glow")
+
+    def test_append_merger_translates_known_emoji(self):
+        merger = AppendMerger(self.lexicon)
+        self.assertEqual(merger.merge("a robot", {"🎦": 1, "🔥": 2}), "a robot, but more cinematic and 🔥 and 🔥")
+
+    def test_known_emoji_skip_llm(self):
+        llm = LLMMerger()
+        merger = DeadlineMerger(llm, "deepseek", lexicon=self.lexicon)
+        self.assertEqual(asyncio.run(merger.merge("a robot", {"🎦": 1, "📷": 0})), "a robot, but more cinematic")
+        self.assertEqual(asyncio.run(merger.merge("a robot", {"🔥": 1})), "a robot reimagined")
+        self.assertEqual(llm.calls, 1)
+
+if __name__ == '__main__':
+    unittest.main()
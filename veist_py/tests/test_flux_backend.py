@@ -0,0 +1,32 @@
+import unittest
+from pathlib import Path
+
+import yaml
+
+from flux_backend import PROFILE_DEFAULTS, resolve_profile
+
+
+class TestFluxProfiles(unittest.TestCase):
+    def setUp(self):
+        with open(Path(__file__).parent.parent / "default_config.yaml") as f:
+            self.config = yaml.safe_load(f)['flux']
+
+    def test_auto_picks_by_host(self):
+        self.assertEqual(resolve_profile(self.config, cuda_available=True)['name'], "gpu")
+        cpu = resolve_profile(self.config, cuda_available=False)
+        self.assertEqual(cpu['name'], "cpu")
+        self.assertEqual(cpu['device'], "cpu")
+        self.assertLess(cpu['width'] * cpu['height'], PROFILE_DEFAULTS['width'] * PROFILE_DEFAULTS['height'])
+
+    def test_gpu_profile_keeps_previous_settings(self):
+        gpu = resolve_profile({'profile': "gpu"}, cuda_available=True)
+        self.assertEqual((gpu['width'], gpu['height'], gpu['steps']), (1344, 768, 4))
+        self.assertIsNone(gpu['offload'])
+
+    def test_unknown_profile(self):
+        with self.assertRaises(ValueError):
+            resolve_profile({'profile': "tpu"}, cuda_available=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
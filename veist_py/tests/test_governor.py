@@ -0,0 +1,64 @@
+import unittest
+import asyncio
+from governor import CostGovernor
+from merging.deadline_merger import DeadlineMerger
+from merging.reaction_merger import ReactionMerger
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class PaidMerger(ReactionMerger):
+    provider = "replicate"
+
+    def merge(self, prompt, reactions):
+        return f"{prompt} reimagined"
+
+class TestCostGovernor(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.governor = CostGovernor(
+            {'replicate': {'requests_per_minute': 6, 'images_per_hour': None, 'daily_budget': 1.0}},
+            {'replicate_flux_schnell': 0.1},
+            low_water=0.5,
+            clock=self.clock
+        )
+
+    def test_requests_per_minute(self):
+        for _ in range(6):
+            self.assertTrue(self.governor.acquire('replicate', 'deepseek_replicate'))
+        self.assertFalse(self.governor.acquire('replicate', 'deepseek_replicate'))
+        self.assertAlmostEqual(self.governor.retry_after('replicate', 'deepseek_replicate'), 10)
+        self.clock.now = 10
+        self.assertTrue(self.governor.acquire('replicate', 'deepseek_replicate'))
+
+    def test_refused_calls_are_not_charged(self):
+        for _ in range(6):
+            self.governor.acquire('replicate', 'replicate_flux_schnell', images=1)
+        self.assertFalse(self.governor.acquire('replicate', 'replicate_flux_schnell', images=1))
+        # Only the six allowed calls count against the daily budget
+        self.assertAlmostEqual(self.governor.buckets['replicate']['daily_budget'][0].tokens, 0.4)
+
+    def test_degrades_before_refusing(self):
+        self.assertFalse(self.governor.degraded('replicate'))
+        for _ in range(4):
+            self.governor.acquire('replicate', 'deepseek_replicate')
+        self.assertTrue(self.governor.degraded('replicate'))
+        self.assertTrue(self.governor.allows('replicate', 'deepseek_replicate'))
+
+    def test_unmetered_provider(self):
+        self.assertTrue(self.governor.acquire(None, 'procedural', images=1))
+        self.assertEqual(self.governor.headroom('openai'), 1.0)
+
+    def test_paid_merge_falls_back_when_low(self):
+        merger = DeadlineMerger(PaidMerger(), "deepseek_replicate", governor=self.governor)
+        self.assertEqual(asyncio.run(merger.merge("a robot", {"🔥": 1})), "a robot reimagined")
+        for _ in range(4):
+            self.governor.acquire('replicate', 'deepseek_replicate')
+        self.assertEqual(asyncio.run(merger.merge("a robot", {"🔥": 1})), "a robot, but more 🔥")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import asyncio
+import os
+import tempfile
+import time
+from generator import VeistGenerator
+from governor import CostGovernor
+from hedging import HedgePolicy, HedgedGenerator
+
+class TestHedgedGenerator(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def make_generator(self, **procedural):
+        generator = VeistGenerator(backend='procedural', output_dir=self.tmpdir.name,
+                                   procedural_config={'width': 64, 'height': 64, **procedural})
+        generator.start_prompter()
+        return generator
+
+    def generate(self, hedger, prompt="a robot"):
+        # Timed inside the loop: asyncio.run also waits for abandoned renders on shutdown
+        async def timed():
+            start = time.perf_counter()
+            result = await hedger.generate_image(prompt)
+            return result, time.perf_counter() - start
+        return asyncio.run(timed())
+
+    def test_slow_primary_is_hedged(self):
+        primary = self.make_generator(latency_seconds=1.0)
+        secondary = self.make_generator(latency_seconds=0.01)
+        policy = HedgePolicy(min_delay=0.05, max_delay=0.05)
+        result, elapsed = self.generate(HedgedGenerator(primary, [secondary], policy))
+        self.assertEqual(result['status'], "generated")
+        self.assertTrue(result['hedged'])
+        self.assertLess(elapsed, 0.5)
+
+    def test_winner_saves_its_own_output(self):
+        primary = self.make_generator(latency_seconds=1.0)
+        secondary = VeistGenerator(backend='procedural', output_dir=os.path.join(self.tmpdir.name, "secondary"),
+                                   procedural_config={'width': 64, 'height': 64, 'latency_seconds': 0.01})
+        secondary.start_prompter()
+        policy = HedgePolicy(min_delay=0.05, max_delay=0.05)
+        result, _ = self.generate(HedgedGenerator(primary, [secondary], policy))
+        self.assertEqual(os.path.dirname(result['path']), str(secondary.output_dir))
+        self.assertIn(os.path.basename(result['path']), secondary.index.hashes)
+        self.assertNotIn(os.path.basename(result['path']), primary.index.hashes)
+
+    def test_busy_primary_fails_over_immediately(self):
+        primary = self.make_generator(busy_rate=1.0)
+        secondary = self.make_generator()
+        hedger = HedgedGenerator(primary, [secondary], HedgePolicy(max_delay=10))
+        result, elapsed = self.generate(hedger)
+        self.assertEqual(result['status'], "generated")
+        self.assertLess(elapsed, 1.0)
+
+    def test_cost_cap_disables_hedging(self):
+        primary = self.make_generator(latency_seconds=0.2)
+        secondary = self.make_generator()
+        policy = HedgePolicy(min_delay=0.01, max_delay=0.01, max_hedge_fraction=0)
+        result, elapsed = self.generate(HedgedGenerator(primary, [secondary], policy))
+        self.assertNotIn('hedged', result)
+        self.assertGreaterEqual(elapsed, 0.2)
+
+    def test_delay_tracks_primary_percentile(self):
+        policy = HedgePolicy(quantile=90, min_delay=0.5, max_delay=30, min_samples=10)
+        self.assertEqual(policy.delay('replicate_flux_schnell'), 30)
+        for seconds in range(1, 11):
+            policy.record_latency('replicate_flux_schnell', seconds)
+        self.assertEqual(policy.delay('replicate_flux_schnell'), 9)
+
+    def test_hedges_are_charged_to_the_governor(self):
+        primary = self.make_generator(latency_seconds=0.3)
+        secondary = self.make_generator()
+        secondary.provider = "replicate"
+        governor = CostGovernor({'replicate': {'images_per_hour': 1}}, {})
+        policy = HedgePolicy(min_delay=0.01, max_delay=0.01, max_hedge_fraction=1)
+        hedger = HedgedGenerator(primary, [secondary], policy, governor=governor)
+        first, _ = self.generate(hedger)
+        self.assertTrue(first['hedged'])
+        # The secondary's hourly image is spent, so the slow primary has to finish on its own
+        second, elapsed = self.generate(hedger)
+        self.assertNotIn('hedged', second)
+        self.assertGreaterEqual(elapsed, 0.3)
+
+    def test_all_backends_failing_returns_error(self):
+        primary = self.make_generator(busy_rate=1.0)
+        secondary = self.make_generator(error_rate=1.0)
+        result, _ = self.generate(HedgedGenerator(primary, [secondary], HedgePolicy()))
+        self.assertEqual(result['status'], "error")
+        self.assertIn("too busy", result['error'])
+
+if __name__ == '__main__':
+    unittest.main()
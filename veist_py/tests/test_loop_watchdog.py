@@ -0,0 +1,43 @@
+import unittest
+import asyncio
+import time
+from loop_watchdog import LoopWatchdog
+from metrics import LOOP_BLOCKS
+
+def blocking_merge():
+    time.sleep(0.3)
+
+class TestLoopWatchdog(unittest.TestCase):
+    def test_reports_blocking_call_once(self):
+        watchdog = LoopWatchdog(name="test", threshold=0.1, interval=0.02)
+
+        async def run():
+            watchdog.start()
+            await asyncio.sleep(0.05)
+            blocking_merge()
+            await asyncio.sleep(0.1)
+            watchdog.stop()
+
+        with self.assertLogs('veist_watchdog', level='WARNING') as logs:
+            asyncio.run(run())
+        self.assertEqual(len(watchdog.reports), 1)
+        site, stack = watchdog.reports[0]
+        self.assertEqual(site, "test_loop_watchdog.py:blocking_merge")
+        self.assertIn("time.sleep(0.3)", stack)
+        self.assertIn("blocking_merge", logs.output[0])
+        self.assertEqual(LOOP_BLOCKS.labels("test", site).value, 1)
+        self.assertGreater(watchdog.lag.count, 0)
+
+    def test_quiet_when_nothing_blocks(self):
+        watchdog = LoopWatchdog(name="quiet", threshold=0.1, interval=0.02)
+
+        async def run():
+            watchdog.start()
+            await asyncio.sleep(0.2)
+            watchdog.stop()
+
+        asyncio.run(run())
+        self.assertEqual(len(watchdog.reports), 0)
+
+if __name__ == '__main__':
+    unittest.main()
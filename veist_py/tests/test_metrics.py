@@ -0,0 +1,70 @@
+import unittest
+import asyncio
+from metrics import Registry, MetricsServer
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = Registry()
+
+    def test_counter_and_gauge(self):
+        counter = self.registry.counter("veist_test_total", "Test counter", ("status",))
+        counter.labels("ok").inc()
+        counter.labels("ok").inc(2)
+        gauge = self.registry.gauge("veist_test_depth", "Test gauge")
+        gauge.inc()
+        gauge.dec()
+        text = self.registry.render()
+        self.assertIn("# TYPE veist_test_total counter", text)
+        self.assertIn('veist_test_total{status="ok"} 3.0', text)
+        self.assertIn("veist_test_depth 0.0", text)
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = self.registry.histogram("veist_test_seconds", "Test histogram", ("model",), buckets=(1, 5))
+        for value in (0.5, 2, 10):
+            histogram.labels("flux").observe(value)
+        text = self.registry.render()
+        self.assertIn('veist_test_seconds_bucket{model="flux",le="1"} 1', text)
+        self.assertIn('veist_test_seconds_bucket{model="flux",le="5"} 2', text)
+        self.assertIn('veist_test_seconds_bucket{model="flux",le="+Inf"} 3', text)
+        self.assertIn('veist_test_seconds_count{model="flux"} 3', text)
+
+    def test_reregistering_returns_same_metric(self):
+        first = self.registry.counter("veist_test_total", "Test counter", ("status",))
+        self.assertIs(first, self.registry.counter("veist_test_total", "Test counter", ("status",)))
+        with self.assertRaises(ValueError):
+            self.registry.gauge("veist_test_total", "Test counter")
+        with self.assertRaises(ValueError):
+            first.labels("ok", "extra")
+
+    def test_timer_observes_each_block(self):
+        histogram = self.registry.histogram("veist_test_seconds", "Test histogram", ("model",))
+        for _ in range(3):
+            with histogram.labels("flux").time():
+                pass
+        self.assertIn('veist_test_seconds_count{model="flux"} 3', self.registry.render())
+
+class TestMetricsServer(unittest.TestCase):
+    def test_serves_metrics(self):
+        registry = Registry()
+        registry.counter("veist_test_total", "Test counter").inc()
+
+        async def scrape():
+            server = MetricsServer(registry, port=0)
+            await server.start()
+            port = server.server.sockets[0].getsockname()[1]
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+                await writer.drain()
+                response = await reader.read()
+                writer.close()
+                return response.decode()
+            finally:
+                await server.stop()
+
+        response = asyncio.run(scrape())
+        self.assertTrue(response.startswith("HTTP/1.1 200 OK"))
+        self.assertIn("veist_test_total 1.0", response)
+
+if __name__ == '__main__':
+    unittest.main()
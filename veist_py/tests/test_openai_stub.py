@@ -0,0 +1,51 @@
+import unittest
+import base64
+import io
+from openai import OpenAI, BadRequestError
+from PIL import Image
+from openai_stub import ResponseStore, StubOpenAI, StubServer, ResponseNotFound
+
+TOOLS = [{"type": "image_generation", "quality": "low"}]
+
+class TestStubOpenAI(unittest.TestCase):
+    def test_chained_image_responses(self):
+        client = StubOpenAI(store=ResponseStore(image_size=(64, 64)))
+        first = client.responses.create(model="gpt-4o-mini", input="a robot", tools=TOOLS)
+        second = client.responses.create(model="gpt-4o-mini", previous_response_id=first.id,
+                                         input="Modify the robot: 🔥: 3", tools=TOOLS)
+        self.assertNotEqual(first.id, second.id)
+        self.assertEqual(second.previous_response_id, first.id)
+        image_call = second.output[0]
+        self.assertEqual(image_call.type, "image_generation_call")
+        self.assertEqual(Image.open(io.BytesIO(base64.b64decode(image_call.result))).size, (64, 64))
+        self.assertEqual(second.output_text, "🔥: fiery")
+
+    def test_unknown_previous_response(self):
+        client = StubOpenAI()
+        with self.assertRaises(ResponseNotFound):
+            client.responses.create(model="gpt-4o-mini", previous_response_id="resp_missing", input="x")
+
+class TestStubServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StubServer(ResponseStore(image_size=(64, 64)), port=0)
+        cls.client = OpenAI(base_url=cls.server.start_in_thread(), api_key="stub", max_retries=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop_thread()
+
+    def test_real_client_round_trip(self):
+        first = self.client.responses.create(model="gpt-4o-mini", input="a robot", tools=TOOLS)
+        second = self.client.responses.create(model="gpt-4o-mini", previous_response_id=first.id,
+                                              input="add a hat", tools=TOOLS)
+        self.assertEqual(second.output[0].type, "image_generation_call")
+        self.assertTrue(base64.b64decode(second.output[0].result).startswith(b"\x89PNG"))
+        self.assertEqual(self.client.responses.retrieve(second.id).id, second.id)
+
+    def test_real_client_unknown_previous_response(self):
+        with self.assertRaises(BadRequestError):
+            self.client.responses.create(model="gpt-4o-mini", previous_response_id="resp_missing", input="x")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import random
+import tempfile
+from pathlib import Path
+from PIL import Image, ImageDraw
+from phash_index import MultiIndexHash, OutputIndex, dhash, hamming
+
+def make_image(seed, size=(256, 256)):
+    rng = random.Random(seed)
+    image = Image.new('RGB', size, 'black')
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        color = tuple(rng.randrange(256) for _ in range(3))
+        draw.ellipse((x, y, x + 80, y + 80), fill=color)
+    return image
+
+class TestMultiIndexHash(unittest.TestCase):
+    def test_search_matches_brute_force(self):
+        rng = random.Random(0)
+        hashes = [rng.getrandbits(64) for _ in range(500)]
+        # Plant near neighbours so radius searches have something to find
+        hashes += [h ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64)) for h in hashes[:50]]
+        index = MultiIndexHash(max_distance=6)
+        for i, value_hash in enumerate(hashes):
+            index.add(value_hash, i)
+        self.assertEqual(len(index), len(hashes))
+
+        for query in hashes[:60] + [rng.getrandbits(64) for _ in range(20)]:
+            for radius in (3, 6, 30):
+                expected = sorted(i for i, h in enumerate(hashes) if hamming(query, h) <= radius)
+                found = sorted(i for _, i in index.search(query, radius))
+                self.assertEqual(found, expected)
+
+class TestOutputIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def save(self, image, name):
+        path = self.output_dir / name
+        image.save(path)
+        return path
+
+    def test_detects_near_duplicate(self):
+        index = OutputIndex(self.output_dir)
+        original = make_image(1)
+        index.add(self.save(original, "a.png"))
+
+        resized = original.resize((200, 200))
+        match = index.nearest_duplicate(dhash(resized))
+        self.assertIsNotNone(match)
+        self.assertEqual(Path(match[0]).name, "a.png")
+        self.assertIsNone(index.nearest_duplicate(dhash(make_image(2))))
+
+    def test_persists_and_scans_existing_outputs(self):
+        index = OutputIndex(self.output_dir)
+        path = self.save(make_image(1), "a.png")
+        index.add(path)
+        index.mark_published(path)
+        self.save(make_image(3), "b.png")
+
+        reloaded = OutputIndex(self.output_dir)
+        self.assertTrue(reloaded.scanned.wait(5))
+        self.assertEqual(set(reloaded.hashes), {"a.png", "b.png"})
+        self.assertIsNotNone(reloaded.published_duplicate(path))
+        self.assertIsNone(reloaded.published_duplicate(self.output_dir / "b.png"))
+
+    def test_removed_outputs_stay_unindexed(self):
+        index = OutputIndex(self.output_dir)
+        index.scanned.wait(5)
+        original = make_image(1)
+        path = self.save(original, "a.png")
+        index.add(path)
+        index.mark_published(path)
+        index.remove(path)
+        path.unlink()
+        self.assertIsNone(index.nearest_duplicate(dhash(original)))
+        self.assertEqual(len(index.images), 0)
+        # The removal is logged, so reloading doesn't bring it back
+        reloaded = OutputIndex(self.output_dir)
+        reloaded.scanned.wait(5)
+        self.assertEqual(reloaded.hashes, {})
+        self.assertEqual(len(reloaded.published), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import tempfile
+import os
+from PIL import Image, ImageChops
+from generator import DRAFT, FINAL, VeistGenerator
+from procedural import ProceduralBackend, render_prompt_image
+
+class TestProceduralBackend(unittest.TestCase):
+    def test_same_prompt_same_image(self):
+        first = render_prompt_image("a robot", (320, 180))
+        self.assertIsNone(ImageChops.difference(first, render_prompt_image("a robot", (320, 180))).getbbox())
+        self.assertIsNotNone(ImageChops.difference(first, render_prompt_image("a cat", (320, 180))).getbbox())
+
+    def test_busy_failures_are_raised(self):
+        backend = ProceduralBackend(width=64, height=64, busy_rate=1.0)
+        with self.assertRaisesRegex(RuntimeError, "too busy"):
+            backend.generate("a robot")
+
+    def test_generator_backend(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            generator = VeistGenerator(backend='procedural', output_dir=output_dir,
+                                       procedural_config={'width': 128, 'height': 72})
+            generator.start_prompter()
+            result = generator.generate_image("a robot")
+            self.assertEqual(result['status'], "generated")
+            self.assertTrue(result['path'].startswith(output_dir))
+
+            generator.procedural.busy_rate = 1.0
+            result = generator.generate_image("a robot")
+            self.assertIn("too busy", result['error'])
+
+    def test_final_reproduces_draft(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            generator = VeistGenerator(backend='procedural', output_dir=output_dir,
+                                       procedural_config={'width': 128, 'height': 72},
+                                       draft_config={'latency_scale': 0.5})
+            generator.start_prompter()
+            draft = generator.generate_image("a robot", quality=DRAFT)
+            self.assertEqual((draft['quality'], draft['backend']), (DRAFT, 'procedural'))
+
+            final = generator.generate_image(draft['prompt'], quality=FINAL, seed=draft['seed'])
+            self.assertEqual((final['quality'], final['seed']), (FINAL, draft['seed']))
+            other = generator.generate_image(draft['prompt'], quality=FINAL, seed=draft['seed'] + 1)
+            with Image.open(draft['path']) as a, Image.open(final['path']) as b, Image.open(other['path']) as c:
+                self.assertEqual(a.size, b.size)
+                # Saved as JPEG, so compare loosely
+                self.assertLess(max(hi for _, hi in ImageChops.difference(a, b).getextrema()), 8)
+                self.assertGreater(max(hi for _, hi in ImageChops.difference(a, c).getextrema()), 64)
+
+    def test_generators_share_an_output_index(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            primary, failover = (
+                VeistGenerator(backend='procedural', output_dir=output_dir, procedural_config={'width': 128, 'height': 72})
+                for _ in range(2)
+            )
+            self.assertIs(primary.index, failover.index)
+            primary.start_prompter()
+            failover.start_prompter()
+            first = primary.generate_image("a robot", seed=1)
+            # The failover's image is checked against what the primary saved
+            second = failover.generate_image("a robot", quality=DRAFT, seed=1)
+            self.assertEqual(second['duplicate_of'], first['path'])
+
+    def test_discarded_duplicate_is_unindexed(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            generator = VeistGenerator(backend='procedural', output_dir=output_dir,
+                                       procedural_config={'width': 128, 'height': 72})
+            generator.start_prompter()
+            first = generator.generate_image("a robot", seed=1)
+            # Same picture under another name
+            second = generator.generate_image("a robot", quality=DRAFT, seed=1)
+            self.assertEqual(second['duplicate_of'], first['path'])
+
+            generator.discard(second['path'])
+            generator.discard(first['path'])
+            self.assertFalse(os.path.exists(second['path']))
+            self.assertNotIn("duplicate_of", generator.generate_image("a robot", seed=1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+from prompt_budget import PromptBudget, estimate_tokens
+
+def count_words(text):
+    return len(text.split())
+
+class TestPromptBudget(unittest.TestCase):
+    def test_estimate(self):
+        self.assertEqual(estimate_tokens("a robot"), 3)
+        self.assertEqual(estimate_tokens("robot, 🔥"), 5)
+
+    def test_within_budget_unchanged(self):
+        budget = PromptBudget(max_tokens=20, count_tokens=count_words)
+        self.assertEqual(budget.enforce("a robot, but more 🔥"), "a robot, but more 🔥")
+
+    def test_dedupe_repeated_reactions(self):
+        budget = PromptBudget(max_tokens=8, count_tokens=count_words)
+        prompt = "a robot, but more 🔥 and 🔥 and 🔥 and 🔥, but more 🔥"
+        self.assertEqual(budget.enforce(prompt), "a robot, but more 🔥")
+
+    def test_dedupe_collapses_emoji_runs(self):
+        budget = PromptBudget()
+        self.assertEqual(budget.dedupe("a robot, but more 🔥 and 🔥 and 🔥"), "a robot, but more 🔥")
+        self.assertEqual(budget.dedupe("a robot, but more " + " and ".join(["🔥"] * 50)), "a robot, but more 🔥")
+        self.assertEqual(budget.dedupe("a robot, but more red and redder"), "a robot, but more red and redder")
+
+    def test_drops_oldest_modifiers(self):
+        budget = PromptBudget(max_tokens=10, count_tokens=count_words)
+        prompt = "a robot in a garden, but more 🔥, but more 🌊, but more 🤖"
+        self.assertEqual(budget.enforce(prompt), "a robot in a garden, but more 🤖")
+
+    def test_truncates_long_single_clause(self):
+        budget = PromptBudget(max_tokens=5, count_tokens=count_words)
+        self.assertEqual(budget.enforce("one two three four five six seven eight"), "one two three four five")
+
+if __name__ == '__main__':
+    unittest.main()
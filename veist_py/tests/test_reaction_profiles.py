@@ -0,0 +1,69 @@
+import unittest
+import tempfile
+import numpy as np
+from reaction_profiles import ReactionProfiles, channel_key, user_key
+
+class TestReactionProfiles(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_top_k_per_user_and_channel(self):
+        profiles = ReactionProfiles(half_life=100)
+        for user_id, emoji in [(1, "🔥"), (1, "🔥"), (1, "🌊"), (2, "🤖")]:
+            profiles.record([user_key(user_id), channel_key(9)], emoji, now=0)
+        self.assertEqual(profiles.top_k(user_key(1), 1, now=0), [("🔥", 2.0)])
+        self.assertEqual([e for e, _ in profiles.top_k(channel_key(9), 5, now=0)], ["🔥", "🌊", "🤖"])
+        self.assertEqual(profiles.top_k(user_key(3), 2, now=0), [])
+
+    def test_decay(self):
+        profiles = ReactionProfiles(half_life=10)
+        profiles.record([user_key(1)], "🔥", amount=4, now=0)
+        self.assertAlmostEqual(profiles.top_k(user_key(1), 1, now=20)[0][1], 1.0)
+        profiles.record([user_key(1)], "🔥", now=20)
+        profiles.decay_all(now=30)
+        self.assertAlmostEqual(float(profiles.counts[0, 0]), 1.0)
+
+    def test_grows_past_initial_shape(self):
+        profiles = ReactionProfiles(self.tmpdir.name, initial_rows=2, initial_emojis=2)
+        emojis = ["🔥", "🌊", "🤖", "👻", "🎦"]
+        for user_id in range(5):
+            for emoji in emojis[:user_id + 1]:
+                profiles.record([user_key(user_id)], emoji, now=0)
+        self.assertGreaterEqual(profiles.counts.shape, (5, 5))
+        np.testing.assert_array_equal(profiles.vector(user_key(4), now=0), np.ones(5))
+
+    def test_persists_across_reopen(self):
+        profiles = ReactionProfiles(self.tmpdir.name)
+        profiles.record([user_key(1), channel_key(9)], "🔥", now=0)
+        profiles.flush()
+        del profiles
+        reopened = ReactionProfiles(self.tmpdir.name)
+        self.assertEqual(reopened.top_k(channel_key(9), 1, now=0), [("🔥", 1.0)])
+
+    def test_rows_lost_in_a_crash_start_empty(self):
+        profiles = ReactionProfiles(self.tmpdir.name)
+        profiles.record([user_key(1)], "🔥", now=0)
+        profiles.flush()
+        # Recorded but never flushed: the counts reach disk, the index doesn't
+        profiles.record([user_key(2)], "🌊", amount=5, now=0)
+        profiles.counts.flush()
+        del profiles
+        reopened = ReactionProfiles(self.tmpdir.name)
+        reopened.record([user_key(3)], "🔥", now=0)
+        self.assertEqual(reopened.top_k(user_key(3), 5, now=0), [("🔥", 1.0)])
+
+    def test_readonly_reload(self):
+        reader = ReactionProfiles(self.tmpdir.name, readonly=True)
+        self.assertEqual(reader.top_k(channel_key(9), 3, now=0), [])
+        writer = ReactionProfiles(self.tmpdir.name)
+        writer.record([channel_key(9)], "🔥", now=0)
+        writer.flush()
+        reader.reload()
+        self.assertEqual(reader.top_k(channel_key(9), 3, now=0), [("🔥", 1.0)])
+        reader.flush()
+
+if __name__ == '__main__':
+    unittest.main()
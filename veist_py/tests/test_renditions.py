@@ -0,0 +1,45 @@
+import unittest
+import io
+from PIL import Image
+from renditions import PreviewRenderer, PreviewSettings, RenditionStats
+
+def make_image_bytes(size=(1344, 768)):
+    image = Image.effect_noise(size, 64).convert('RGB')
+    output = io.BytesIO()
+    image.save(output, format='PNG')
+    return output.getvalue()
+
+class TestPreviewRenderer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.original = make_image_bytes()
+
+    def test_preview_is_capped_and_smaller(self):
+        renderer = PreviewRenderer(PreviewSettings(format="JPEG", max_side=512))
+        data, filename, original_size = renderer.render(self.original, "robot")
+        self.assertEqual(filename, "robot.jpg")
+        self.assertEqual(original_size, len(self.original))
+        self.assertLess(len(data), len(self.original))
+        self.assertEqual(max(Image.open(io.BytesIO(data)).size), 512)
+
+    def test_channel_overrides(self):
+        renderer = PreviewRenderer.from_config({
+            'default': {'format': 'WEBP', 'max_side': 256},
+            'channels': {'ai-art': {'format': 'original'}},
+        })
+        self.assertEqual(renderer.settings_for('ai-art').max_side, 256)
+        data, filename, _ = renderer.render(self.original, "robot", "ai-art")
+        self.assertEqual(data, self.original)
+        self.assertEqual(filename, "robot.png")
+        _, filename, _ = renderer.render(self.original, "robot", "other")
+        self.assertEqual(filename, "robot.webp")
+
+    def test_stats(self):
+        stats = RenditionStats()
+        self.assertEqual(stats.estimated_seconds_saved, 0.0)
+        stats.record_upload(1000, 250, 1.0)
+        self.assertEqual(stats.bytes_saved, 750)
+        self.assertAlmostEqual(stats.estimated_seconds_saved, 3.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+import asyncio
+import tempfile
+import os
+from types import SimpleNamespace
+from shadows import ShadowData, ShadowRegistry, ShadowReplayer, read_vote_vector
+
+class FakeMessage:
+    def __init__(self, message_id, channel_id=1):
+        self.id = message_id
+        self.channel = SimpleNamespace(id=channel_id)
+        self.reactions = []
+
+    async def add_reaction(self, emoji):
+        self.reactions.append(emoji)
+
+class TestShadowRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "shadows.sqlite")
+        self.registry = ShadowRegistry(self.db_path, capacity=3)
+
+    def tearDown(self):
+        self.registry._conn.close()
+        self.tmpdir.cleanup()
+
+    def test_created_on_first_activity(self):
+        self.assertIsNone(self.registry.get(1))
+        self.registry.record_message(1)
+        self.registry.record_message(1)
+        self.registry.record_reaction(1)
+        shadow = self.registry.get(1)
+        self.assertEqual((shadow.message_count, shadow.reaction_count), (2, 1))
+
+    def test_compact_shadow(self):
+        self.assertFalse(hasattr(ShadowData(1), '__dict__'))
+
+    def test_lru_eviction_persists(self):
+        for user_id in range(5):
+            self.registry.record_message(user_id)
+        # Re-activate 1 so 2 is the oldest remaining
+        self.registry.record_message(1)
+        self.registry.record_message(5)
+        self.assertEqual(len(self.registry), 3)
+        self.assertEqual(list(self.registry._shadows), [4, 1, 5])
+        # Evicted shadows come back from the database with their counters
+        self.assertEqual(self.registry.get(0).message_count, 1)
+        self.assertEqual(self.registry.record_message(0).message_count, 2)
+
+    def test_flush_survives_restart(self):
+        self.registry.record_reaction(42)
+        self.registry.close()
+        self.registry = ShadowRegistry(self.db_path, capacity=3)
+        self.assertEqual(self.registry.get(42).reaction_count, 1)
+
+    def test_each_user_holds_one_vote(self):
+        self.registry.record_reaction(1, "🔥")
+        self.registry.record_reaction(2, "🔥")
+        self.registry.record_reaction(3, "🌊")
+        self.registry.record_reaction(3, "🔥")
+        self.registry.record_reaction(4)
+        votes = self.registry.vote_vector()
+        self.assertEqual(list(votes), ["🔥"])
+        self.assertAlmostEqual(votes["🔥"], 3, places=3)
+        # Votes of evicted and reloaded shadows are rebuilt from the database
+        self.registry.close()
+        self.registry = ShadowRegistry(self.db_path, capacity=3)
+        self.assertAlmostEqual(self.registry.vote_vector()["🔥"], 3, places=3)
+
+    def test_meta_reactions_are_not_votes(self):
+        registry = ShadowRegistry(os.path.join(self.tmpdir.name, "meta.sqlite"), ignored_emojis=["✅"])
+        registry.record_reaction(1, "🔥")
+        registry.record_reaction(1, "✅")
+        registry.record_reaction(2, "✅")
+        votes = registry.vote_vector()
+        self.assertEqual(list(votes), ["🔥"])
+        self.assertAlmostEqual(votes["🔥"], 1, places=3)
+        self.assertEqual(registry.top_emojis(10), ["🔥"])
+        self.assertEqual(registry.get(1).reaction_count, 2)
+        registry.close()
+
+    def test_votes_decay(self):
+        registry = ShadowRegistry(os.path.join(self.tmpdir.name, "decay.sqlite"), half_life=10)
+        shadow = registry.record_reaction(1, "🔥")
+        shadow.voted_at -= 10
+        registry._votes["🔥"][1] -= 10
+        self.assertAlmostEqual(registry.vote_vector()["🔥"], 0.5, places=3)
+        # Switching emoji withdraws only what is left of the old vote
+        registry.record_reaction(1, "🌊")
+        votes = registry.vote_vector()
+        self.assertNotIn("🔥", votes)
+        self.assertAlmostEqual(votes["🌊"], 1, places=3)
+        registry.close()
+
+    def test_published_votes_are_readable(self):
+        self.assertEqual(read_vote_vector(os.path.join(self.tmpdir.name, "missing.sqlite")), {})
+        self.registry.record_reaction(1, "🔥")
+        self.registry.record_reaction(2, "🌊")
+        self.registry.record_reaction(3, "🌊")
+        self.registry.publish_votes()
+        votes = read_vote_vector(self.db_path)
+        self.assertEqual(list(votes), ["🌊", "🔥"])
+        self.assertEqual(read_vote_vector(self.db_path, max_age=-1), {})
+
+    def test_present_users_are_left_out(self):
+        for user_id, emoji in [(1, "🔥"), (2, "🌊"), (3, "🌊"), (4, "🌊")]:
+            self.registry.record_reaction(user_id, emoji)
+        # User 1 was evicted, its vote still comes from the database
+        self.assertNotIn(1, self.registry._shadows)
+        self.registry.publish_votes()
+        votes = read_vote_vector(self.db_path, exclude_users=[1, 2])
+        self.assertEqual(list(votes), ["🌊"])
+        self.assertAlmostEqual(votes["🌊"], 2, places=3)
+
+class TestShadowReplayer(unittest.TestCase):
+    def test_bounded_deduplicated_replay(self):
+        replayer = ShadowReplayer(interval=0, max_reactions=2)
+        message = FakeMessage(1)
+
+        async def run():
+            replayer.schedule(message, ["🔥", "🔥", "🌊", "🤖"])
+            await replayer.wait()
+
+        asyncio.run(run())
+        self.assertEqual(message.reactions, ["🔥", "🌊"])
+        self.assertEqual(replayer.calls, 2)
+
+    def test_newer_post_supersedes_queue(self):
+        replayer = ShadowReplayer(interval=0.01)
+        old, new = FakeMessage(1), FakeMessage(2)
+
+        async def run():
+            replayer.schedule(old, ["🔥", "🌊", "🤖"])
+            await asyncio.sleep(0)
+            replayer.schedule(new, ["👻"])
+            await replayer.wait()
+
+        asyncio.run(run())
+        self.assertEqual(old.reactions, ["🔥"])
+        self.assertEqual(new.reactions, ["👻"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import tempfile
+import os
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import patch
+from apps.publish import AkaSwapPublisher
+from apps.token_ids import TokenIdAllocator, TokenIdExhausted, MAX_TOKEN_ID
+
+class TestTokenIdAllocator(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "tokens.sqlite")
+        self.allocator = TokenIdAllocator(self.db_path, start=100)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_allocate_is_monotonic(self):
+        ids = [int(self.allocator.allocate()) for _ in range(5)]
+        self.assertEqual(ids, [100, 101, 102, 103, 104])
+
+    def test_counter_persists(self):
+        self.allocator.allocate()
+        reopened = TokenIdAllocator(self.db_path, start=1)
+        self.assertEqual(reopened.allocate(), "101")
+
+    def test_concurrent_allocations_are_unique(self):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            ids = list(pool.map(lambda _: self.allocator.allocate(), range(200)))
+        self.assertEqual(len(set(ids)), 200)
+
+    def test_batch_reservation(self):
+        first_id, last_id = self.allocator.reserve_batch(3)
+        self.assertEqual((first_id, last_id), (100, 102))
+        # A second allocator sharing the database skips the reserved range
+        other = TokenIdAllocator(self.db_path)
+        self.assertEqual(other.allocate(), "103")
+        self.assertEqual([self.allocator.allocate() for _ in range(3)], ["100", "101", "102"])
+        self.assertEqual(self.allocator.allocate(), "104")
+
+    def test_unused_reservations_are_kept(self):
+        self.allocator.reserve_batch(2)
+        self.assertEqual(self.allocator.allocate(), "100")
+        self.allocator.reserve_batch(2)
+        self.assertEqual([self.allocator.allocate() for _ in range(4)], ["101", "102", "103", "104"])
+
+    def test_exhaustion_raises(self):
+        allocator = TokenIdAllocator(os.path.join(self.tmpdir.name, "full.sqlite"), start=MAX_TOKEN_ID)
+        self.assertEqual(allocator.allocate(), str(MAX_TOKEN_ID))
+        with self.assertRaises(TokenIdExhausted):
+            allocator.allocate()
+
+class TestMintTokenIds(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.allocator = TokenIdAllocator(os.path.join(self.tmpdir.name, "tokens.sqlite"), start=100)
+        self.publisher = AkaSwapPublisher("partner", "secret", self.allocator)
+        self.ipfs_data = {part: {'uri': f"ipfs://{part}"} for part in ("artifact", "display", "thumbnail")}
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_allocator_is_opened_lazily(self):
+        publisher = AkaSwapPublisher("partner", "secret")
+        self.assertIsNone(publisher._token_allocator)
+
+    def test_taken_token_id_is_skipped(self):
+        taken = SimpleNamespace(status_code=400, text='{"error": "Token ID already exists"}')
+        minted = SimpleNamespace(status_code=200, text="", json=lambda: {})
+        responses, token_ids = [taken, taken, minted], []
+
+        def post(url, headers, json):
+            token_ids.append(json['tokenId'])
+            return responses.pop(0)
+
+        with patch('apps.publish.requests.post', post):
+            result = self.publisher.mint_nft(self.ipfs_data, "name", "description", "tz1receiver")
+        self.assertEqual(token_ids, ["100", "101", "102"])
+        self.assertTrue(result['viewUrl'].endswith("/102"))
+
+if __name__ == '__main__':
+    unittest.main()
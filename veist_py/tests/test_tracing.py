@@ -0,0 +1,82 @@
+import unittest
+import asyncio
+import json
+import os
+import tempfile
+from metrics import Registry
+from tracing import Tracer, JsonlExporter, OtlpJsonExporter, PrometheusExporter, percentile
+
+class TestTracer(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.registry = Registry()
+        self.prometheus = PrometheusExporter(self.registry)
+        self.jsonl_path = os.path.join(self.tmpdir.name, "traces.jsonl")
+        self.otlp_path = os.path.join(self.tmpdir.name, "traces.otlp.jsonl")
+        self.tracer = Tracer([JsonlExporter(self.jsonl_path), OtlpJsonExporter(self.otlp_path), self.prometheus])
+        self.tracer.start_session("thread-1")
+
+    def tearDown(self):
+        self.tracer.close()
+        self.tmpdir.cleanup()
+
+    def test_nested_spans_share_trace(self):
+        async def cycle():
+            with self.tracer.span("cycle"):
+                with self.tracer.span("generate", backend="procedural"):
+                    await asyncio.sleep(0)
+        asyncio.run(cycle())
+
+        with open(self.jsonl_path) as f:
+            generate, cycle_span = [json.loads(line) for line in f]
+        self.assertEqual(generate['parent_id'], cycle_span['span_id'])
+        self.assertEqual(generate['trace_id'], cycle_span['trace_id'])
+        self.assertEqual(generate['session_id'], "thread-1")
+        self.assertEqual(generate['attributes'], {'backend': 'procedural'})
+
+        with open(self.otlp_path) as f:
+            otlp = json.loads(f.readline())
+        span = otlp['resourceSpans'][0]['scopeSpans'][0]['spans'][0]
+        self.assertEqual(span['name'], "generate")
+        self.assertEqual(span['parentSpanId'], cycle_span['span_id'])
+
+    def test_errors_are_recorded_and_raised(self):
+        with self.assertRaises(RuntimeError):
+            with self.tracer.span("upload"):
+                raise RuntimeError("rate limited")
+        self.assertIn('veist_span_errors_total{span="upload"} 1', self.registry.render())
+
+    def test_session_percentiles(self):
+        for _ in range(10):
+            with self.tracer.span("add_reactions"):
+                pass
+        stats = self.tracer.percentiles()
+        self.assertEqual(stats['add_reactions']['count'], 10)
+        self.assertIn('add_reactions', self.tracer.summary())
+        self.tracer.start_session("thread-2")
+        self.assertEqual(self.tracer.percentiles(), {})
+        self.assertIn('veist_span_duration_seconds_count{span="add_reactions"} 10', self.registry.render())
+
+    def test_old_sessions_are_dropped(self):
+        tracer = Tracer(max_sessions=2)
+        for session in ("a", "b", "c"):
+            tracer.start_session(session)
+            with tracer.span("cycle"):
+                pass
+        self.assertEqual(list(tracer.samples), ["b", "c"])
+        self.assertEqual(tracer.percentiles("a"), {})
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([], 90), 0.0)
+
+    def test_disabled_tracer(self):
+        tracer = Tracer(enabled=False)
+        with tracer.span("cycle") as span:
+            self.assertIsNone(span)
+        self.assertEqual(tracer.percentiles(), {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+import asyncio
+from unittest import mock
+from governor import CostGovernor
+from veist_bot import TextEvolutionModule
+
+class TestPublish(unittest.TestCase):
+    def make_module(self, mints_per_minute):
+        bot = mock.Mock()
+        bot.governor = CostGovernor({'akaswap': {'requests_per_minute': mints_per_minute}}, {})
+        bot.image_index.published_duplicate.return_value = None
+        bot.nft_publisher.publish_image.return_value = {'success': True, 'mint': {}}
+        module = TextEvolutionModule(bot)
+        module.channel = mock.AsyncMock()
+        module.channel.typing = mock.MagicMock()
+        module.last_image_path = "outputs/robot.png"
+        module.render_final = mock.AsyncMock(return_value=True)
+        return module
+
+    def test_throttled_mint_skips_the_final_render(self):
+        module = self.make_module(1)
+        module.bot.governor.acquire("akaswap", "akaswap_mint")
+        asyncio.run(module.publish_as_nft())
+        module.render_final.assert_not_called()
+        module.bot.nft_publisher.publish_image.assert_not_called()
+
+    def test_mint_is_charged_once(self):
+        module = self.make_module(2)
+        asyncio.run(module.publish_as_nft())
+        module.render_final.assert_awaited_once_with("robot")
+        module.bot.nft_publisher.publish_image.assert_called_once()
+        self.assertAlmostEqual(module.bot.governor.headroom("akaswap"), 0.5, places=2)
+
+if __name__ == '__main__':
+    unittest.main()
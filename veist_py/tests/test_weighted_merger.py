@@ -0,0 +1,63 @@
+import unittest
+from governor import CostGovernor
+from merging.weighted_merger import WeightedMerger
+from merging.tiered_merger import TieredMerger
+from merging.reaction_merger import ReactionMerger
+from reaction_merging import create_merger
+
+class LLMMerger(ReactionMerger):
+    def __init__(self):
+        self.calls = 0
+
+    def merge(self, prompt, reactions):
+        self.calls += 1
+        return f"{prompt} reimagined"
+
+class TestWeightedMerger(unittest.TestCase):
+    def test_phrase_weights(self):
+        merger = WeightedMerger()
+        self.assertEqual(
+            merger.merge("a robot", {"🔥": 50, "🌊": 25, "🤖": 5, "⭐": 0}),
+            "a robot, with much more 🔥, more 🌊 and a hint of 🤖"
+        )
+
+    def test_bounded_terms(self):
+        merger = WeightedMerger(max_terms=2)
+        reactions = {emoji: count for count, emoji in enumerate("🔥🌊🤖⭐🌈🎨", start=1)}
+        self.assertEqual(merger.merge("a robot", reactions), "a robot, with much more 🎨 and much more 🌈")
+
+    def test_syntax_style(self):
+        merger = WeightedMerger(style="syntax")
+        self.assertEqual(merger.merge("a robot", {"🔥": 4, "🌊": 2}), "a robot, (🔥:1.50) (🌊:1.25)")
+
+    def test_no_reactions(self):
+        self.assertEqual(WeightedMerger().merge("a robot", {"🔥": 0}), "a robot")
+
+class TestTieredMerger(unittest.TestCase):
+    def test_escalates_only_novel_sets(self):
+        llm = LLMMerger()
+        merger = TieredMerger(WeightedMerger(), llm, memory=2)
+        self.assertEqual(merger.merge("a robot", {"🔥": 1}), "a robot reimagined")
+        self.assertEqual(merger.merge("a robot", {"🔥": 3}), "a robot, with much more 🔥")
+        merger.merge("a robot", {"🌊": 1})
+        merger.merge("a robot", {"🌊": 1})
+        # 🔥 has dropped out of the two-merge memory
+        merger.merge("a robot", {"🔥": 1})
+        self.assertEqual(llm.calls, 3)
+
+    def test_escalations_are_charged(self):
+        llm = LLMMerger()
+        llm.provider = "replicate"
+        governor = CostGovernor({'replicate': {'daily_budget': 5.0}}, {'deepseek_replicate': 0.01})
+        merger = TieredMerger(WeightedMerger(), llm, governor=governor)
+        merger.merge("a robot", {"🔥": 1})
+        self.assertEqual(llm.calls, 1)
+        self.assertAlmostEqual(governor.buckets['replicate']['daily_budget'][0].tokens, 4.99, places=4)
+
+    def test_factory(self):
+        merger = create_merger("tiered", config={'tiered': {'escalate_to': "append", 'memory': 5}})
+        self.assertIsInstance(merger.local, WeightedMerger)
+        self.assertEqual(merger.recent.maxlen, 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,245 @@
+"""
+Span-based latency tracing for the generation cycle
+"""
+
+import contextvars
+import json
+import math
+import os
+import random
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from metrics import REGISTRY, Registry
+
+_current_span = contextvars.ContextVar('veist_current_span', default=None)
+
+
+class Span:
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'session_id',
+                 'attributes', 'start', 'end', 'wall_start', 'error')
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], session_id: Optional[str], attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.session_id = session_id
+        self.attributes = attributes
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        self.end = None
+        self.error = None
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+
+    def set(self, key: str, value):
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'session_id': self.session_id,
+            'start': self.wall_start,
+            'duration_ms': round(self.duration * 1000, 3),
+            'attributes': self.attributes,
+            'error': self.error,
+        }
+
+
+class SpanExporter:
+    """Base class for span exporters"""
+    def export(self, span: Span):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonlExporter(SpanExporter):
+    """One JSON object per finished span"""
+    def __init__(self, path: str):
+        self.file = open(path, 'a', buffering=1)
+
+    def export(self, span: Span):
+        self.file.write(json.dumps(span.to_dict(), ensure_ascii=False) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class OtlpJsonExporter(SpanExporter):
+    """Spans in the OTLP/JSON encoding, one ExportTraceServiceRequest per line.
+
+    The output can be replayed into any OpenTelemetry collector (for example
+    with the otlpjsonfile receiver) without adding the SDK as a dependency.
+    """
+    def __init__(self, path: str, service_name: str = "veist-bot"):
+        self.file = open(path, 'a', buffering=1)
+        self.service_name = service_name
+
+    def _attribute(self, key, value) -> dict:
+        if isinstance(value, bool):
+            return {'key': key, 'value': {'boolValue': value}}
+        if isinstance(value, int):
+            return {'key': key, 'value': {'intValue': str(value)}}
+        if isinstance(value, float):
+            return {'key': key, 'value': {'doubleValue': value}}
+        return {'key': key, 'value': {'stringValue': str(value)}}
+
+    def export(self, span: Span):
+        start_ns = int(span.wall_start * 1e9)
+        attributes = dict(span.attributes)
+        if span.session_id:
+            attributes['veist.session_id'] = span.session_id
+        otlp_span = {
+            'traceId': span.trace_id,
+            'spanId': span.span_id,
+            'name': span.name,
+            'kind': 1,
+            'startTimeUnixNano': str(start_ns),
+            'endTimeUnixNano': str(start_ns + int(span.duration * 1e9)),
+            'attributes': [self._attribute(k, v) for k, v in attributes.items()],
+            'status': {'code': 2, 'message': span.error} if span.error else {'code': 1},
+        }
+        if span.parent_id:
+            otlp_span['parentSpanId'] = span.parent_id
+        request = {
+            'resourceSpans': [{
+                'resource': {'attributes': [self._attribute('service.name', self.service_name)]},
+                'scopeSpans': [{'scope': {'name': 'veist.tracing'}, 'spans': [otlp_span]}],
+            }]
+        }
+        self.file.write(json.dumps(request, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class PrometheusExporter(SpanExporter):
+    """Feeds span durations into histograms on the metrics registry"""
+    def __init__(self, registry: Registry = REGISTRY):
+        self.durations = registry.histogram(
+            "veist_span_duration_seconds", "Duration of traced generation cycle stages", ("span",))
+        self.errors = registry.counter(
+            "veist_span_errors_total", "Traced stages that raised", ("span",))
+
+    def export(self, span: Span):
+        self.durations.labels(span.name).observe(span.duration)
+        if span.error:
+            self.errors.labels(span.name).inc()
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of pre-sorted values"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(q / 100 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(len(sorted_values) - 1, rank))]
+
+
+class Tracer:
+    """Records nested spans and keeps per-session duration samples for percentiles"""
+
+    def __init__(self, exporters: Optional[List[SpanExporter]] = None, enabled: bool = True,
+                 max_samples: int = 1000, max_sessions: int = 4):
+        self.exporters = exporters or []
+        self.enabled = enabled
+        self.max_samples = max_samples
+        self.max_sessions = max_sessions
+        self.session_id: Optional[str] = None
+        # session -> span name -> recent durations, only for the last max_sessions sessions
+        self.samples: Dict[Optional[str], Dict[str, deque]] = defaultdict(dict)
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'Tracer':
+        exporters = []
+        for kind in config.get('exporters', []):
+            if kind == 'jsonl':
+                exporters.append(JsonlExporter(config.get('jsonl_path', 'traces.jsonl')))
+            elif kind == 'otlp_json':
+                exporters.append(OtlpJsonExporter(config.get('otlp_path', 'traces.otlp.jsonl')))
+            elif kind == 'prometheus':
+                exporters.append(PrometheusExporter())
+            else:
+                raise ValueError(f"Unknown trace exporter: {kind}")
+        return cls(exporters, enabled=config.get('enabled', True))
+
+    def exporter(self, kind: type) -> Optional[SpanExporter]:
+        for exporter in self.exporters:
+            if isinstance(exporter, kind):
+                return exporter
+        return None
+
+    def start_session(self, session_id=None) -> str:
+        self.session_id = str(session_id or f"{int(time.time())}-{os.getpid()}")
+        # Oldest sessions first; a bot running for weeks would otherwise keep every session's samples
+        stale = [session for session in self.samples if session != self.session_id]
+        for session in stale[:max(0, len(stale) - (self.max_sessions - 1))]:
+            del self.samples[session]
+        return self.session_id
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Time a block; nested spans become children of the enclosing one"""
+        if not self.enabled:
+            yield None
+            return
+
+        parent = _current_span.get()
+        trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        span = Span(name, trace_id, parent.span_id if parent else None, self.session_id, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end = time.perf_counter()
+            _current_span.reset(token)
+            self._record(span)
+
+    def _record(self, span: Span):
+        stages = self.samples[span.session_id]
+        samples = stages.get(span.name)
+        if samples is None:
+            samples = stages[span.name] = deque(maxlen=self.max_samples)
+        samples.append(span.duration)
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception as e:
+                print(f"Trace exporter {type(exporter).__name__} failed: {e}")
+
+    def percentiles(self, session_id=None, quantiles=(50, 90, 99)) -> Dict[str, dict]:
+        """Per-stage count, mean and percentiles (seconds) for a session"""
+        if session_id is None:
+            session_id = self.session_id
+        stats = {}
+        for name, samples in self.samples.get(session_id, {}).items():
+            values = sorted(samples)
+            stats[name] = {'count': len(values), 'mean': sum(values) / len(values)}
+            for q in quantiles:
+                stats[name][f'p{q}'] = percentile(values, q)
+        return stats
+
+    def summary(self, session_id=None) -> str:
+        stats = self.percentiles(session_id)
+        if not stats:
+            return "No spans recorded"
+        lines = [f"{'stage':<28}{'count':>6}{'p50':>9}{'p90':>9}{'p99':>9}"]
+        for name, s in sorted(stats.items(), key=lambda item: -item[1]['p50']):
+            lines.append(f"{name:<28}{s['count']:>6}{s['p50']:>8.2f}s{s['p90']:>8.2f}s{s['p99']:>8.2f}s")
+        return "\n".join(lines)
+
+    def close(self):
+        for exporter in self.exporters:
+            exporter.close()
@@ -8,6 +8,7 @@ import logging
 import asyncio
 import base64
 import io
+import time
 import yaml
 from abc import ABC, abstractmethod
 from datetime import datetime
@@ -18,7 +19,14 @@ import discord
 from discord.ext import commands
 from openai import OpenAI
 from apps.publish import AkaSwapPublisher
-from PIL import Image, ImageDraw, ImageFont
+from comparison import ComparisonRenderer
+from contact_sheet import ContactSheet
+from emoji_lexicon import EmojiLexicon, parse_interpretations
+from governor import BudgetExceeded, governor_for
+from loop_watchdog import LoopWatchdog
+from metrics import MetricsServer, instrument_discord, EVOLUTIONS, OPENAI_LATENCY, PUBLISH_JOBS
+from phash_index import index_for
+from renditions import PreviewRenderer
 
 # Set up logging
 logging.basicConfig(
@@ -50,6 +58,183 @@ class VeistModule(ABC):
     async def on_reaction_add(self, reaction: discord.Reaction, user: discord.User):
         """Handle reactions"""
         pass
+        
+    async def send_image(self, content: str, image_bytes: bytes, stem: str) -> discord.Message:
+        """Post an image to this module's channel as its configured preview rendition"""
+        loop = asyncio.get_running_loop()
+        data, filename, original_size = await loop.run_in_executor(
+            None,
+            self.bot.previews.render,
+            image_bytes,
+            stem,
+            self.channel.name
+        )
+        
+        start = time.perf_counter()
+        message = await self.channel.send(content, file=discord.File(io.BytesIO(data), filename=filename))
+        self.bot.previews.stats.record_upload(original_size, len(data), time.perf_counter() - start)
+        logger.info(f"Preview uploads: {self.bot.previews.stats.summary()}")
+        return message
+        
+    def create_response(self, downgrade: bool = True, **kwargs):
+        """Call the OpenAI Responses API, recording latency and outcome.
+        
+        Image generation drops to low quality once the OpenAI budget runs low
+        (unless downgrade is off, as for final renders), and raises
+        BudgetExceeded when it runs out.
+        """
+        module = type(self).__name__
+        governor = self.bot.governor
+        tools = kwargs.get('tools') or []
+        image_tools = [tool for tool in tools if tool.get('type') == 'image_generation']
+        if image_tools and downgrade and governor.degraded("openai"):
+            kwargs['tools'] = [
+                dict(tool, quality="low") if tool.get('type') == 'image_generation' else tool
+                for tool in tools
+            ]
+            image_tools = [tool for tool in kwargs['tools'] if tool.get('type') == 'image_generation']
+            logger.info("OpenAI budget running low, generating at low quality")
+        kind = f"image_generation_{image_tools[0].get('quality', 'auto')}" if image_tools else "response"
+        if not governor.acquire("openai", kind, images=len(image_tools)):
+            EVOLUTIONS.labels(module, "throttled").inc()
+            raise BudgetExceeded("openai", governor.retry_after("openai", kind, images=len(image_tools)))
+        try:
+            with OPENAI_LATENCY.labels(kwargs.get('model', 'unknown')).time():
+                response = self.bot.openai_client.responses.create(**kwargs)
+        except Exception:
+            EVOLUTIONS.labels(module, "error").inc()
+            raise
+        EVOLUTIONS.labels(module, "ok").inc()
+        return response
+        
+    async def publish_allowed(self, charge: bool = True) -> bool:
+        """Charge a mint to the akaSwap budget (only check it without charge), telling the channel when it is used up"""
+        governor = self.bot.governor
+        allowed = governor.acquire if charge else governor.allows
+        if allowed("akaswap", "akaswap_mint"):
+            return True
+        PUBLISH_JOBS.labels("throttled").inc()
+        retry_after = governor.retry_after("akaswap", "akaswap_mint")
+        await self.channel.send(f"⏸️ Publishing limit reached, try again in {retry_after:.0f} seconds")
+        return False
+        
+    async def index_output(self, image_path: str):
+        """Add a saved image to the near-duplicate index, returns (path, distance) of an earlier match"""
+        try:
+            loop = asyncio.get_running_loop()
+            image_hash = await loop.run_in_executor(None, self.bot.image_index.hash_image, image_path)
+            duplicate = self.bot.image_index.nearest_duplicate(image_hash)
+            self.bot.image_index.add(image_path, image_hash)
+            if duplicate:
+                logger.info(f"{image_path} is a near-duplicate of {duplicate[0]} (distance {duplicate[1]})")
+            return duplicate
+        except Exception as e:
+            logger.error(f"Failed to index {image_path}: {e}")
+            return None
+
+    async def render_final(self, stem: str) -> bool:
+        """Re-render the current draft at the quality ladder's final quality before it is published.
+        
+        Evolutions render at the ladder's draft quality; only what gets minted
+        pays for the final one. Returns False when the final render fails, so a
+        draft is never published in its place.
+        """
+        ladder = self.bot.config['quality_ladder']
+        final_quality = ladder['openai']['final']
+        if (not ladder['enabled'] or self.current_quality == final_quality
+                or self.current_response_id == self.final_response_id):
+            return True
+        
+        try:
+            async with self.channel.typing():
+                # A low-budget downgrade would mint a draft-quality image as the final one
+                response = self.create_response(
+                    downgrade=False,
+                    model="gpt-4o-mini",
+                    previous_response_id=self.current_response_id,
+                    input="Regenerate this exact same image at higher quality",
+                    tools=[{"type": "image_generation", "quality": final_quality}],
+                )
+                
+                for output in response.output:
+                    if output.type == "image_generation_call":
+                        image_bytes = base64.b64decode(output.result)
+                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                        self.last_image_path = f"outputs/{stem}_final_{timestamp}.png"
+                        with open(self.last_image_path, 'wb') as f:
+                            f.write(image_bytes)
+                        await self.index_output(self.last_image_path)
+                        self.current_response_id = self.final_response_id = response.id
+                        
+                        await self.send_image(
+                            f"✨ **Final render** ({final_quality} quality, evolution #{self.evolution_count})",
+                            image_bytes,
+                            f"{stem}_final_{self.evolution_count}"
+                        )
+                        logger.info(f"Final render at {final_quality} quality: {self.last_image_path}")
+                        return True
+                        
+            logger.error("No image in final render response")
+        except Exception as e:
+            logger.error(f"Final render failed: {e}")
+        await self.channel.send("❌ Final render failed, not publishing the draft")
+        return False
+
+    async def publish_current(self, stem: str, name: str, description: str):
+        """Publish the current robot as an NFT, unless a near-duplicate was minted already"""
+        if not self.bot.nft_publisher or not self.last_image_path:
+            await self.channel.send("❌ Unable to publish: No image or publisher available")
+            return
+            
+        # Don't mint the same picture twice
+        published = self.bot.image_index.published_duplicate(self.last_image_path)
+        if published:
+            PUBLISH_JOBS.labels("duplicate").inc()
+            await self.channel.send(
+                f"❌ Unable to publish: this robot is nearly identical to one already published "
+                f"({os.path.basename(published[0])})"
+            )
+            return
+            
+        # A throttled mint would waste the paid final render, so check the budget first
+        if not await self.publish_allowed(charge=False):
+            return
+            
+        if not await self.render_final(stem):
+            return
+            
+        if not await self.publish_allowed():
+            return
+            
+        try:
+            async with self.channel.typing():
+                # Publish to NFT
+                result = self.bot.nft_publisher.publish_image(
+                    image_path=self.last_image_path,
+                    name=name,
+                    description=description,
+                    receiver_address="tz2J3uKDJ9s68RtX1XSsqQB6ENRS3wiL1HR5"  # Test wallet
+                )
+                
+                if result.get('success'):
+                    PUBLISH_JOBS.labels("published").inc()
+                    self.bot.image_index.mark_published(self.last_image_path)
+                    nft_url = result['mint'].get('viewUrl', 'https://testnets.akaswap.com')
+                    await self.channel.send(
+                        f"✅ **NFT Published!**\n"
+                        f"🎨 View on akaSwap: {nft_url}\n"
+                        f"📦 Token ID: {result['mint'].get('tokenId', 'Unknown')}\n"
+                        f"🔗 Contract: {result['mint'].get('contract', 'Unknown')}"
+                    )
+                    logger.info(f"NFT published: {result}")
+                else:
+                    PUBLISH_JOBS.labels("failed").inc()
+                    await self.channel.send("❌ NFT publishing failed")
+                    
+        except Exception as e:
+            PUBLISH_JOBS.labels("error").inc()
+            logger.error(f"NFT publishing error: {e}")
+            await self.channel.send(f"❌ NFT publishing error: {str(e)}")
 
 
 class TextEvolutionModule(VeistModule):
@@ -67,6 +252,7 @@ class TextEvolutionModule(VeistModule):
         self.pending_quality_bump = False
         self.current_quality = "low"
         self.quality_levels = ["low", "medium", "high"]
+        self.final_response_id = None  # Response already re-rendered at final quality
         
     async def on_ready(self):
         """Find channel and start initial robot"""
@@ -208,7 +394,7 @@ class TextEvolutionModule(VeistModule):
         try:
             # Show typing indicator
             async with self.channel.typing():
-                response = self.bot.openai_client.responses.create(
+                response = self.create_response(
                     model="gpt-4o-mini",
                     input=prompt,
                     tools=[{"type": "image_generation", "quality": self.current_quality}],
@@ -221,12 +407,8 @@ class TextEvolutionModule(VeistModule):
                         self.current_response_id = response.id
                         self.evolution_count = 0
                         
-                        # Convert to discord file
+                        # Decode image
                         image_bytes = base64.b64decode(output.result)
-                        file = discord.File(
-                            io.BytesIO(image_bytes), 
-                            filename=f"robot_initial.png"
-                        )
                         
                         # Save image for potential NFT
                         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -234,12 +416,14 @@ class TextEvolutionModule(VeistModule):
                         os.makedirs("outputs", exist_ok=True)
                         with open(self.last_image_path, 'wb') as f:
                             f.write(image_bytes)
+                        await self.index_output(self.last_image_path)
                         
                         # Send message
-                        self.last_message = await self.channel.send(
+                        self.last_message = await self.send_image(
                             "🎨 **Initial Robot Generated!**\n"
                             "Type any message to evolve it!",
-                            file=file
+                            image_bytes,
+                            "robot_initial"
                         )
                         
                         # Add meta reactions
@@ -263,7 +447,7 @@ class TextEvolutionModule(VeistModule):
         try:
             # Show typing indicator
             async with self.channel.typing():
-                response = self.bot.openai_client.responses.create(
+                response = self.create_response(
                     model="gpt-4o-mini",
                     previous_response_id=self.current_response_id,
                     input=f"Modify the robot: {modification}",
@@ -277,24 +461,27 @@ class TextEvolutionModule(VeistModule):
                         self.current_response_id = response.id
                         self.evolution_count += 1
                         
-                        # Convert to discord file
+                        # Decode image
                         image_bytes = base64.b64decode(output.result)
-                        file = discord.File(
-                            io.BytesIO(image_bytes), 
-                            filename=f"robot_evolution_{self.evolution_count}.png"
-                        )
                         
                         # Save image for potential NFT
                         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                         self.last_image_path = f"outputs/robot_{timestamp}.png"
                         with open(self.last_image_path, 'wb') as f:
                             f.write(image_bytes)
+                        duplicate = await self.index_output(self.last_image_path)
                         
                         # Send message
-                        self.last_message = await self.channel.send(
+                        message_text = (
                             f"🔄 **Evolution #{self.evolution_count}**\n"
-                            f"Applied: *{modification}*",
-                            file=file
+                            f"Applied: *{modification}*"
+                        )
+                        if duplicate:
+                            message_text += "\n⚠️ Looks nearly identical to an earlier robot"
+                        self.last_message = await self.send_image(
+                            message_text,
+                            image_bytes,
+                            f"robot_evolution_{self.evolution_count}"
                         )
                         
                         # Add meta reactions
@@ -312,35 +499,11 @@ class TextEvolutionModule(VeistModule):
             
     async def publish_as_nft(self):
         """Publish the current robot as an NFT"""
-        if not self.bot.nft_publisher or not self.last_image_path:
-            await self.channel.send("❌ Unable to publish: No image or publisher available")
-            return
-            
-        try:
-            async with self.channel.typing():
-                # Publish to NFT
-                result = self.bot.nft_publisher.publish_image(
-                    image_path=self.last_image_path,
-                    name=f"Veist Robot Evolution #{self.evolution_count}",
-                    description=f"Community-evolved robot from VeistBot. Evolution count: {self.evolution_count}",
-                    receiver_address="tz2J3uKDJ9s68RtX1XSsqQB6ENRS3wiL1HR5"  # Test wallet
-                )
-                
-                if result.get('success'):
-                    nft_url = result['mint'].get('viewUrl', 'https://testnets.akaswap.com')
-                    await self.channel.send(
-                        f"✅ **NFT Published!**\n"
-                        f"🎨 View on akaSwap: {nft_url}\n"
-                        f"📦 Token ID: {result['mint'].get('tokenId', 'Unknown')}\n"
-                        f"🔗 Contract: {result['mint'].get('contract', 'Unknown')}"
-                    )
-                    logger.info(f"NFT published: {result}")
-                else:
-                    await self.channel.send("❌ NFT publishing failed")
-                    
-        except Exception as e:
-            logger.error(f"NFT publishing error: {e}")
-            await self.channel.send(f"❌ NFT publishing error: {str(e)}")
+        await self.publish_current(
+            "robot",
+            name=f"Veist Robot Evolution #{self.evolution_count}",
+            description=f"Community-evolved robot from VeistBot. Evolution count: {self.evolution_count}",
+        )
             
     async def bump_quality(self):
         """Regenerate the current robot at higher quality"""
@@ -355,7 +518,7 @@ class TextEvolutionModule(VeistModule):
         try:
             async with self.channel.typing():
                 # Regenerate at higher quality
-                response = self.bot.openai_client.responses.create(
+                response = self.create_response(
                     model="gpt-4o-mini",
                     previous_response_id=self.current_response_id,
                     input="Regenerate this exact same image at higher quality",
@@ -368,25 +531,23 @@ class TextEvolutionModule(VeistModule):
                         # Update state
                         self.current_response_id = response.id
                         
-                        # Convert to discord file
+                        # Decode image
                         image_bytes = base64.b64decode(output.result)
-                        file = discord.File(
-                            io.BytesIO(image_bytes), 
-                            filename=f"robot_hq_{self.evolution_count}.png"
-                        )
                         
                         # Save image
                         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                         self.last_image_path = f"outputs/robot_{timestamp}.png"
                         with open(self.last_image_path, 'wb') as f:
                             f.write(image_bytes)
+                        await self.index_output(self.last_image_path)
                         
                         # Send message
-                        self.last_message = await self.channel.send(
+                        self.last_message = await self.send_image(
                             f"✨ **Quality Upgraded!**\n"
                             f"Now at: **{self.current_quality}** quality\n"
                             f"(Evolution #{self.evolution_count})",
-                            file=file
+                            image_bytes,
+                            f"robot_hq_{self.evolution_count}"
                         )
                         
                         # Add meta reactions
@@ -412,10 +573,16 @@ class ReactionTestbedModule(VeistModule):
         self.evolution_count = 0
         self.last_message = None
         self.last_image_path = None
-        self.current_quality = "medium"  # Default to medium quality
+        # Evolutions render as drafts when the quality ladder is on, medium quality otherwise
+        ladder = bot.config['quality_ladder']
+        self.current_quality = ladder['openai']['draft'] if ladder['enabled'] else "medium"
+        self.final_response_id = None  # Response already re-rendered at final quality
         self.collecting_feedback = False
         self.feedback_reactions = {}  # Track reactions for current image
         self.pending_publish = False  # Track if we're waiting for publish confirmation
+        self.pending_interpretations = {}  # Lexicon entries behind the last evolution, judged by what users do next
+        self.renderer = ComparisonRenderer.from_config(bot.config.get('comparison', {}))
+        self.contact_sheet = ContactSheet.from_config(bot.config.get('contact_sheet', {}))
         
     async def on_ready(self):
         """Find channel and start initial robot"""
@@ -480,21 +647,20 @@ class ReactionTestbedModule(VeistModule):
             self.pending_publish = False
             await self.generate_initial_robot()
             
+        elif content == "summary":
+            await self.send_contact_sheet()
+            
         elif content == "publish":
             # Show current image and ask for confirmation
             if self.last_image_path and os.path.exists(self.last_image_path):
                 with open(self.last_image_path, 'rb') as f:
                     image_bytes = f.read()
                 
-                file = discord.File(
-                    io.BytesIO(image_bytes),
-                    filename=f"robot_to_publish.png"
-                )
-                
-                confirm_msg = await self.channel.send(
+                confirm_msg = await self.send_image(
                     "🎨 **Publish this robot?**\n"
                     "React with 👍 to confirm publishing to Tezos testnet!",
-                    file=file
+                    image_bytes,
+                    "robot_to_publish"
                 )
                 await confirm_msg.add_reaction("👍")
                 self.pending_publish = True
@@ -529,6 +695,13 @@ class ReactionTestbedModule(VeistModule):
             await self.process_feedback()
             return
             
+        # Going back rejects the interpretations the evolution was made with
+        if emoji_str == self.bot.config['meta_reactions']['go_back'] and self.pending_interpretations:
+            self.bot.lexicon.reject(self.pending_interpretations)
+            logger.info(f"Rejected interpretations: {self.pending_interpretations}")
+            self.pending_interpretations = {}
+            return
+            
         # Ignore meta reactions for now (but keep them on the message)
         if emoji_str in [self.bot.config['meta_reactions']['all_done'], 
                          self.bot.config['meta_reactions']['keep_going'],
@@ -557,7 +730,7 @@ class ReactionTestbedModule(VeistModule):
         try:
             # Show typing indicator
             async with self.channel.typing():
-                response = self.bot.openai_client.responses.create(
+                response = self.create_response(
                     model="gpt-4o-mini",
                     input=prompt,
                     tools=[{"type": "image_generation", "quality": self.current_quality}],
@@ -570,12 +743,8 @@ class ReactionTestbedModule(VeistModule):
                         self.current_response_id = response.id
                         self.evolution_count = 0
                         
-                        # Convert to discord file
+                        # Decode image
                         image_bytes = base64.b64decode(output.result)
-                        file = discord.File(
-                            io.BytesIO(image_bytes), 
-                            filename=f"robot_initial.png"
-                        )
                         
                         # Save image
                         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -583,13 +752,19 @@ class ReactionTestbedModule(VeistModule):
                         os.makedirs("outputs", exist_ok=True)
                         with open(self.last_image_path, 'wb') as f:
                             f.write(image_bytes)
+                        await self.index_output(self.last_image_path)
+                        
+                        # Start a fresh session summary
+                        self.contact_sheet = ContactSheet.from_config(self.bot.config.get('contact_sheet', {}))
+                        await self.add_to_contact_sheet(image_bytes)
                         
                         # Send message
-                        self.last_message = await self.channel.send(
+                        self.last_message = await self.send_image(
                             "🎨 **Initial Robot Generated!**\n"
                             "React with emojis to guide evolution.\n"
                             "📊 **Collecting feedback...** Hit 👍 when ready to evolve!",
-                            file=file
+                            image_bytes,
+                            "robot_initial"
                         )
                         
                         # Add thumbs up for processing
@@ -621,6 +796,17 @@ class ReactionTestbedModule(VeistModule):
         # Stop collecting feedback
         self.collecting_feedback = False
         
+        # Evolving again from the last result accepts the interpretations behind it
+        if self.pending_interpretations:
+            self.bot.lexicon.accept(self.pending_interpretations)
+            logger.info(f"Accepted interpretations: {self.pending_interpretations}")
+            self.pending_interpretations = {}
+        # Pick up confidences bot.py has changed and store the use counts since the last evolution
+        self.bot.lexicon.flush()
+        lexicon_table = self.bot.lexicon.format_table(
+            self.feedback_reactions, self.bot.config['lexicon']['prompt_entries']
+        )
+        
         # Build feedback string
         feedback_str = ", ".join([f"{emoji}: {count}" for emoji, count in self.feedback_reactions.items()])
         
@@ -668,8 +854,7 @@ Think about what the emoji might "mean" to someone who wants to improve the imag
 
 Here is a lookup table we have used in the past for interpreting emoji:
 
-🎦: cinematic
-📷: photorealistic
+{lexicon_table}
 
 In addition to creating the image, reflect on how you interpreted the emoji given, and also respond in text form with suggested updates to the lookup table in the format
 <emoji>: interpretation
@@ -690,7 +875,7 @@ Below is your image and reactions
         try:
             # Show typing indicator
             async with self.channel.typing():
-                response = self.bot.openai_client.responses.create(
+                response = self.create_response(
                     model="gpt-4o-mini",
                     previous_response_id=self.current_response_id,
                     input=prompt,
@@ -771,6 +956,12 @@ Below is your image and reactions
                         logger.info(f"Found interpretation (fallback): {interpretation}")
                         break
                 
+                # Suggested table entries for the emoji users gave, kept until users judge the result
+                suggested = parse_interpretations(interpretation)
+                self.pending_interpretations = {
+                    emoji: text for emoji, text in suggested.items() if emoji in self.feedback_reactions
+                }
+                
                 # Extract evolved image
                 for output in response.output:
                     if output.type == "image_generation_call":
@@ -792,11 +983,13 @@ Below is your image and reactions
                         self.last_image_path = f"outputs/robot_feedback_{timestamp}.png"
                         with open(self.last_image_path, 'wb') as f:
                             f.write(new_image_bytes)
+                        duplicate = await self.index_output(self.last_image_path)
+                        await self.add_to_contact_sheet(new_image_bytes)
                         
                         # Create combined image or just use new image
                         if old_image_bytes and self.evolution_count > 1:
                             # Combine images
-                            combined_bytes = self.combine_images(
+                            combined_bytes = await self.combine_images(
                                 old_image_bytes, 
                                 new_image_bytes, 
                                 feedback_str,
@@ -806,7 +999,7 @@ Below is your image and reactions
                             if combined_bytes:
                                 file = discord.File(
                                     io.BytesIO(combined_bytes),
-                                    filename=f"robot_evolution_{self.evolution_count}_comparison.png"
+                                    filename=f"robot_evolution_{self.evolution_count}_comparison.{self.renderer.extension}"
                                 )
                                 message_text = (
                                     f"🔄 **Evolution #{self.evolution_count}**\n"
@@ -817,10 +1010,7 @@ Below is your image and reactions
                                 message_text += "📊 **Collecting feedback...** Hit 👍 when ready to evolve!"
                             else:
                                 # Fallback to just new image if combine fails
-                                file = discord.File(
-                                    io.BytesIO(new_image_bytes),
-                                    filename=f"robot_evolution_{self.evolution_count}.png"
-                                )
+                                file = None
                                 message_text = (
                                     f"🔄 **Evolution #{self.evolution_count}**\n"
                                     f"Applied: {feedback_str}\n"
@@ -830,10 +1020,7 @@ Below is your image and reactions
                                 message_text += f"📊 **Collecting feedback...** Hit 👍 when ready to evolve!"
                         else:
                             # First evolution, no comparison needed
-                            file = discord.File(
-                                io.BytesIO(new_image_bytes),
-                                filename=f"robot_evolution_{self.evolution_count}.png"
-                            )
+                            file = None
                             message_text = (
                                 f"🔄 **Evolution #{self.evolution_count}**\n"
                                 f"Applied: {feedback_str}\n"
@@ -842,11 +1029,21 @@ Below is your image and reactions
                                 message_text += f"Interpretation: {interpretation}\n"
                             message_text += f"📊 **Collecting feedback...** Hit 👍 when ready to evolve!"
                         
-                        # Send combined message
-                        self.last_message = await self.channel.send(
-                            message_text,
-                            file=file
-                        )
+                        if duplicate:
+                            message_text = "⚠️ Looks nearly identical to an earlier robot\n" + message_text
+                        
+                        # Send combined message, or the new image as a preview
+                        if file:
+                            self.last_message = await self.channel.send(
+                                message_text,
+                                file=file
+                            )
+                        else:
+                            self.last_message = await self.send_image(
+                                message_text,
+                                new_image_bytes,
+                                f"robot_evolution_{self.evolution_count}"
+                            )
                         
                         # Add thumbs up for processing
                         await self.last_message.add_reaction("👍")
@@ -872,92 +1069,46 @@ Below is your image and reactions
     
     async def publish_as_nft(self):
         """Publish the current robot as an NFT"""
-        if not self.bot.nft_publisher or not self.last_image_path:
-            await self.channel.send("❌ Unable to publish: No image or publisher available")
-            return
-            
+        await self.publish_current(
+            "robot_feedback",
+            name=f"Veist Robot Feedback Evolution #{self.evolution_count}",
+            description=f"Community-evolved robot from VeistBot using emoji feedback. Evolution count: {self.evolution_count}",
+        )
+    
+    async def add_to_contact_sheet(self, image_bytes):
+        """Append an image to the session summary off the event loop"""
         try:
-            async with self.channel.typing():
-                # Publish to NFT
-                result = self.bot.nft_publisher.publish_image(
-                    image_path=self.last_image_path,
-                    name=f"Veist Robot Feedback Evolution #{self.evolution_count}",
-                    description=f"Community-evolved robot from VeistBot using emoji feedback. Evolution count: {self.evolution_count}",
-                    receiver_address="tz2J3uKDJ9s68RtX1XSsqQB6ENRS3wiL1HR5"  # Test wallet
-                )
-                
-                if result.get('success'):
-                    nft_url = result['mint'].get('viewUrl', 'https://testnets.akaswap.com')
-                    await self.channel.send(
-                        f"✅ **NFT Published!**\n"
-                        f"🎨 View on akaSwap: {nft_url}\n"
-                        f"📦 Token ID: {result['mint'].get('tokenId', 'Unknown')}\n"
-                        f"🔗 Contract: {result['mint'].get('contract', 'Unknown')}"
-                    )
-                    logger.info(f"NFT published: {result}")
-                else:
-                    await self.channel.send("❌ NFT publishing failed")
-                    
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.contact_sheet.add, image_bytes)
         except Exception as e:
-            logger.error(f"NFT publishing error: {e}")
-            await self.channel.send(f"❌ NFT publishing error: {str(e)}")
+            logger.error(f"Failed to add image to contact sheet: {e}")
     
-    def combine_images(self, old_image_bytes, new_image_bytes, feedback_str, interpretation=None):
+    async def send_contact_sheet(self):
+        """Post the summary of every evolution in this session"""
+        if not len(self.contact_sheet):
+            await self.channel.send("❌ No robot evolutions to summarize yet!")
+            return
+        
+        export = self.bot.config.get('contact_sheet', {}).get('export', 'grid')
+        loop = asyncio.get_running_loop()
+        data, extension = await loop.run_in_executor(None, self.contact_sheet.export, export)
+        file = discord.File(
+            io.BytesIO(data),
+            filename=f"robot_evolution_summary.{extension}"
+        )
+        await self.channel.send(
+            f"🎞️ **Evolution summary** ({len(self.contact_sheet)} versions)",
+            file=file
+        )
+    
+    async def combine_images(self, old_image_bytes, new_image_bytes, feedback_str, interpretation=None):
         """Combine old and new images side by side with labels"""
-        try:
-            # Open images
-            old_img = Image.open(io.BytesIO(old_image_bytes))
-            new_img = Image.open(io.BytesIO(new_image_bytes))
-            
-            # Make images same height
-            height = min(old_img.height, new_img.height)
-            if old_img.height != height:
-                old_img = old_img.resize((int(old_img.width * height / old_img.height), height), Image.Resampling.LANCZOS)
-            if new_img.height != height:
-                new_img = new_img.resize((int(new_img.width * height / new_img.height), height), Image.Resampling.LANCZOS)
-            
-            # Create combined image with padding for text
-            padding = 20
-            text_height = 100
-            combined_width = old_img.width + new_img.width + padding * 3
-            combined_height = height + text_height + padding * 2
-            
-            combined = Image.new('RGB', (combined_width, combined_height), 'white')
-            
-            # Paste images
-            combined.paste(old_img, (padding, text_height + padding))
-            combined.paste(new_img, (old_img.width + padding * 2, text_height + padding))
-            
-            # Add text
-            draw = ImageDraw.Draw(combined)
-            try:
-                # Try to use a nice font, fall back to default if not available
-                font = ImageFont.truetype("Arial.ttf", 16)
-                title_font = ImageFont.truetype("Arial.ttf", 20)
-            except:
-                font = ImageFont.load_default()
-                title_font = font
-            
-            # Add labels
-            draw.text((padding, 10), "Previous Version", fill='black', font=title_font)
-            draw.text((old_img.width + padding * 2, 10), "New Version", fill='black', font=title_font)
-            
-            # Add feedback info
-            feedback_text = f"Applied: {feedback_str}"
-            if interpretation:
-                feedback_text += f"\nInterpretation: {interpretation}"
-            
-            draw.text((padding, 40), feedback_text, fill='gray', font=font)
-            
-            # Convert to bytes
-            output = io.BytesIO()
-            combined.save(output, format='PNG')
-            output.seek(0)
-            return output.getvalue()
-            
-        except Exception as e:
-            logger.error(f"Failed to combine images: {e}")
-            return None
+        return await self.renderer.render_async(
+            old_image_bytes,
+            new_image_bytes,
+            feedback_str,
+            interpretation
+        )
 
 
 class VeistBot(commands.Bot):
@@ -989,6 +1140,21 @@ class VeistBot(commands.Bot):
             self.config['meta_reactions']['go_back']
         ]
         
+        # Discord posts use size-capped previews; full-res files stay on disk
+        self.previews = PreviewRenderer.from_config(self.config['previews'])
+        
+        # Rate and spend limits shared by every paid call in the process
+        self.governor = governor_for(self.config['governor'])
+        
+        # Learned emoji interpretations for evolution prompts
+        self.lexicon = EmojiLexicon.from_config(self.config['lexicon'])
+        
+        # Near-duplicate index over saved outputs
+        self.image_index = index_for(
+            "outputs",
+            max_distance=self.config['dedup']['max_distance']
+        )
+        
         # Initialize OpenAI client
         try:
             self.openai_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
@@ -1031,6 +1197,23 @@ class VeistBot(commands.Bot):
             self.tree.copy_global_to(guild=guild)
             await self.tree.sync(guild=guild)
             logger.info(f"Synced commands to guild {self.guild_id}")
+        
+        # Serve operational metrics from the bot's own event loop
+        instrument_discord(self)
+        metrics_config = self.config['metrics']
+        if metrics_config['enabled']:
+            self.metrics_server = MetricsServer(host=metrics_config['host'], port=metrics_config['port'])
+            await self.metrics_server.start()
+            logger.info(f"Serving metrics on http://{metrics_config['host']}:{metrics_config['port']}/metrics")
+        
+        # Report anything that blocks the gateway loop
+        if self.config['watchdog']['enabled']:
+            self.watchdog = LoopWatchdog.from_config(self.config['watchdog'], name="veist_bot")
+            self.watchdog.start()
+    
+    async def close(self):
+        self.lexicon.close()
+        await super().close()
     
     async def on_ready(self):
         """Called when bot is fully ready"""